@@ -0,0 +1,276 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+class ReturnAnalytics:
+    """NAV 시계열의 기간 수익률 조회기
+
+    날짜 인덱스와 누적 로그 NAV 를 미리 계산해 두므로, 어떤 구간의 로그 수익률도
+    이진 탐색 두 번과 뺄셈 한 번으로 구합니다.
+    """
+
+    def __init__(self, dates, nav):
+        dates = np.asarray(dates, dtype="datetime64[ns]")
+        nav = np.asarray(nav, dtype=np.float64)
+        if len(dates) != len(nav):
+            raise ValueError("날짜와 NAV 의 길이가 다릅니다.")
+        order = np.argsort(dates, kind="stable")
+        self.dates = dates[order]
+        self.nav = nav[order]
+        self.log_nav = np.log(self.nav)
+
+    @classmethod
+    def from_frame(cls, data):
+        """Date/NAV 열을 가진 데이터프레임에서 생성합니다."""
+        return cls(pd.to_datetime(data["Date"]).to_numpy(), data["NAV"].to_numpy())
+
+    def __len__(self):
+        return len(self.nav)
+
+    @property
+    def daily_returns(self):
+        """일간 로그 수익률 (길이 len - 1)"""
+        return np.diff(self.log_nav)
+
+    def cumulative_return(self):
+        """전체 기간 로그 수익률"""
+        return float(self.log_nav[-1] - self.log_nav[0])
+
+    def trailing_return(self, periods):
+        """마지막 행과 periods 행 이전 행 사이의 로그 수익률. 데이터가 부족하면 None"""
+        if len(self) <= periods:
+            return None
+        return float(self.log_nav[-1] - self.log_nav[-periods])
+
+    def return_between(self, start, end=None):
+        """start 이후 첫 거래일부터 end 이전 마지막 거래일까지의 로그 수익률. 구간이 비면 None"""
+        first = np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start), "ns"), side="left")
+        last = len(self) - 1 if end is None else \
+            np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end), "ns"), side="right") - 1
+        if first >= last:
+            return None
+        return float(self.log_nav[last] - self.log_nav[first])
+
+    def period_returns(self, windows):
+        """(이름, 행 수) 목록의 후행 수익률 표를 반환합니다."""
+        return pd.DataFrame([
+            {"기간": label, "기간 수익률": self.trailing_return(periods)}
+            for label, periods in windows
+        ])
+
+
+def infer_periods_per_year(dates):
+    """날짜 간격으로 연간 관측 수를 추정합니다. (달력일 데이터 365, 거래일 데이터 252)"""
+    dates = np.asarray(dates, dtype="datetime64[ns]")
+    if len(dates) < 2:
+        return 252
+    gap_days = np.median(np.diff(dates).astype("timedelta64[s]").astype(np.float64)) / 86400
+    return 365 if gap_days < 1.2 else 252
+
+
+def _merge_drawdown(older, newer):
+    """(최고, 최저, 최대 하락) 로그 NAV 요약 두 개를 시간 순서대로 합칩니다."""
+    if older is None:
+        return newer
+    if newer is None:
+        return older
+    return (max(older[0], newer[0]), min(older[1], newer[1]),
+            min(older[2], newer[2], newer[1] - older[0]))
+
+
+class WindowDrawdown:
+    """최근 size 개 로그 NAV 구간의 최대 낙폭 (추가/제거 분할상환 O(1))
+
+    두 스택 큐의 각 원소에 (최고, 최저, 최대 하락) 요약을 누적해 두고, 앞/뒤 스택 요약을 합쳐
+    창 안에서 고점 이후 가장 깊은 하락을 구합니다. 창 밖의 고점은 반영하지 않습니다.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._front = []  # (로그 NAV, 이 원소부터 앞 스택 끝까지의 요약), 마지막 원소가 가장 오래된 값
+        self._back = []
+        self._back_summary = None
+
+    def __len__(self):
+        return len(self._front) + len(self._back)
+
+    def push(self, log_nav):
+        """새 로그 NAV 를 추가하고, 창 크기를 넘으면 가장 오래된 값을 제거합니다."""
+        self._back.append(log_nav)
+        self._back_summary = _merge_drawdown(self._back_summary, (log_nav, log_nav, 0.0))
+        if len(self) > self.size:
+            self._pop()
+
+    def _pop(self):
+        if not self._front:
+            summary = None
+            while self._back:
+                log_nav = self._back.pop()
+                summary = _merge_drawdown((log_nav, log_nav, 0.0), summary)
+                self._front.append((log_nav, summary))
+            self._back_summary = None
+        self._front.pop()
+
+    @property
+    def max_drawdown(self):
+        """창 안의 최대 낙폭 (0 이하의 비율)"""
+        summary = _merge_drawdown(self._front[-1][1] if self._front else None, self._back_summary)
+        return float(np.expm1(summary[2])) if summary is not None else 0.0
+
+
+class RollingAnalytics:
+    """NAV 가 하루씩 추가될 때마다 O(1) 로 갱신되는 롤링 위험/수익 지표
+
+    window 개 수익률의 합과 제곱합, 하방 제곱합을 유지하여 변동성, 샤프, 소르티노를 계산하고,
+    창 안의 최대 낙폭으로 칼마 비율을, 전체 고점/낙폭 상태로 낙폭 깊이, 지속 기간, 회복 기간을 계산합니다.
+    합과 제곱합은 첫 수익률만큼 이동한 값으로 유지하여 분산 계산의 자릿수 상실을 막습니다.
+    """
+
+    COLUMNS = ["Date", "변동성", "샤프", "소르티노", "칼마", "낙폭", "낙폭 기간"]
+    # 이보다 작은 일간 분산은 반올림 오차로 보고 0 으로 취급 (표준편차 1e-12)
+    VARIANCE_EPSILON = 1e-24
+
+    def __init__(self, window, periods_per_year=252, risk_free=0.0):
+        self.window = window
+        self.periods_per_year = periods_per_year
+        self.risk_free = risk_free / periods_per_year  # 기간당 무위험 수익률
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.dates = []
+        self.log_nav = []
+        self.rows = []
+        self.episodes = []  # 종료된 낙폭 구간 (고점일, 저점일, 회복일, 최대 낙폭)
+        self._shift = None
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._downside_sq = 0.0
+        self._peak = None
+        self._peak_index = 0
+        self._trough = 0.0
+        self._trough_index = 0
+        self._max_drawdown = 0.0
+        self._window_drawdown = WindowDrawdown(self.window + 1)  # window 개 수익률 = window + 1 개 NAV
+
+    def __len__(self):
+        return len(self.log_nav)
+
+    def update(self, date, nav):
+        """새 NAV 하나를 반영하고 그 시점의 지표 행을 반환합니다."""
+        log_nav = float(np.log(nav))
+        index = len(self.log_nav)
+        self.dates.append(date)
+        self.log_nav.append(log_nav)
+
+        if index > 0:
+            excess = log_nav - self.log_nav[index - 1] - self.risk_free
+            self._add(excess, 1.0)
+            if index > self.window:
+                # 창을 벗어난 수익률 제거
+                self._add(self.log_nav[index - self.window] - self.log_nav[index - self.window - 1] - self.risk_free, -1.0)
+
+        self._window_drawdown.push(log_nav)
+        drawdown = self._drawdown_row(index, date, nav)
+        row = self._rolling_row(index, date) + drawdown
+        self.rows.append(row)
+        return row
+
+    def extend(self, dates, navs):
+        """여러 NAV 를 순서대로 반영합니다."""
+        for date, nav in zip(dates, navs):
+            self.update(date, nav)
+        return self
+
+    def sync(self, dates, navs):
+        """기존 구간은 그대로 두고 새로 추가된 꼬리 구간만 반영한 뒤 (지표 표, 낙폭 구간 표)를 반환합니다.
+
+        여러 세션이 같은 객체를 공유하므로 갱신과 표 생성을 모두 잠금 안에서 합니다.
+        시계열이 짧아졌거나 저장된 구간의 첫/마지막 날짜나 NAV 가 달라졌으면(가격 갱신, 포트폴리오 변경)
+        처음부터 다시 계산합니다.
+        """
+        with self._lock:
+            if not self._matches(dates, navs):
+                self._reset()
+            self.extend(dates[len(self):], navs[len(self):])
+            return self.to_frame(), self.episodes_frame()
+
+    def _matches(self, dates, navs):
+        """dates/navs 가 저장된 구간을 그대로 앞부분으로 포함하는지 여부 (양 끝만 비교)"""
+        count = len(self)
+        if count == 0:
+            return True
+        if len(dates) < count:
+            return False
+        return all(
+            np.datetime64(dates[i], "ns") == np.datetime64(self.dates[i], "ns")
+            and float(np.log(navs[i])) == self.log_nav[i]
+            for i in (0, count - 1)
+        )
+
+    def _add(self, value, sign):
+        if self._shift is None:
+            self._shift = value
+        shifted = value - self._shift
+        self._sum += sign * shifted
+        self._sum_sq += sign * shifted * shifted
+        if value < 0:
+            self._downside_sq += sign * value * value
+
+    def _rolling_row(self, index, date):
+        count = min(index, self.window)
+        if count < 2:
+            return [date, np.nan, np.nan, np.nan, np.nan]
+        mean = self._shift + self._sum / count
+        variance = (self._sum_sq - self._sum * self._sum / count) / (count - 1)
+        if variance < self.VARIANCE_EPSILON:
+            variance = 0.0
+        volatility = np.sqrt(variance * self.periods_per_year)
+        downside = np.sqrt(max(self._downside_sq, 0.0) / count * self.periods_per_year)
+        annual_return = mean * self.periods_per_year
+        sharpe = annual_return / volatility if volatility > 0 else np.nan
+        sortino = annual_return / downside if downside > 0 else np.nan
+        window_return = (self.log_nav[index] - self.log_nav[index - count]) * self.periods_per_year / count
+        window_drawdown = self._window_drawdown.max_drawdown
+        calmar = window_return / -window_drawdown if window_drawdown < 0 else np.nan
+        return [date, volatility, sharpe, sortino, calmar]
+
+    def _drawdown_row(self, index, date, nav):
+        if self._peak is None or nav >= self._peak:
+            if self._peak is not None and self._trough < 0:
+                # 직전 고점을 회복하면 낙폭 구간 종료
+                self.episodes.append((
+                    self.dates[self._peak_index], self.dates[self._trough_index], date, self._trough,
+                ))
+            self._peak, self._peak_index = nav, index
+            self._trough, self._trough_index = 0.0, index
+            return [0.0, 0]
+
+        drawdown = nav / self._peak - 1.0
+        if drawdown < self._trough:
+            self._trough, self._trough_index = drawdown, index
+        self._max_drawdown = min(self._max_drawdown, drawdown)
+        return [drawdown, index - self._peak_index]
+
+    @property
+    def max_drawdown(self):
+        """전체 기간 최대 낙폭"""
+        return self._max_drawdown
+
+    def to_frame(self):
+        """시점별 지표 데이터프레임을 반환합니다."""
+        return pd.DataFrame(self.rows, columns=self.COLUMNS)
+
+    def episodes_frame(self):
+        """낙폭 구간별 깊이와 하락/회복 기간을 반환합니다. 아직 회복하지 못한 구간도 포함합니다."""
+        episodes = list(self.episodes)
+        if self._trough < 0:
+            episodes.append((self.dates[self._peak_index], self.dates[self._trough_index], None, self._trough))
+        frame = pd.DataFrame(episodes, columns=["고점", "저점", "회복", "최대 낙폭"])
+        for column in ["고점", "저점", "회복"]:
+            frame[column] = pd.to_datetime(frame[column])
+        frame["하락 기간(일)"] = (frame["저점"] - frame["고점"]).dt.days
+        frame["회복 기간(일)"] = (frame["회복"] - frame["저점"]).dt.days
+        return frame
@@ -0,0 +1,126 @@
+import sys
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from backtest import load_price_data, weights_to_matrix
+from data_store import ASSET_DATA_FILES, get_store
+from portfolios import model_portfolios
+from risk import TRADING_DAYS, asset_covariance
+
+# 모수적 VaR 신뢰수준 (일간)
+VAR_LEVEL = 0.95
+
+
+@dataclass(frozen=True)
+class Attribution:
+    """모든 프로필의 자산별 수익 기여도와 위험 기여도
+
+    contributions 는 (프로필 x 날짜 x 자산) NAV 기여(초기 NAV 1 기준)로, 날짜 축으로 누적하면
+    자산별 기여의 합이 그날의 누적 수익률과 정확히 같습니다. 가격 데이터가 없으면 None 입니다.
+    """
+    profiles: tuple  # (위험성향, 투자 기간)
+    assets: tuple
+    weights: np.ndarray  # (프로필 x 자산) 비중
+    dates: Optional[pd.DatetimeIndex]
+    contributions: Optional[np.ndarray]
+    marginal_var: np.ndarray  # (프로필 x 자산) 비중 한 단위당 VaR 변화
+    component_var: np.ndarray  # (프로필 x 자산) 합이 포트폴리오 VaR
+
+    def _index(self, risk, horizon):
+        return self.profiles.index((risk, horizon))
+
+    def cumulative_frame(self, risk, horizon):
+        """보유 자산별 누적 수익 기여(날짜 x 자산). 가격 데이터가 없으면 None"""
+        if self.contributions is None:
+            return None
+        p = self._index(risk, horizon)
+        held = self.weights[p] > 0
+        cumulative = np.cumsum(self.contributions[p][:, held], axis=0)
+        return pd.DataFrame(cumulative, index=pd.DatetimeIndex(self.dates, name="Date"),
+                            columns=[asset for asset, keep in zip(self.assets, held) if keep])
+
+    def risk_frame(self, risk, horizon):
+        """보유 자산별 비중, 수익 기여, 한계 VaR, 구성 VaR 와 VaR 비중 표"""
+        p = self._index(risk, horizon)
+        held = self.weights[p] > 0
+        component = self.component_var[p, held]
+        frame = pd.DataFrame({
+            "비중": self.weights[p, held],
+            "수익 기여": (self.contributions[p][:, held].sum(axis=0) if self.contributions is not None
+                       else np.full(held.sum(), np.nan)),
+            "한계 VaR": self.marginal_var[p, held],
+            "구성 VaR": component,
+            "VaR 비중": component / component.sum() if component.sum() > 0 else np.nan,
+        }, index=pd.Index([asset for asset, keep in zip(self.assets, held) if keep], name="자산"))
+        return frame
+
+
+def return_contributions(asset_returns, weights):
+    """(날짜 x 자산) 수익률과 (프로필 x 자산) 비중으로 (프로필 x 날짜 x 자산) NAV 기여를 계산합니다.
+
+    매일 목표 비중으로 리밸런싱하므로 t일 자산 i 의 기여는 NAV(t-1) * w_i * r_i(t) 이며,
+    모든 프로필과 날짜를 한 번의 텐서 연산으로 구합니다.
+    """
+    daily = np.einsum("tm,pm->ptm", asset_returns, weights)
+    nav = np.cumprod(1.0 + daily.sum(axis=2), axis=1)
+    previous_nav = np.concatenate([np.ones((len(weights), 1)), nav[:, :-1]], axis=1)
+    return daily * previous_nav[:, :, None]
+
+
+def var_contributions(weights, covariances, level=VAR_LEVEL):
+    """(프로필 x 자산) 비중과 (프로필 x 자산 x 자산) 일간 공분산으로 한계/구성 VaR 를 계산합니다.
+
+    모수적 VaR = z·σ_p 이고 한계 VaR = z·(Σw)_i / σ_p, 구성 VaR = w_i·한계 VaR (합이 VaR)
+    """
+    z = NormalDist().inv_cdf(level)
+    exposure = np.einsum("pij,pj->pi", covariances, weights)
+    volatility = np.sqrt(np.einsum("pi,pi->p", weights, exposure))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        marginal = np.where(volatility[:, None] > 0, z * exposure / volatility[:, None], 0.0)
+    return marginal, weights * marginal
+
+
+def _covariance(horizon, assets):
+    """투자 기간의 일간 공분산. 가격 데이터가 없으면 자산 통계의 변동성으로 상관관계 1 을 가정합니다."""
+    stats = get_store().asset_stats.get(ASSET_DATA_FILES.get(horizon, ASSET_DATA_FILES["2년"]))
+    volatility = np.full(len(assets), np.nan)
+    if stats is not None:
+        position = {asset: i for i, asset in enumerate(stats.assets)}
+        volatility = np.array([stats.volatility[position[asset]] if asset in position else np.nan
+                               for asset in assets])
+    return asset_covariance(assets, horizon, np.nan_to_num(volatility)) / TRADING_DAYS
+
+
+def run_attribution(portfolios=None, prices=None):
+    """모든 모델 포트폴리오의 수익/위험 기여도를 계산합니다."""
+    portfolios = model_portfolios() if portfolios is None else portfolios
+    prices = load_price_data() if prices is None else prices
+    profiles = tuple(portfolios)
+    # 보유 자산만 사용하여 텐서 크기를 (프로필 x 날짜 x 보유 자산 합집합)으로 제한
+    assets = list(dict.fromkeys(asset for portfolio in portfolios.values() for asset in portfolio))
+    weights = weights_to_matrix(list(portfolios.values()), assets)
+
+    dates, contributions = None, None
+    if not prices.empty and set(assets).issubset(prices.columns):
+        values = prices[assets].to_numpy(dtype=np.float64)
+        asset_returns = np.nan_to_num(values[1:] / values[:-1] - 1.0)
+        # 첫 날은 기여 0 (run_backtest 와 같은 날짜 축)
+        contributions = return_contributions(np.vstack([np.zeros((1, len(assets))), asset_returns]), weights)
+        dates = prices.index
+
+    covariances = {horizon: _covariance(horizon, assets) for horizon in {horizon for _, horizon in profiles}}
+    marginal, component = var_contributions(weights, np.stack([covariances[horizon] for _, horizon in profiles]))
+    return Attribution(profiles, tuple(assets), weights, dates, contributions, marginal, component)
+
+
+if __name__ == "__main__":
+    # 사용법: python attribution.py [위험성향] [투자 기간]
+    result = run_attribution()
+    selected = [tuple(sys.argv[1:3])] if len(sys.argv) > 2 else result.profiles
+    for profile in selected:
+        print(" / ".join(profile))
+        print(result.risk_frame(*profile).to_string())
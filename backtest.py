@@ -0,0 +1,217 @@
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from data_store import PRICE_DATA_PATH, get_store, parse_price_matrix
+
+
+def load_price_data(file_path=PRICE_DATA_PATH):
+    """일별 자산 가격 데이터를 로드합니다. 휴장일 등 결측치는 직전 가격으로 채웁니다."""
+    if not os.path.exists(file_path):
+        return pd.DataFrame()  # 빈 데이터프레임 반환
+    prices = get_store(os.path.dirname(file_path) or ".").prices.get(os.path.basename(file_path))
+    if prices is None:
+        prices = parse_price_matrix(file_path)
+    return prices.to_frame()
+
+
+def weights_to_matrix(portfolios, assets):
+    """get_portfolio 비중(%) 딕셔너리(또는 그 목록)를 (포트폴리오 x 자산) 비중 행렬로 변환합니다."""
+    if isinstance(portfolios, dict):
+        portfolios = [portfolios]
+    index = {asset: j for j, asset in enumerate(assets)}
+    weights = np.zeros((len(portfolios), len(assets)))
+    for i, portfolio in enumerate(portfolios):
+        for asset, weight in portfolio.items():
+            if asset not in index:
+                raise KeyError(f"가격 데이터에 {asset} 정보가 없습니다.")
+            weights[i, index[asset]] = weight / 100
+    return weights
+
+
+@dataclass
+class BacktestResult:
+    """백테스트 결과 (행: 날짜, 열: 포트폴리오)"""
+    dates: pd.DatetimeIndex
+    nav: np.ndarray
+    drawdown: np.ndarray
+    returns: np.ndarray
+
+    def to_frame(self, i=0):
+        """i번째 포트폴리오 결과를 back_data_*.csv 와 같은 Date/NAV/MDD 형식으로 반환합니다."""
+        return pd.DataFrame({
+            "Date": self.dates,
+            "NAV": self.nav[:, i],
+            "MDD": self.drawdown[:, i],
+        })
+
+    def period_returns(self, freq="ME"):
+        """기간(월말 'ME', 분기말 'QE', 연말 'YE' 등)별 로그 수익률을 반환합니다."""
+        nav = pd.DataFrame(self.nav, index=self.dates)
+        period_end = nav.resample(freq).last()
+        # 첫 기간은 최초 NAV 대비 수익률
+        previous = period_end.shift(1)
+        previous.iloc[0] = nav.iloc[0]
+        return np.log(period_end / previous)
+
+
+def _as_weight_matrix(weights, assets):
+    """비중 입력을 (포트폴리오 x 자산) float64 행렬로 맞춥니다."""
+    if isinstance(weights, (dict, list)):
+        weights = weights_to_matrix(weights, assets)
+    weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+    if weights.shape[1] != len(assets):
+        raise ValueError("비중 행렬의 자산 수가 가격 데이터와 다릅니다.")
+    return weights
+
+
+def _asset_returns(prices):
+    """가격 데이터프레임에서 (T-1 x M) 일간 단순 수익률 행렬을 계산합니다."""
+    if not isinstance(prices, pd.DataFrame) or prices.empty:
+        raise ValueError("가격 데이터가 비어 있습니다.")
+    price_values = prices.to_numpy(dtype=np.float64)
+    return np.nan_to_num(price_values[1:] / price_values[:-1] - 1.0)
+
+
+def run_backtest(weights, prices, initial_nav=100.0):
+    """비중과 일별 가격 행렬로 NAV, 낙폭, 일간 수익률을 한 번의 행렬 연산으로 계산합니다.
+
+    weights 는 get_portfolio 비중 딕셔너리, 그 목록, 또는 (포트폴리오 x 자산) 비중 행렬입니다.
+    비중은 매일 목표 비중으로 리밸런싱되며, 합이 1에 못 미치는 부분은 현금(수익률 0)으로 봅니다.
+    """
+    asset_returns = _asset_returns(prices)
+    weights = _as_weight_matrix(weights, prices.columns)
+
+    # (T-1 x M) @ (M x N) -> 포트폴리오별 일간 수익률
+    portfolio_returns = np.vstack([np.zeros((1, weights.shape[0])), asset_returns @ weights.T])
+
+    nav = initial_nav * np.cumprod(1.0 + portfolio_returns, axis=0)
+    drawdown = nav / np.maximum.accumulate(nav, axis=0) - 1.0
+    return BacktestResult(prices.index, nav, drawdown, portfolio_returns)
+
+
+@dataclass
+class BatchBacktestResult:
+    """대량 백테스트 결과 (포트폴리오별 요약 + 선택적 NAV 경로)"""
+    dates: pd.DatetimeIndex
+    cumulative_log_return: np.ndarray
+    max_drawdown: np.ndarray
+    nav: np.ndarray = None
+
+    def to_frame(self, labels=None):
+        """포트폴리오별 요약 지표를 데이터프레임으로 반환합니다."""
+        return pd.DataFrame({
+            "누적 수익률": self.cumulative_log_return,
+            "최대 낙폭(MDD)": self.max_drawdown,
+        }, index=labels)
+
+
+def run_batch_backtest(weights, prices, initial_nav=100.0, keep_paths=True, chunk_size=2048):
+    """(N 포트폴리오 x M 자산) 비중 행렬 전체를 한 번에 백테스트합니다.
+
+    포트폴리오 루프 없이 chunk_size 개씩 행렬곱과 누적 최대값으로 계산하며,
+    keep_paths=False 이면 NAV 경로를 보관하지 않아 N이 커도 메모리가 chunk 크기로 제한됩니다.
+    """
+    asset_returns = _asset_returns(prices)
+    weights = _as_weight_matrix(weights, prices.columns)
+    n_portfolios = weights.shape[0]
+
+    cumulative_log_return = np.empty(n_portfolios)
+    max_drawdown = np.empty(n_portfolios)
+    nav = np.empty((len(prices), n_portfolios)) if keep_paths else None
+
+    for start in range(0, n_portfolios, chunk_size):
+        stop = min(start + chunk_size, n_portfolios)
+        chunk_nav = np.empty((len(prices), stop - start))
+        chunk_nav[0] = initial_nav
+        np.cumprod(1.0 + asset_returns @ weights[start:stop].T, axis=0, out=chunk_nav[1:])
+        chunk_nav[1:] *= initial_nav
+
+        cumulative_log_return[start:stop] = np.log(chunk_nav[-1] / chunk_nav[0])
+        running_max = np.maximum.accumulate(chunk_nav, axis=0)
+        max_drawdown[start:stop] = (chunk_nav / running_max - 1.0).min(axis=0)
+        if keep_paths:
+            nav[:, start:stop] = chunk_nav
+
+    return BatchBacktestResult(prices.index, cumulative_log_return, max_drawdown, nav)
+
+
+def perturb_weights(weights, n_samples, scale=0.05, seed=None):
+    """기준 비중 주변으로 무작위 교란한 (n_samples x M) 비중 행렬을 생성합니다.
+
+    보유 중인 자산만 교란하며, 음수 비중은 0으로 자르고 합계는 기준 비중과 같게 맞춥니다.
+    """
+    base = np.asarray(weights, dtype=np.float64).ravel()
+    rng = np.random.default_rng(seed)
+    noise = rng.normal(0.0, scale, (n_samples, base.size)) * (base > 0)
+    samples = np.clip(base + noise, 0.0, None)
+    totals = samples.sum(axis=1, keepdims=True)
+    return samples * (base.sum() / np.where(totals > 0, totals, 1.0))
+
+
+# 리밸런싱 규칙: 없음(매수 후 보유), 월간, 분기, 허용 범위(band) 이탈 시
+REBALANCE_RULES = ("none", "monthly", "quarterly", "band")
+
+
+def rebalance_calendar(dates, rule):
+    """달력 기준 리밸런싱 규칙에서 리밸런싱하는 날(새 월/분기의 첫 거래일) 마스크를 반환합니다."""
+    dates = pd.DatetimeIndex(dates)
+    if rule == "monthly":
+        period = dates.year * 12 + dates.month
+    elif rule == "quarterly":
+        period = dates.year * 4 + dates.quarter
+    else:
+        return np.zeros(len(dates), dtype=bool)
+    period = np.asarray(period)
+    return np.concatenate([[False], period[1:] != period[:-1]])
+
+
+def run_rebalanced_backtest(weights, prices, rule="monthly", band=0.05, cost_bps=0.0, initial_nav=100.0):
+    """리밸런싱 규칙과 거래비용을 반영하여 여러 포트폴리오를 동시에 백테스트합니다.
+
+    보유 비중은 가격 변동에 따라 표류하며, 리밸런싱하는 날 목표 비중으로 되돌리면서
+    거래 금액의 cost_bps(bp)를 비용으로 차감합니다. rule="band" 는 어느 자산이든 목표 비중에서
+    band 이상 벗어난 포트폴리오만 리밸런싱합니다. (BacktestResult, 회전율, 리밸런싱 횟수)를 반환합니다.
+    """
+    if rule not in REBALANCE_RULES:
+        raise ValueError(f"지원하지 않는 리밸런싱 규칙입니다: {rule}")
+    growth = 1.0 + _asset_returns(prices)
+    weights = _as_weight_matrix(weights, prices.columns)
+    cash_weight = 1.0 - weights.sum(axis=1)
+    cost_rate = cost_bps / 10_000
+    calendar = rebalance_calendar(prices.index, rule)
+
+    n_days, n_portfolios = len(prices), weights.shape[0]
+    nav = np.empty((n_days, n_portfolios))
+    nav[0] = initial_nav
+    holdings = weights * initial_nav
+    cash = cash_weight * initial_nav
+    turnover = np.zeros(n_portfolios)
+    rebalances = np.zeros(n_portfolios, dtype=np.int64)
+
+    for t in range(1, n_days):
+        holdings *= growth[t - 1]
+        value = holdings.sum(axis=1) + cash
+
+        if rule == "band":
+            drift = np.abs(holdings / value[:, None] - weights).max(axis=1)
+            rows = np.flatnonzero(drift > band)
+        elif calendar[t]:
+            rows = np.arange(n_portfolios)
+        else:
+            rows = ()
+
+        if len(rows):
+            traded = np.abs(weights[rows] * value[rows, None] - holdings[rows]).sum(axis=1)
+            value[rows] -= traded * cost_rate
+            holdings[rows] = weights[rows] * value[rows, None]
+            cash[rows] = cash_weight[rows] * value[rows]
+            turnover[rows] += traded / value[rows]
+            rebalances[rows] += 1
+        nav[t] = value
+
+    returns = np.vstack([np.zeros((1, n_portfolios)), nav[1:] / nav[:-1] - 1.0])
+    drawdown = nav / np.maximum.accumulate(nav, axis=0) - 1.0
+    return BacktestResult(prices.index, nav, drawdown, returns), turnover, rebalances
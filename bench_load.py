@@ -0,0 +1,289 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+
+from bench_sessions import DEFAULT_APP, profile_answers, survey_answers
+
+# 설문 응답 -> 사이드바 선택 상자 레이블
+SURVEY_LABELS = {
+    "goal": "당신의 투자 목표는 무엇인가요?",
+    "experience": "투자 경험은 얼마나 되십니까?",
+    "market": "갑작스러운 시장 변동에 어떻게 대처하시겠습니까?",
+    "risk": "리스크 허용 수준에 대해 평가해주세요.",
+    "horizon": "당신이 생각하는 적정 투자기간은 어느정도인가요?",
+}
+PORTFOLIO_BUTTON = "포트폴리오 보기 🚀"
+BACKTEST_BUTTON = "📄 백테스트 결과 보기"
+# 화면마다 항상 그려지는 버튼 (화면 전환 확인용)
+PAGE_MARKERS = {"portfolio": BACKTEST_BUTTON, "backtest": "🔙 추천 포트폴리오로 돌아가기"}
+PERCENTILES = (50, 95, 99)
+HOST = "127.0.0.1"
+# 예열 반복 횟수. 첫 회는 공유 캐시를 채우고, 두 번째 회에서 캐시 계산 중 생긴 임시 메모리가 정리되어 기준 RSS 가 안정됨
+WARMUP_ROUNDS = 2
+
+
+def free_port():
+    """localhost 에서 비어 있는 TCP 포트"""
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def start_server(app_path, port):
+    """앱 폴더에서 streamlit run 서버를 localhost 에만 열어 시작합니다."""
+    command = [
+        sys.executable, "-m", "streamlit", "run", os.path.basename(app_path),
+        "--server.address", HOST, "--server.port", str(port), "--server.headless", "true",
+        "--browser.gatherUsageStats", "false", "--server.fileWatcherType", "none",
+    ]
+    return subprocess.Popen(command, cwd=os.path.dirname(app_path),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_until_healthy(port, process, timeout=60):
+    """서버의 상태 확인 엔드포인트가 응답할 때까지 기다립니다."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"streamlit 서버가 종료되었습니다. (코드 {process.returncode})")
+        try:
+            with urllib.request.urlopen(f"http://{HOST}:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError(f"{timeout}초 안에 streamlit 서버가 시작되지 않았습니다.")
+
+
+def process_memory_mb(pid):
+    """다른 프로세스의 상주 메모리(RSS, MB). /proc 가 없으면 None"""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class VirtualUser:
+    """브라우저 대신 웹소켓으로 앱 세션 하나를 조작하는 가상 사용자
+
+    브라우저처럼 재실행마다 현재 화면에 있는 위젯 상태를 모두 보내고, 요청을 보낸 뒤 서버가
+    스크립트 실행 완료를 알릴 때까지를 재실행 지연으로 (단계, 초) 기록합니다.
+    """
+
+    def __init__(self, url, timeout=120):
+        self.url = url
+        self.timeout = timeout
+        self.latencies = []  # (단계, 초)
+        self._socket = None
+        self._widgets = {}  # 레이블 -> 위젯 id
+        self._values = {}  # 위젯 id -> WidgetState
+
+    async def connect(self):
+        from websockets.asyncio.client import connect
+
+        self._socket = await connect(self.url, subprotocols=["streamlit"], max_size=None)
+
+    async def close(self):
+        if self._socket is not None:
+            await self._socket.close()
+
+    async def rerun(self, step, trigger=None):
+        """위젯 상태(및 누른 버튼)를 보내 재실행하고, 그려진 위젯과 예외 메시지를 갱신합니다."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        message = BackMsg()
+        message.rerun_script.query_string = ""
+        message.rerun_script.widget_states.widgets.extend(self._values.values())
+        if trigger is not None:
+            message.rerun_script.widget_states.widgets.append(WidgetState(id=trigger, trigger_value=True))
+
+        widgets, errors = {}, []
+        start = time.perf_counter()
+        await self._socket.send(message.SerializeToString())
+        async with asyncio.timeout(self.timeout):
+            while True:
+                forward = ForwardMsg()
+                forward.ParseFromString(await self._socket.recv())
+                kind = forward.WhichOneof("type")
+                if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                    element = forward.delta.new_element
+                    widget = getattr(element, element.WhichOneof("type") or "", None)
+                    if element.WhichOneof("type") == "exception":
+                        errors.append(element.exception.message)
+                    elif getattr(widget, "id", "") and getattr(widget, "label", ""):
+                        widgets[widget.label] = widget.id
+                elif kind == "script_finished":
+                    break
+        self.latencies.append((step, time.perf_counter() - start))
+
+        if errors:
+            raise RuntimeError(f"{step} 단계 오류: {errors[0]}")
+        # 브라우저처럼 이번 실행에 그려지지 않은 위젯의 상태는 버림
+        self._widgets = widgets
+        self._values = {widget_id: value for widget_id, value in self._values.items()
+                        if widget_id in widgets.values()}
+
+    def _widget_id(self, label):
+        if label not in self._widgets:
+            raise LookupError(f"위젯을 찾을 수 없습니다: {label}")
+        return self._widgets[label]
+
+    async def select(self, step, label, value):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        widget_id = self._widget_id(label)
+        self._values[widget_id] = WidgetState(id=widget_id, string_value=value)
+        await self.rerun(step)
+
+    async def navigate(self, step, button, page):
+        """화면 전환 버튼을 더블클릭합니다. (첫 재실행은 페이지 상태만 바꾸고, 두 번째 재실행이 새 화면을 그림)"""
+        widget_id = self._widget_id(button)
+        await self.rerun(f"{step}.click", trigger=widget_id)
+        await self.rerun(f"{step}.render", trigger=widget_id)
+        if PAGE_MARKERS[page] not in self._widgets:
+            raise RuntimeError(f"{step} 단계 후 {page} 화면이 아닙니다.")
+
+    async def browse(self, answers):
+        """설문 응답 -> 포트폴리오 보기 -> 백테스트 결과 보기 순서로 한 세션을 진행합니다."""
+        await self.connect()
+        await self.rerun("survey.load")
+        for field, label in SURVEY_LABELS.items():
+            await self.select("survey.answer", label, answers[field])
+        await self.navigate("portfolio", PORTFOLIO_BUTTON, "portfolio")
+        await self.navigate("backtest", BACKTEST_BUTTON, "backtest")
+
+
+def latency_summary(seconds):
+    """재실행 시간 목록의 횟수, 평균과 백분위(ms)"""
+    values = np.asarray(seconds, dtype=np.float64) * 1000
+    if not len(values):
+        return {"count": 0}
+    summary = {"count": int(len(values)), "mean_ms": float(values.mean())}
+    for level, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+        summary[f"p{level}_ms"] = float(value)
+    summary["max_ms"] = float(values.max())
+    return summary
+
+
+async def _run_users(url, users, sessions_per_user, answers, timeout):
+    """users 명이 동시에 각자 sessions_per_user 개의 세션을 차례로 진행합니다. 세션 연결은 끝까지 유지합니다."""
+    sessions, failures = [], []
+
+    async def user_loop():
+        for _ in range(sessions_per_user):
+            user = VirtualUser(url, timeout)
+            sessions.append(user)
+            try:
+                await user.browse(next(answers))
+            except Exception as error:
+                failures.append(f"{type(error).__name__}: {error}")
+
+    await asyncio.gather(*(user_loop() for _ in range(users)))
+    return sessions, failures
+
+
+async def _close_all(sessions):
+    await asyncio.gather(*(user.close() for user in sessions), return_exceptions=True)
+
+
+def run_load_test(app_path=DEFAULT_APP, users=8, sessions_per_user=5, warmup=True, timeout=120, log=print):
+    """localhost 에 띄운 streamlit 서버에 users 명의 가상 사용자가 동시에 접속하여 재실행 지연을 측정합니다.
+
+    실제 서버를 쓰므로 세션 간 공유 캐시, 스크립트 실행 스레드와 GIL 경합, 메시지 직렬화가 모두 반영됩니다.
+    예열 단계는 모든 (위험성향, 투자 기간) 프로필을 WARMUP_ROUNDS 번씩 진행하여 공유 캐시를 채웁니다.
+    세션당 메모리는 측정한 세션을 모두 연결해 둔 채 잰 서버 RSS 증가분입니다.
+    """
+    app_path = os.path.abspath(app_path)
+    port = free_port()
+    url = f"ws://{HOST}:{port}/_stcore/stream"
+
+    async def measure():
+        warmed = []
+        if warmup:
+            # 예열 세션도 끝까지 연결해 두어 측정 중에 정리되며 RSS 가 줄어드는 일이 없게 함
+            profiles = profile_answers() * WARMUP_ROUNDS
+            warmed, failures = await _run_users(url, 1, len(profiles), iter(profiles), timeout)
+            if failures:
+                raise RuntimeError(f"예열 실패: {failures[0]}")
+        baseline_mb = process_memory_mb(server.pid)
+        started = time.perf_counter()
+        sessions, failures = await _run_users(url, users, sessions_per_user, survey_answers(), timeout)
+        elapsed = time.perf_counter() - started
+        rss_mb = process_memory_mb(server.pid)
+        await _close_all(warmed + sessions)
+        return sessions, failures, elapsed, baseline_mb, rss_mb
+
+    server = start_server(app_path, port)
+    try:
+        wait_until_healthy(port, server)
+        sessions, failures, elapsed, baseline_mb, rss_mb = asyncio.run(measure())
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    latencies = [latency for user in sessions for latency in user.latencies]
+    steps = {}
+    for step, seconds in latencies:
+        steps.setdefault(step, []).append(seconds)
+    completed = len(sessions) - len(failures)
+    result = {
+        "app": app_path,
+        "users": users,
+        "sessions": len(sessions),
+        "failures": failures,
+        "elapsed_s": elapsed,
+        "reruns_per_s": len(latencies) / elapsed,
+        "sessions_per_s": completed / elapsed,
+        "rerun_latency": latency_summary([seconds for _, seconds in latencies]),
+        "step_latency": {step: latency_summary(values) for step, values in steps.items()},
+        "baseline_rss_mb": baseline_mb,
+        "rss_mb": rss_mb,
+        "rss_per_session_kb": ((rss_mb - baseline_mb) * 1024 / len(sessions)
+                               if rss_mb is not None and baseline_mb is not None and sessions else None),
+    }
+    overall = result["rerun_latency"]
+    log(f"사용자 {users}명, 세션 {len(sessions)}개 (실패 {len(failures)}개), {elapsed:.1f}초")
+    if overall["count"]:
+        log(f"재실행 {overall['count']}회: p50 {overall['p50_ms']:.0f} ms, p95 {overall['p95_ms']:.0f} ms, "
+            f"p99 {overall['p99_ms']:.0f} ms, 처리량 {result['reruns_per_s']:.1f} 회/초 "
+            f"({result['sessions_per_s']:.2f} 세션/초)")
+    for step, summary in result["step_latency"].items():
+        log(f"  {step:<18} {summary['count']:5d}회  p50 {summary['p50_ms']:7.0f} ms  p95 {summary['p95_ms']:7.0f} ms  "
+            f"p99 {summary['p99_ms']:7.0f} ms")
+    if result["rss_per_session_kb"] is not None:
+        log(f"서버 RSS {baseline_mb:.1f} -> {rss_mb:.1f} MB (세션당 {result['rss_per_session_kb']:.1f} KB)")
+    return result
+
+
+if __name__ == "__main__":
+    # 사용법: python bench_load.py [--users 8] [--sessions-per-user 5] [--no-warmup] [--output 결과.json]
+    # localhost 에 streamlit 서버를 띄워 측정합니다. 실패한 세션이 있거나 --p95-budget-ms 를 넘으면 종료 코드 1
+    parser = argparse.ArgumentParser(description="설문 -> 포트폴리오 -> 백테스트 동시 사용자 부하 테스트")
+    parser.add_argument("--app", default=DEFAULT_APP)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--sessions-per-user", type=int, default=5)
+    parser.add_argument("--no-warmup", action="store_true", help="공유 캐시를 미리 채우지 않고 측정")
+    parser.add_argument("--p95-budget-ms", type=float, default=None, help="전체 재실행 p95 상한")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    result = run_load_test(args.app, args.users, args.sessions_per_user, warmup=not args.no_warmup)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(result, file, ensure_ascii=False, indent=2)
+    over_budget = args.p95_budget_ms is not None and result["rerun_latency"].get("p95_ms", 0) > args.p95_budget_ms
+    raise SystemExit(1 if result["failures"] or over_budget else 0)
@@ -0,0 +1,124 @@
+import argparse
+import ctypes
+import gc
+import itertools
+import json
+import os
+import sys
+import time
+
+from bulk_scoring import SURVEY_COLUMNS
+from portfolio_core import SurveyAnswers, score_survey
+from portfolios import HORIZONS, RISK_LEVELS
+from session_memory import ARTIFACTS_KEY
+
+DEFAULT_APP = "via_Streamlit_v2.py"
+# RSS 를 기록할 세션 수
+CHECKPOINTS = (1, 10, 50, 100, 250, 500)
+
+
+def resident_memory_mb():
+    """현재 프로세스의 상주 메모리(RSS, MB). /proc 가 없으면 최대 RSS 로 대신합니다.
+
+    해제된 객체가 RSS 에 남지 않도록 GC 후 glibc 의 빈 힙 페이지를 운영체제에 돌려준 뒤 잽니다.
+    """
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+    try:
+        with open("/proc/self/status", encoding="ascii") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def survey_answers():
+    """모든 설문 응답 조합을 순환하는 (응답 dict) 생성기. 세션마다 다른 프로필이 고르게 섞입니다."""
+    columns = {column: list(mapping) for column, mapping in SURVEY_COLUMNS.items()}
+    for values in itertools.cycle(itertools.product(*columns.values(), HORIZONS)):
+        yield dict(zip([*columns, "horizon"], values))
+
+
+def open_session(app_path, answers, timeout=120):
+    """AppTest 세션 하나로 설문 -> 포트폴리오 -> 백테스트 화면을 차례로 렌더링합니다."""
+    from streamlit.testing.v1 import AppTest
+
+    session = AppTest.from_file(app_path, default_timeout=timeout)
+    session.run()
+    for field, value in answers.items():
+        session.session_state[f"user_{field}"] = value
+    for page in ("portfolio", "backtest"):
+        session.session_state.page = page
+        session.run()
+        if session.exception:
+            raise RuntimeError(f"{page} 화면 오류: {session.exception[0].value}")
+    return session
+
+
+def profile_answers():
+    """(위험성향, 투자 기간) 프로필마다 그 프로필이 되는 설문 응답 하나씩"""
+    answers = {}
+    for answer in itertools.islice(survey_answers(), 10_000):
+        answers.setdefault((score_survey(SurveyAnswers(**answer))[1], answer["horizon"]), answer)
+        if len(answers) == len(RISK_LEVELS) * len(HORIZONS):
+            break
+    return list(answers.values())
+
+
+def warm_profiles(app_path):
+    """모든 프로필을 한 번씩 열어 공유 캐시를 채웁니다."""
+    for answer in profile_answers():
+        open_session(app_path, answer)
+
+
+def run_load_test(app_path=DEFAULT_APP, sessions=500, checkpoints=CHECKPOINTS, log=print):
+    """sessions 개의 세션 상태를 유지한 채 세션 수별 RSS 와 세션 전용 파생 결과 크기를 기록합니다.
+
+    서버가 세션마다 보관하는 것은 세션 상태뿐이므로, AppTest 가 렌더링 결과로 들고 있는 요소 트리는
+    버리고 세션 상태만 남깁니다. 공유 캐시를 채우는 첫 세션은 기준 RSS 측정 전에 한 번 실행합니다.
+    """
+    app_path = os.path.abspath(app_path)
+    os.chdir(os.path.dirname(app_path))
+    warm_profiles(app_path)
+    baseline_mb = resident_memory_mb()
+    answers = survey_answers()
+    opened, rows = [], []
+    started = time.perf_counter()
+    for count in range(1, sessions + 1):
+        opened.append(open_session(app_path, next(answers)).session_state)
+        if count in checkpoints or count == sessions:
+            rss_mb = resident_memory_mb()
+            artifact_bytes = sum(state[ARTIFACTS_KEY].nbytes for state in opened if ARTIFACTS_KEY in state)
+            rows.append({
+                "sessions": count,
+                "rss_mb": rss_mb,
+                "rss_per_session_kb": (rss_mb - baseline_mb) * 1024 / count,
+                "session_artifacts_mb": artifact_bytes / (1024 * 1024),
+                "elapsed_s": time.perf_counter() - started,
+            })
+            log(f"세션 {count:4d}개: RSS {rss_mb:8.1f} MB (세션당 {rows[-1]['rss_per_session_kb']:7.1f} KB), "
+                f"세션 파생 결과 {rows[-1]['session_artifacts_mb']:.2f} MB")
+    return {"app": app_path, "baseline_rss_mb": baseline_mb, "checkpoints": rows}
+
+
+if __name__ == "__main__":
+    # 사용법: python bench_sessions.py [--sessions 500] [--output 결과.json]
+    # 한 프로세스에서 세션을 열어 둔 채 늘려 가며 상주 메모리를 측정합니다. (세션 상한: VIA_SESSION_BUDGET_MB)
+    parser = argparse.ArgumentParser(description="동시 세션 수에 따른 상주 메모리(RSS) 부하 테스트")
+    parser.add_argument("--app", default=DEFAULT_APP)
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    result = run_load_test(args.app, args.sessions)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(result, file, ensure_ascii=False, indent=2)
@@ -0,0 +1,80 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# 설문 화면에서 로드되면 안 되는 무거운 라이브러리
+HEAVY_MODULES = ("matplotlib", "seaborn", "plotly.express", "precompute", "simulation", "sweep")
+DEFAULT_APP = "via_Streamlit_v2.py"
+# 결과 묶음 미리 계산 스위치. 첫 렌더 뒤 백그라운드에서 무거운 모듈을 임포트하므로 측정 중에는 끔
+WARMUP_ENV = "VIA_WARMUP"
+
+# 새 프로세스에서 실행하는 측정 코드 (이미 로드된 모듈이 결과에 섞이지 않도록)
+_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.run()
+rendered = time.perf_counter()
+print(json.dumps({
+    "streamlit_import_ms": (imported - start) * 1000,
+    "first_render_ms": (rendered - imported) * 1000,
+    "total_ms": (rendered - start) * 1000,
+    "exception": [str(e.value) for e in at.exception],
+    "loaded_heavy_modules": [name for name in sys.argv[2:] if name in sys.modules],
+}))
+"""
+
+
+def measure_cold_start(app_path=DEFAULT_APP, heavy_modules=HEAVY_MODULES):
+    """새 파이썬 프로세스에서 앱의 첫 화면(설문)을 한 번 렌더링하고 시간을 측정합니다."""
+    directory = os.path.dirname(os.path.abspath(app_path))
+    output = subprocess.run(
+        [sys.executable, "-c", _CHILD, os.path.abspath(app_path), *heavy_modules],
+        cwd=directory, capture_output=True, text=True, check=True, env={**os.environ, WARMUP_ENV: "0"},
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_benchmark(app_path=DEFAULT_APP, repeat=5):
+    """measure_cold_start 를 repeat 번 반복하여 중앙값과 최댓값을 요약합니다."""
+    runs = [measure_cold_start(app_path) for _ in range(repeat)]
+    summary = {"app": app_path, "repeat": repeat}
+    for name in ("streamlit_import_ms", "first_render_ms", "total_ms"):
+        values = [run[name] for run in runs]
+        summary[name] = {"median": statistics.median(values), "max": max(values)}
+    summary["exception"] = sorted({message for run in runs for message in run["exception"]})
+    summary["loaded_heavy_modules"] = sorted({name for run in runs for name in run["loaded_heavy_modules"]})
+    return summary
+
+
+if __name__ == "__main__":
+    # 사용법: python bench_startup.py [--repeat N] [--budget-ms 밀리초] [--output 결과.json]
+    # 예산 초과, 예외, 무거운 라이브러리 로드 시 종료 코드 1 (CI 에서 회귀 감지용)
+    parser = argparse.ArgumentParser(description="설문 화면 콜드 스타트(임포트 + 첫 렌더) 시간 측정")
+    parser.add_argument("--app", default=DEFAULT_APP)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=None, help="first_render_ms 중앙값 상한")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    result = run_benchmark(args.app, args.repeat)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text)
+
+    failures = []
+    if result["exception"]:
+        failures.append("앱 실행 중 예외가 발생했습니다.")
+    if result["loaded_heavy_modules"]:
+        failures.append(f"설문 화면에서 무거운 모듈이 로드되었습니다: {result['loaded_heavy_modules']}")
+    if args.budget_ms is not None and result["first_render_ms"]["median"] > args.budget_ms:
+        failures.append(f"첫 렌더 시간이 예산 {args.budget_ms:.0f}ms 를 넘었습니다.")
+    if failures:
+        sys.exit("\n".join(failures))
@@ -0,0 +1,287 @@
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from analytics import ReturnAnalytics
+from bulk_scoring import SURVEY_COLUMNS, score_frame
+from data_store import (DATA_CACHE_PATH, build_store, load_cached_store, open_price_store, parse_asset_stats,
+                        parse_nav_series, parse_price_matrix, save_store, write_price_store)
+from downsample import chart_points
+from portfolio_core import PERIOD_WINDOWS, calculate_risk_score
+from portfolios import HORIZONS, RISK_LEVELS, get_portfolio
+from precompute import create_backtest_charts
+from risk import portfolio_variance
+
+# 합성 데이터 크기 (행 수: 실제 백테스트 파일 345행 ~ 1천만 행, 자산 수: 13 ~ 5,000개)
+ROW_SIZES = (345, 10_000, 1_000_000, 10_000_000)
+ASSET_SIZES = (13, 500, 5_000)
+# 가격 행렬 벤치마크의 날짜 수 (30년 일별)
+PRICE_DAYS = 7_560
+# 호출 단위가 짧은 함수는 한 번 측정에 이만큼 호출
+CALLS = 10_000
+# 벤치마크 하나의 측정 시간 상한 (초). 느린 경우 repeat 보다 적게 반복
+TIME_BUDGET = 30.0
+
+
+def synthetic_nav_frame(rows, seed=0):
+    """Date/NAV/MDD 합성 백테스트 데이터 (1천만 행도 날짜 범위를 넘지 않도록 분 단위 날짜)"""
+    rng = np.random.default_rng(seed)
+    nav = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, rows)))
+    return pd.DataFrame({
+        "Date": pd.date_range("2000-01-01", periods=rows, freq="min"),
+        "NAV": nav,
+        "MDD": nav / np.maximum.accumulate(nav) - 1.0,
+    })
+
+
+def synthetic_asset_frame(assets, seed=0):
+    """Asset/ExpectedReturn/Volatility 합성 자산 통계"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Asset": [f"A{i:05d}" for i in range(assets)],
+        "ExpectedReturn": rng.uniform(0.0, 0.2, assets).round(4),
+        "Volatility": rng.uniform(0.02, 0.4, assets).round(4),
+    })
+
+
+def synthetic_price_frame(assets, days=PRICE_DAYS, seed=0):
+    """Date + 티커 열의 합성 일별 가격 데이터"""
+    rng = np.random.default_rng(seed)
+    prices = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, (days, assets)), axis=0))
+    frame = pd.DataFrame(prices.round(2), columns=[f"A{i:05d}" for i in range(assets)])
+    frame.insert(0, "Date", pd.bdate_range("1995-01-02", periods=days))
+    return frame
+
+
+def synthetic_surveys(rows, seed=0):
+    """모든 응답 조합이 섞인 합성 설문 데이터"""
+    rng = np.random.default_rng(seed)
+    columns = {column: list(mapping) for column, mapping in SURVEY_COLUMNS.items()}
+    columns["horizon"] = list(HORIZONS)
+    return pd.DataFrame({
+        column: pd.Categorical.from_codes(rng.integers(0, len(values), rows), values)
+        for column, values in columns.items()
+    })
+
+
+def _nav_csv(directory, rows):
+    path = os.path.join(directory, f"back_data_{rows}.csv")
+    if not os.path.exists(path):
+        synthetic_nav_frame(rows).to_csv(path, index=False, date_format="%Y-%m-%d %H:%M")
+    return path
+
+
+def _asset_csv(directory, assets):
+    path = os.path.join(directory, f"asset_data_{assets}.csv")
+    if not os.path.exists(path):
+        synthetic_asset_frame(assets).to_csv(path, index=False)
+    return path
+
+
+def _price_csv(directory, assets):
+    path = os.path.join(directory, f"price_data_{assets}.csv")
+    if not os.path.exists(path):
+        synthetic_price_frame(assets).to_csv(path, index=False)
+    return path
+
+
+def _cached_store(directory, rows):
+    # 백테스트 파일 하나만 든 폴더로 npz 캐시를 만들어 캐시 복원 시간을 측정
+    store_dir = os.path.join(directory, f"store_{rows}")
+    os.makedirs(store_dir, exist_ok=True)
+    os.link(_nav_csv(directory, rows), os.path.join(store_dir, "back_data_bench.csv"))
+    store = build_store(store_dir)
+    cache_path = os.path.join(store_dir, DATA_CACHE_PATH)
+    save_store(store, cache_path)
+    return cache_path, store.signature
+
+
+def _parse_backtest_csv(directory, rows):
+    path = _nav_csv(directory, rows)
+    return lambda: parse_nav_series(path)
+
+
+def _load_backtest_cache(directory, rows):
+    cache_path, signature = _cached_store(directory, rows)
+    return lambda: load_cached_store(cache_path, signature)
+
+
+def _parse_price_csv(directory, assets):
+    path = _price_csv(directory, assets)
+    return lambda: parse_price_matrix(path)
+
+
+def _open_price_store(directory, assets):
+    name = os.path.basename(_price_csv(directory, assets))
+    write_price_store(parse_price_matrix(os.path.join(directory, name)), directory, name)
+    # 열기 + 자산 하나의 전체 기간 합계 (실제로 페이지를 읽는 비용 포함)
+    return lambda: open_price_store(directory, name).column(f"A{assets - 1:05d}").sum()
+
+
+def _parse_asset_csv(directory, assets):
+    path = _asset_csv(directory, assets)
+    return lambda: parse_asset_stats(path)
+
+
+def _score_loop(directory, calls):
+    answers = [(goal, experience, market, risk)
+               for goal in SURVEY_COLUMNS["goal"] for experience in SURVEY_COLUMNS["experience"]
+               for market in SURVEY_COLUMNS["market"] for risk in SURVEY_COLUMNS["risk"]]
+    answers = (answers * (calls // len(answers) + 1))[:calls]
+    return lambda: [calculate_risk_score(*answer) for answer in answers]
+
+
+def _score_bulk(directory, rows):
+    surveys = synthetic_surveys(rows)
+    return lambda: score_frame(surveys)
+
+
+def _portfolio_loop(directory, calls):
+    profiles = [(risk, horizon) for risk in RISK_LEVELS for horizon in HORIZONS]
+    profiles = (profiles * (calls // len(profiles) + 1))[:calls]
+    return lambda: [get_portfolio(risk, horizon) for risk, horizon in profiles]
+
+
+def _period_returns(directory, rows):
+    frame = synthetic_nav_frame(rows)
+    return lambda: ReturnAnalytics.from_frame(frame).period_returns(PERIOD_WINDOWS)
+
+
+def _backtest_charts(directory, rows):
+    frame = synthetic_nav_frame(rows)
+    return lambda: create_backtest_charts(frame, chart_points())
+
+
+def _variance(directory, assets):
+    rng = np.random.default_rng(0)
+    factors = rng.normal(size=(assets, 20)) * 0.01
+    covariance = factors @ factors.T + np.diag(rng.uniform(1e-4, 1e-3, assets))
+    weights = rng.dirichlet(np.ones(assets), size=6)
+    return lambda: portfolio_variance(weights, covariance)
+
+
+# (이름, 크기 종류, 준비 함수) 목록. 준비 함수는 (임시 폴더, 크기)를 받아 측정할 무인자 함수를 반환
+BENCHMARKS = [
+    ("load_backtest_data.parse_csv", "rows", _parse_backtest_csv),
+    ("load_backtest_data.npz_cache", "rows", _load_backtest_cache),
+    ("load_asset_data.parse_csv", "assets", _parse_asset_csv),
+    ("load_price_data.parse_csv", "assets", _parse_price_csv),
+    ("load_price_data.mmap_store", "assets", _open_price_store),
+    ("calculate_risk_score", "calls", _score_loop),
+    ("calculate_risk_score.bulk", "rows", _score_bulk),
+    ("get_portfolio", "calls", _portfolio_loop),
+    ("backtest_page.period_returns", "rows", _period_returns),
+    ("backtest_page.charts", "rows", _backtest_charts),
+    ("portfolio_variance", "assets", _variance),
+]
+
+
+def time_function(function, repeat=5, time_budget=TIME_BUDGET):
+    """function 을 최대 repeat 번 실행하여 초 단위 통계를 반환합니다. (한 번은 워밍업)"""
+    function()
+    timings = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+        if time.perf_counter() - started > time_budget:
+            break
+    return {
+        "n": len(timings),
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    }
+
+
+def environment():
+    """결과를 커밋 간에 비교할 수 있도록 실행 환경과 커밋을 기록합니다."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run_suite(rows=ROW_SIZES, assets=ASSET_SIZES, repeat=5, name_filter=None, log=print):
+    """모든 벤치마크를 크기별로 실행하여 결과 목록을 반환합니다."""
+    sizes = {"rows": rows, "assets": assets, "calls": (CALLS,)}
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for name, kind, prepare in BENCHMARKS:
+            if name_filter and name_filter not in name:
+                continue
+            for size in sizes[kind]:
+                stats = time_function(prepare(directory, size), repeat)
+                results.append({"name": name, kind: size, **stats})
+                log(f"{name:32s} {kind}={size:<10d} median {stats['median'] * 1000:10.2f} ms")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """baseline 결과 대비 중앙값이 threshold 배 이상 느려진 항목 목록을 반환합니다."""
+    def key(result):
+        return result["name"], result.get("rows"), result.get("assets"), result.get("calls")
+
+    previous = {key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get(key(result))
+        if before is not None and result["median"] > before["median"] * threshold:
+            regressions.append({**result, "baseline_median": before["median"],
+                                "ratio": result["median"] / before["median"]})
+    return regressions
+
+
+if __name__ == "__main__":
+    # 사용법: python bench_suite.py [--rows 345,10000] [--assets 13,500] [--output 결과.json] [--compare 이전.json]
+    parser = argparse.ArgumentParser(description="데이터 로드, 페이지 계산, 차트 생성 벤치마크")
+    parser.add_argument("--rows", default=",".join(map(str, ROW_SIZES)))
+    parser.add_argument("--assets", default=",".join(map(str, ASSET_SIZES)))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", default=None, help="이름에 이 문자열이 들어간 벤치마크만 실행")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", default=None, help="비교할 이전 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=1.25, help="회귀로 판단할 중앙값 배율")
+    args = parser.parse_args()
+
+    suite_results = run_suite(
+        tuple(int(value) for value in args.rows.split(",")),
+        tuple(int(value) for value in args.assets.split(",")),
+        args.repeat, args.filter,
+    )
+    report = {**environment(), "results": suite_results}
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"{len(suite_results)}개 결과를 {args.output} 에 저장했습니다.")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            slower = compare(suite_results, json.load(file), args.threshold)
+        for item in slower:
+            print(f"회귀: {item['name']} {item['ratio']:.2f}배 느려짐")
+        if slower:
+            sys.exit(1)
@@ -0,0 +1,131 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from portfolio_core import (EXPERIENCE_MAPPING, GOAL_MAPPING, MARKET_MAPPING, RISK_MAPPING, RISK_SCORE_BOUNDS,
+                            portfolio_metrics)
+from portfolios import HORIZONS, RISK_LEVELS, get_portfolio
+
+# 설문 응답 열 이름과 점수 매핑
+SURVEY_COLUMNS = {
+    "goal": GOAL_MAPPING,
+    "experience": EXPERIENCE_MAPPING,
+    "market": MARKET_MAPPING,
+    "risk": RISK_MAPPING,
+}
+HORIZON_COLUMN = "horizon"
+# 한 번에 읽고 쓰는 행 수 (메모리 사용량 상한)
+CHUNK_ROWS = 200_000
+
+
+def _category_lookup(values, table):
+    """범주형 열을 {범주: 값} 표로 변환합니다. 범주 수만큼만 dict 조회하고 행에는 배열 인덱싱을 적용합니다.
+
+    표에 없는 값과 결측값은 마지막 원소(기본값)를 받습니다.
+    """
+    values = values if isinstance(values.dtype, pd.CategoricalDtype) else values.astype("category")
+    categories = values.cat.categories
+    lookup = np.array([table.get(category, table[None]) for category in categories] + [table[None]])
+    return lookup[values.cat.codes.to_numpy()]
+
+
+def profile_table():
+    """(위험성향, 투자 기간) 순서의 배분 문자열, 기대수익률, 변동성 배열을 만듭니다.
+
+    Asset 데이터가 없는 조합의 기대수익률/변동성은 NaN 입니다.
+    """
+    allocations, expected_returns, volatilities = [], [], []
+    for risk in RISK_LEVELS:
+        for horizon in HORIZONS:
+            metrics = portfolio_metrics(risk, horizon)
+            allocation = metrics.allocation if metrics is not None else get_portfolio(risk, horizon)[0]
+            allocations.append(" ".join(f"{asset}:{weight}" for asset, weight in allocation.items()))
+            expected_returns.append(metrics.expected_return if metrics is not None else np.nan)
+            volatilities.append(metrics.volatility if metrics is not None else np.nan)
+    return allocations, np.array(expected_returns), np.array(volatilities)
+
+
+def score_frame(surveys, profiles=None):
+    """설문 응답 데이터프레임 전체를 한 번에 채점하고 추천 포트폴리오 정보를 붙입니다.
+
+    profiles 는 profile_table() 결과이며, 여러 청크를 처리할 때 한 번만 만들어 넘기면 됩니다.
+    지원하지 않는 투자 기간의 행은 배분이 비어 있고 지표가 NaN 입니다.
+    """
+    allocations, expected_returns, volatilities = profiles if profiles is not None else profile_table()
+
+    scores = np.zeros(len(surveys), dtype=np.int8)
+    for column, mapping in SURVEY_COLUMNS.items():
+        scores += _category_lookup(surveys[column], {**mapping, None: 0}).astype(np.int8)
+    risk_index = np.digitize(scores, RISK_SCORE_BOUNDS, right=True)
+    horizon_index = _category_lookup(
+        surveys[HORIZON_COLUMN], {**{horizon: i for i, horizon in enumerate(HORIZONS)}, None: -1}
+    )
+
+    # 지원하지 않는 투자 기간은 마지막(빈) 프로필로 보냄
+    n_profiles = len(RISK_LEVELS) * len(HORIZONS)
+    profile_index = np.where(horizon_index >= 0, risk_index * len(HORIZONS) + horizon_index, n_profiles)
+
+    result = surveys.copy()
+    result["score"] = scores
+    result["risk_level"] = pd.Categorical.from_codes(risk_index, RISK_LEVELS)
+    # 배분 문자열은 프로필 수만큼만 만들고 행에는 범주 코드만 저장
+    categories = list(dict.fromkeys(allocations))
+    codes = np.array([categories.index(allocation) for allocation in allocations] + [-1])
+    result["allocation"] = pd.Categorical.from_codes(codes[profile_index], categories)
+    result["expected_return"] = np.append(expected_returns, np.nan)[profile_index]
+    result["volatility"] = np.append(volatilities, np.nan)[profile_index]
+    return result
+
+
+def iter_survey_chunks(file_path, chunk_rows=CHUNK_ROWS):
+    """CSV 또는 Parquet 설문 파일을 chunk_rows 행씩 읽습니다. 응답 열은 범주형으로 읽습니다."""
+    columns = [*SURVEY_COLUMNS, HORIZON_COLUMN]
+    if file_path.endswith(".parquet"):
+        import pyarrow.parquet as pq  # Parquet 입력에만 필요
+
+        for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas().astype({column: "category" for column in columns})
+    else:
+        yield from pd.read_csv(file_path, chunksize=chunk_rows, dtype={column: "category" for column in columns})
+
+
+def score_file(input_path, output_path, chunk_rows=CHUNK_ROWS):
+    """설문 파일을 청크 단위로 채점하여 output_path(CSV 또는 Parquet)에 씁니다. 처리한 행 수를 반환합니다."""
+    profiles = profile_table()
+    writer = None
+    rows = 0
+    try:
+        for chunk in iter_survey_chunks(input_path, chunk_rows):
+            scored = score_frame(chunk, profiles)
+            if output_path.endswith(".parquet"):
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                # 범주 목록이 청크마다 다를 수 있어 문자열로 저장
+                table = pa.Table.from_pandas(scored.astype({"risk_level": str, "allocation": str}),
+                                             preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, table.schema)
+                writer.write_table(table)
+            else:
+                # 지표 값은 프로필 수만큼만 있으므로 범주로 바꿔 행마다 실수를 포맷하지 않음
+                for column in ("expected_return", "volatility"):
+                    scored[column] = scored[column].astype("category").cat.rename_categories(repr)
+                scored.to_csv(output_path, mode="w" if rows == 0 else "a", header=rows == 0, index=False)
+            rows += len(scored)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+if __name__ == "__main__":
+    # 사용법: python bulk_scoring.py 입력.csv|parquet 출력.csv|parquet [청크 행 수]
+    if len(sys.argv) < 3:
+        sys.exit("사용법: python bulk_scoring.py 입력 파일 출력 파일 [청크 행 수]")
+    if not os.path.exists(sys.argv[1]):
+        sys.exit(f"입력 파일이 없습니다: {sys.argv[1]}")
+    count = score_file(sys.argv[1], sys.argv[2], int(sys.argv[3]) if len(sys.argv) > 3 else CHUNK_ROWS)
+    print(f"{count}개 설문을 채점하여 {sys.argv[2]} 에 저장했습니다.")
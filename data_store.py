@@ -0,0 +1,396 @@
+import functools
+import glob
+import json
+import os
+import sys
+import tempfile
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import METRICS
+
+# 일별 자산 가격 데이터 (Date 열 + 티커별 종가 열)
+PRICE_DATA_PATH = "price_data.csv"
+# 투자 기간별 자산 통계 파일
+ASSET_DATA_FILES = {
+    "6개월": "asset_data_단기.csv",
+    "2년": "asset_data_장기.csv",
+}
+# (위험성향, 투자 기간)별 백테스트 결과 파일
+BACKTEST_DATA_FILES = {
+    ("안정추구형", "6개월"): "back_data_단기_RA.csv",
+    ("위험중립형", "6개월"): "back_data_단기_RN.csv",
+    ("공격투자형", "6개월"): "back_data_단기_RT.csv",
+    ("안정추구형", "2년"): "back_data_장기_RA.csv",
+    ("위험중립형", "2년"): "back_data_장기_RN.csv",
+    ("공격투자형", "2년"): "back_data_장기_RT.csv",
+}
+# 컴파일된 데이터 캐시 (python data_store.py 로 생성)
+DATA_CACHE_PATH = ".data_cache.npz"
+# 저장소에 적재하는 파일 패턴
+DATA_FILE_PATTERNS = ("asset_data*.csv", "back_data_*.csv", PRICE_DATA_PATH)
+# 증분 NAV 저장소 폴더 (python nav_pipeline.py 로 생성, 프로필별 하위 폴더)
+NAV_STORE_DIR = "nav_store"
+NAV_STATE_FILE = "state.json"
+# 가격 파일을 컴파일한 메모리 맵 저장소 폴더 (원본 파일별 하위 폴더에 header.json, dates.i8, values.f8)
+PRICE_STORE_DIR = ".price_store"
+PRICE_STORE_VERSION = 1
+
+
+def _readonly(array):
+    array.setflags(write=False)
+    return array
+
+
+@dataclass(frozen=True)
+class AssetStats:
+    """자산별 기대수익률/변동성 (asset_data_단기.csv 등)"""
+    assets: tuple
+    expected_return: np.ndarray
+    volatility: np.ndarray
+
+    def to_frame(self):
+        """원본 파일과 같은 Asset/ExpectedReturn/Volatility 형식으로 반환합니다."""
+        return pd.DataFrame({
+            "Asset": list(self.assets),
+            "ExpectedReturn": self.expected_return,
+            "Volatility": self.volatility,
+        })
+
+
+@dataclass(frozen=True)
+class NavSeries:
+    """날짜별 NAV/MDD 시계열 (back_data_*.csv 등)"""
+    dates: np.ndarray
+    nav: np.ndarray
+    mdd: np.ndarray
+
+    def to_frame(self):
+        """원본 파일과 같은 Date/NAV/MDD 형식으로 반환합니다."""
+        return pd.DataFrame({"Date": self.dates, "NAV": self.nav, "MDD": self.mdd})
+
+
+@dataclass(frozen=True)
+class PriceMatrix:
+    """날짜 x 자산 일별 가격 행렬
+
+    values 가 메모리 맵 배열이면 column/window/to_frame 은 복사 없이 같은 메모리를 가리킵니다.
+    """
+    dates: np.ndarray
+    assets: tuple
+    values: np.ndarray
+
+    @functools.cached_property
+    def asset_index(self):
+        """{티커: 열 번호}"""
+        return {asset: j for j, asset in enumerate(self.assets)}
+
+    def column(self, asset):
+        """자산 하나의 가격 열 (복사 없는 뷰)"""
+        return self.values[:, self.asset_index[asset]]
+
+    def window(self, start=None, end=None):
+        """start <= 날짜 <= end 구간의 PriceMatrix (이진 탐색, 복사 없는 뷰)"""
+        lo = 0 if start is None else np.searchsorted(self.dates, np.datetime64(start, "ns"), side="left")
+        hi = len(self.dates) if end is None else np.searchsorted(self.dates, np.datetime64(end, "ns"), side="right")
+        return PriceMatrix(self.dates[lo:hi], self.assets, self.values[lo:hi])
+
+    def to_frame(self):
+        """Date 인덱스, 티커 열의 데이터프레임으로 반환합니다. (값은 복사하지 않음)"""
+        return pd.DataFrame(self.values, index=pd.DatetimeIndex(self.dates, name="Date"), columns=list(self.assets),
+                            copy=False)
+
+
+@dataclass
+class DataStore:
+    """파일 이름을 키로 하는 메모리 상주 데이터 저장소 (errors: 적재하지 못한 파일 이름 -> 오류 메시지)"""
+    signature: tuple = ()
+    asset_stats: dict = field(default_factory=dict)
+    series: dict = field(default_factory=dict)
+    prices: dict = field(default_factory=dict)
+    errors: dict = field(default_factory=dict)
+
+
+def _to_float(values):
+    """'12.57%', '0.1257 ' 같은 문자열 열을 float64 배열로 변환합니다."""
+    text = pd.Series(values, dtype="string").str.strip()
+    percent = text.str.endswith("%").fillna(False).to_numpy()
+    numbers = pd.to_numeric(text.str.rstrip("%"), errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    numbers[percent] /= 100
+    return numbers
+
+
+def _to_dates(values, file_path):
+    dates = pd.to_datetime(pd.Series(values).astype(str).str.strip(), errors="coerce")
+    if dates.isna().any():
+        raise ValueError(f"{file_path}: 날짜 형식이 잘못된 행이 있습니다.")
+    return dates.to_numpy(dtype="datetime64[ns]")
+
+
+def parse_asset_stats(file_path):
+    """자산 통계 파일을 검증하여 AssetStats 로 변환합니다."""
+    frame = pd.read_csv(file_path, dtype=str)
+    frame.columns = frame.columns.str.strip()
+    missing = {"Asset", "ExpectedReturn", "Volatility"} - set(frame.columns)
+    if missing:
+        raise ValueError(f"{file_path}: 필수 열이 없습니다: {sorted(missing)}")
+    expected_return = _to_float(frame["ExpectedReturn"])
+    volatility = _to_float(frame["Volatility"])
+    if not (np.isfinite(expected_return).all() and np.isfinite(volatility).all()):
+        raise ValueError(f"{file_path}: 숫자가 아닌 값이 있습니다.")
+    if (volatility < 0).any():
+        raise ValueError(f"{file_path}: 변동성은 음수일 수 없습니다.")
+    assets = tuple(frame["Asset"].str.strip())
+    return AssetStats(assets, _readonly(expected_return), _readonly(volatility))
+
+
+def parse_nav_series(file_path):
+    """NAV/MDD 파일을 검증하여 날짜순으로 정렬된 NavSeries 로 변환합니다.
+
+    날짜 열은 'Date' 또는 이름 없는 첫 번째 열(asset_data_단기_RA.csv 등)을 사용합니다.
+    """
+    frame = pd.read_csv(file_path, dtype=str)
+    frame.columns = frame.columns.str.strip()
+    date_column = "Date" if "Date" in frame.columns else frame.columns[0]
+    missing = {"NAV", "MDD"} - set(frame.columns)
+    if missing:
+        raise ValueError(f"{file_path}: 필수 열이 없습니다: {sorted(missing)}")
+    dates = _to_dates(frame[date_column], file_path)
+    nav = _to_float(frame["NAV"])
+    mdd = _to_float(frame["MDD"])
+    if not (np.isfinite(nav).all() and np.isfinite(mdd).all()) or (nav <= 0).any():
+        raise ValueError(f"{file_path}: NAV/MDD 값이 잘못되었습니다.")
+    order = np.argsort(dates, kind="stable")
+    return NavSeries(_readonly(dates[order]), _readonly(nav[order]), _readonly(mdd[order]))
+
+
+def parse_price_matrix(file_path):
+    """가격 파일을 날짜순 PriceMatrix 로 변환합니다. 결측치는 직전 가격으로 채웁니다."""
+    frame = pd.read_csv(file_path)
+    frame.columns = frame.columns.str.strip()
+    if "Date" not in frame.columns:
+        raise ValueError(f"{file_path}: Date 열이 없습니다.")
+    dates = _to_dates(frame.pop("Date"), file_path)
+    order = np.argsort(dates, kind="stable")
+    values = frame.apply(pd.to_numeric, errors="coerce").iloc[order].ffill()
+    return PriceMatrix(
+        _readonly(dates[order]),
+        tuple(values.columns),
+        _readonly(values.to_numpy(dtype=np.float64, na_value=np.nan)),
+    )
+
+
+@METRICS.timed("data_store.csv_read")
+def parse_data_file(file_path):
+    """파일 헤더로 종류를 판별하여 (종류, 값)을 반환합니다."""
+    with open(file_path, encoding="utf-8-sig") as f:
+        header = [column.strip() for column in f.readline().split(",")]
+    if "Asset" in header:
+        return "asset_stats", parse_asset_stats(file_path)
+    if "NAV" in header:
+        return "series", parse_nav_series(file_path)
+    if "Date" in header:
+        return "prices", parse_price_matrix(file_path)
+    raise ValueError(f"{file_path}: 알 수 없는 데이터 파일 형식입니다.")
+
+
+def _price_store_path(data_dir, name):
+    return os.path.join(data_dir, PRICE_STORE_DIR, os.path.splitext(name)[0])
+
+
+def write_price_store(prices, data_dir, name):
+    """PriceMatrix 를 메모리 맵 저장소로 저장하고, 저장소에서 다시 연 PriceMatrix 를 반환합니다.
+
+    값은 열(자산) 우선 순서로 저장하여 자산 하나의 가격이 연속된 메모리가 되게 합니다.
+    헤더에는 원본 파일의 크기/수정시각을 기록해 원본이 바뀌면 다시 만들도록 합니다.
+    """
+    path = _price_store_path(data_dir, name)
+    os.makedirs(path, exist_ok=True)
+    stat = os.stat(os.path.join(data_dir, name))
+    header = {
+        "version": PRICE_STORE_VERSION,
+        "source": [name, stat.st_size, stat.st_mtime_ns],
+        "rows": len(prices.dates),
+        "assets": list(prices.assets),
+    }
+    # 값, 날짜, 헤더 순으로 교체: 헤더가 바뀌기 전에는 이전 헤더와 크기가 맞지 않아 읽지 않음
+    values = np.ascontiguousarray(prices.values.T, dtype="<f8")
+    dates = prices.dates.astype("datetime64[ns]").astype("<i8")
+    _write_replace(path, "values.f8", values.tofile)
+    _write_replace(path, "dates.i8", dates.tofile)
+    _write_replace(path, "header.json", lambda file: file.write(json.dumps(header, ensure_ascii=False).encode("utf-8")))
+    return open_price_store(data_dir, name)
+
+
+def _write_replace(path, file_name, write):
+    """프로세스마다 다른 임시 파일에 write(파일)로 쓴 뒤 file_name 으로 교체합니다.
+
+    여러 프로세스가 동시에 같은 저장소를 만들어도 서로의 임시 파일을 덮어쓰지 않으며,
+    같은 원본에서 만든 내용이므로 마지막으로 교체한 쪽의 파일이 남아도 됩니다.
+    """
+    fd, temp_path = tempfile.mkstemp(prefix=file_name + ".", suffix=".tmp", dir=path)
+    try:
+        with os.fdopen(fd, "wb") as file:
+            write(file)
+        os.replace(temp_path, os.path.join(path, file_name))
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def open_price_store(data_dir, name):
+    """원본 가격 파일과 일치하는 메모리 맵 저장소를 읽기 전용으로 엽니다. 없거나 오래되었으면 None
+
+    여러 세션과 프로세스가 같은 파일을 매핑하므로 물리 메모리에는 운영체제 페이지 캐시 한 벌만 올라갑니다.
+    """
+    path = _price_store_path(data_dir, name)
+    header_path = os.path.join(path, "header.json")
+    if not os.path.exists(header_path):
+        return None
+    with open(header_path, encoding="utf-8") as file:
+        header = json.load(file)
+    stat = os.stat(os.path.join(data_dir, name))
+    rows, assets = header["rows"], tuple(header["assets"])
+    if (header.get("version") != PRICE_STORE_VERSION
+            or header["source"] != [name, stat.st_size, stat.st_mtime_ns]
+            or os.path.getsize(os.path.join(path, "values.f8")) != rows * len(assets) * 8
+            or os.path.getsize(os.path.join(path, "dates.i8")) != rows * 8):
+        return None
+    if rows == 0 or not assets:
+        return PriceMatrix(np.empty(0, dtype="datetime64[ns]"), assets, np.empty((rows, len(assets))))
+    dates = np.memmap(os.path.join(path, "dates.i8"), dtype="<i8", mode="r", shape=(rows,))
+    values = np.memmap(os.path.join(path, "values.f8"), dtype="<f8", mode="r", shape=(rows, len(assets)),
+                       order="F")
+    return PriceMatrix(dates.view("datetime64[ns]"), assets, values)
+
+
+def data_files(data_dir="."):
+    """저장소에 적재할 데이터 파일 목록을 반환합니다."""
+    paths = set()
+    for pattern in DATA_FILE_PATTERNS:
+        paths.update(glob.glob(os.path.join(data_dir, pattern)))
+    return sorted(paths)
+
+
+def data_signature(data_dir="."):
+    """데이터 파일들의 (이름, 크기, 수정시각) 목록. 파일이 바뀌면 값이 달라집니다.
+
+    증분 NAV 저장소는 추가가 끝날 때마다 상태 파일을 교체하므로 상태 파일만 포함합니다.
+    """
+    signature = []
+    state_files = glob.glob(os.path.join(data_dir, NAV_STORE_DIR, "*", NAV_STATE_FILE))
+    for path in data_files(data_dir) + sorted(state_files):
+        stat = os.stat(path)
+        signature.append((os.path.relpath(path, data_dir), stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
+
+
+def build_store(data_dir="."):
+    """데이터 파일을 모두 파싱하여 DataStore 를 만듭니다.
+
+    형식이 잘못된 파일은 건너뛰고 store.errors 에 기록하므로, 그 파일을 쓰지 않는 화면은 영향을 받지 않습니다.
+    """
+    store = DataStore(signature=data_signature(data_dir))
+    for path in data_files(data_dir):
+        name = os.path.basename(path)
+        try:
+            prices = open_price_store(data_dir, name)
+            if prices is not None:
+                store.prices[name] = prices
+                continue
+            kind, value = parse_data_file(path)
+            if kind == "prices":
+                # 가격 행렬은 메모리 맵 저장소로 옮겨 프로세스 간에 공유
+                value = write_price_store(value, data_dir, name)
+        except ValueError as error:
+            store.errors[name] = str(error)
+            continue
+        getattr(store, kind)[name] = value
+    return store
+
+
+def save_store(store, cache_path):
+    """DataStore 를 npz 파일로 저장합니다. 가격 행렬은 메모리 맵 저장소에 있으므로 이름만 기록합니다."""
+    arrays = {"signature": np.array(json.dumps(store.signature)),
+              "price_files": np.array(list(store.prices), dtype=str),
+              "errors": np.array(json.dumps(store.errors, ensure_ascii=False))}
+    for name, stats in store.asset_stats.items():
+        arrays[f"asset_stats/{name}/assets"] = np.array(stats.assets, dtype=str)
+        arrays[f"asset_stats/{name}/expected_return"] = stats.expected_return
+        arrays[f"asset_stats/{name}/volatility"] = stats.volatility
+    for name, series in store.series.items():
+        arrays[f"series/{name}/dates"] = series.dates.astype(np.int64)
+        arrays[f"series/{name}/nav"] = series.nav
+        arrays[f"series/{name}/mdd"] = series.mdd
+    # 프로세스마다 다른 임시 파일에 쓴 뒤 교체 (동시에 저장해도 서로의 파일을 덮어쓰지 않음)
+    fd, temp_path = tempfile.mkstemp(suffix=".tmp.npz", dir=os.path.dirname(os.path.abspath(cache_path)))
+    try:
+        with os.fdopen(fd, "wb") as file:
+            np.savez(file, **arrays)
+        os.replace(temp_path, cache_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+@METRICS.timed("data_store.cache_load")
+def load_cached_store(cache_path, signature):
+    """npz 캐시의 시그니처가 현재 파일과 같으면 DataStore 를 복원하고, 아니면 None 을 반환합니다."""
+    if not os.path.exists(cache_path):
+        return None
+    with np.load(cache_path, allow_pickle=False) as cache:
+        cached_signature = tuple(tuple(item) for item in json.loads(str(cache["signature"])))
+        if cached_signature != signature or "price_files" not in cache.files:
+            return None
+        price_files = list(cache["price_files"])
+        errors = json.loads(str(cache["errors"])) if "errors" in cache.files else {}
+        groups = {}
+        for key in cache.files:
+            if key in ("signature", "price_files", "errors"):
+                continue
+            kind, name, column = key.split("/")
+            groups.setdefault((kind, name), {})[column] = cache[key]
+
+    store = DataStore(signature=signature, errors=errors)
+    for name in price_files:
+        prices = open_price_store(os.path.dirname(cache_path), name)
+        if prices is None:
+            return None
+        store.prices[name] = prices
+    for (kind, name), columns in groups.items():
+        if kind == "asset_stats":
+            value = AssetStats(tuple(columns["assets"]), _readonly(columns["expected_return"]),
+                               _readonly(columns["volatility"]))
+        else:
+            value = NavSeries(_readonly(columns["dates"].astype("datetime64[ns]")),
+                              _readonly(columns["nav"]), _readonly(columns["mdd"]))
+        getattr(store, kind)[name] = value
+    return store
+
+
+_stores = {}
+
+
+def get_store(data_dir="."):
+    """프로세스 전체에서 공유하는 DataStore 를 반환합니다.
+
+    파일 시그니처가 바뀌었을 때만 다시 적재하며, 컴파일된 캐시(DATA_CACHE_PATH)가
+    최신이면 CSV 파싱 없이 캐시에서 복원합니다.
+    """
+    key = os.path.abspath(data_dir)
+    signature = data_signature(data_dir)
+    store = _stores.get(key)
+    if store is None or store.signature != signature:
+        store = load_cached_store(os.path.join(data_dir, DATA_CACHE_PATH), signature) or build_store(data_dir)
+        _stores[key] = store
+    return store
+
+
+if __name__ == "__main__":
+    # 사용법: python data_store.py [데이터 폴더]
+    directory = sys.argv[1] if len(sys.argv) > 1 else "."
+    compiled = build_store(directory)
+    save_store(compiled, os.path.join(directory, DATA_CACHE_PATH))
+    print(f"{len(data_files(directory))}개 파일을 {DATA_CACHE_PATH} 로 컴파일했습니다.")
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+# 화면 폭을 알 수 없을 때의 기본값 (px)
+DEFAULT_VIEWPORT_WIDTH = 1280
+# 픽셀당 점 수 (최소/최대 쌍을 그릴 수 있도록 2)
+POINTS_PER_PIXEL = 2
+# 해상도 단계 (캐시 키가 폭마다 달라지지 않도록 가까운 단계로 올림)
+RESOLUTION_STEPS = (800, 1600, 2560, 4096, 7680)
+
+
+def chart_points(headers=None):
+    """요청 헤더의 뷰포트 폭(client hint)으로 차트에 보낼 최대 점 수를 정합니다."""
+    width = DEFAULT_VIEWPORT_WIDTH
+    headers = headers or {}
+    for name in ("Sec-CH-Viewport-Width", "Viewport-Width"):
+        value = headers.get(name)
+        if value and str(value).isdigit():
+            width = int(value)
+            break
+    else:
+        if headers.get("Sec-CH-UA-Mobile") == "?1":
+            width = 412
+    points = width * POINTS_PER_PIXEL
+    return next((step for step in RESOLUTION_STEPS if step >= points), RESOLUTION_STEPS[-1])
+
+
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets 로 선택한 점의 인덱스를 반환합니다."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        # 다음 버킷의 평균점과 직전 선택점으로 만든 삼각형의 넓이가 가장 큰 점을 선택
+        next_x = x[end:next_end].mean()
+        next_y = y[end:next_end].mean()
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """구간마다 최솟값과 최댓값 점을 남기는 인덱스를 반환합니다. (낙폭 저점이 정확히 보존됨)"""
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+    # 양 끝점 2개를 제외한 점 수의 절반만큼 구간을 나눔
+    buckets = np.arange(n) * ((n_out - 2) // 2) // n
+    # 구간 번호, 값 순으로 정렬하면 각 구간의 첫 원소가 최솟값, 마지막 원소가 최댓값
+    order = np.lexsort((y, buckets))
+    sorted_buckets = buckets[order]
+    first = np.flatnonzero(np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]])
+    last = np.r_[first[1:] - 1, n - 1]
+    return np.unique(np.concatenate([order[first], order[last], [0, n - 1]]))
+
+
+def downsample_frame(data, max_points, value_column, method="lttb", date_column="Date"):
+    """시계열 데이터프레임을 max_points 개 이하의 점으로 줄입니다.
+
+    method="lttb" 는 모양을 보존하면서 전체 최솟값/최댓값 점을 반드시 포함하고,
+    method="minmax" 는 구간별 최솟값/최댓값을 모두 남깁니다.
+    """
+    if len(data) <= max_points:
+        return data
+    values = data[value_column].to_numpy(dtype=np.float64)
+    if method == "minmax":
+        indices = minmax_indices(values, max_points)
+    elif method == "lttb":
+        dates = pd.to_datetime(data[date_column]).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        x = (dates - dates[0]) / 1e9
+        indices = lttb_indices(x, values, max_points - 2)
+        indices = np.unique(np.concatenate([indices, [np.argmin(values), np.argmax(values)]]))
+    else:
+        raise ValueError(f"지원하지 않는 다운샘플링 방법입니다: {method}")
+    return data.iloc[indices]
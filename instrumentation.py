@@ -0,0 +1,193 @@
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 환경 변수: Prometheus 텍스트 엔드포인트 포트/주소, 재실행별 JSON 줄 로그 파일, 개발자 오버레이
+METRICS_PORT_ENV = "VIA_METRICS_PORT"
+# 기본값은 localhost 전용. 외부 수집기에 노출하려면 명시적으로 0.0.0.0 등을 지정
+METRICS_HOST_ENV = "VIA_METRICS_HOST"
+DEFAULT_METRICS_HOST = "127.0.0.1"
+METRICS_LOG_ENV = "VIA_METRICS_LOG"
+DEV_OVERLAY_ENV = "VIA_DEV_OVERLAY"
+METRIC_PREFIX = "via"
+
+
+def _label_text(labels):
+    """((이름, 값), ...) 레이블을 {name="value"} 형식으로 변환합니다."""
+    if not labels:
+        return ""
+
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels) + "}"
+
+
+class Metrics:
+    """프로세스 전체에서 공유하는 단계별 타이머와 카운터 (스레드 안전)
+
+    Streamlit 은 세션마다 별도 스레드에서 스크립트를 실행하므로, 한 번의 재실행에서 측정한
+    단계별 시간은 스레드 로컬에 따로 모아 begin_rerun / rerun_timings 로 조회합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.timers = {}  # 단계 이름 -> [횟수, 합계(초), 최대(초)]
+        self.counters = {}  # (이름, 레이블) -> 값
+
+    def observe(self, stage, seconds):
+        """단계 하나의 실행 시간을 기록합니다."""
+        with self._lock:
+            timer = self.timers.setdefault(stage, [0, 0.0, 0.0])
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+        rerun = getattr(self._local, "rerun", None)
+        if rerun is not None:
+            rerun.append((stage, seconds))
+
+    def increment(self, name, amount=1, **labels):
+        """카운터를 증가시킵니다."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    @contextmanager
+    def timer(self, stage):
+        """with 블록의 실행 시간을 stage 로 기록합니다."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def timed(self, stage):
+        """함수 실행 시간을 stage 로 기록하는 데코레이터"""
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.timer(stage):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def begin_rerun(self, page):
+        """현재 스레드의 재실행 측정을 시작합니다."""
+        self._local.rerun = []
+        self._local.rerun_start = time.perf_counter()
+        self.increment("reruns_total", page=page)
+
+    def rerun_timings(self):
+        """현재 재실행에서 지금까지 측정한 (단계, 초) 목록과 경과 시간을 반환합니다."""
+        start = getattr(self._local, "rerun_start", None)
+        elapsed = time.perf_counter() - start if start is not None else 0.0
+        return list(getattr(self._local, "rerun", None) or []), elapsed
+
+    def cache_stats(self):
+        """캐시 로더별 {호출, 미스, 적중률}"""
+        with self._lock:
+            counters = dict(self.counters)
+        stats = {}
+        for (name, labels), value in counters.items():
+            if name in ("cache_calls_total", "cache_misses_total"):
+                entry = stats.setdefault(dict(labels)["loader"], {"calls": 0, "misses": 0})
+                entry["calls" if name == "cache_calls_total" else "misses"] = value
+        for entry in stats.values():
+            entry["hit_rate"] = 1.0 - entry["misses"] / entry["calls"] if entry["calls"] else None
+        return stats
+
+    def to_prometheus(self):
+        """Prometheus 텍스트 노출 형식으로 변환합니다."""
+        with self._lock:
+            timers = {stage: list(values) for stage, values in self.timers.items()}
+            counters = dict(self.counters)
+        lines = []
+        if timers:
+            name = f"{METRIC_PREFIX}_stage_seconds"
+            lines += [f"# HELP {name} 단계별 실행 시간", f"# TYPE {name} summary"]
+            for stage, (count, total, _) in sorted(timers.items()):
+                label = _label_text((("stage", stage),))
+                lines += [f"{name}_count{label} {count}", f"{name}_sum{label} {total:.6f}"]
+            lines += [f"# TYPE {name}_max gauge"]
+            lines += [f"{name}_max{_label_text((('stage', stage),))} {values[2]:.6f}"
+                      for stage, values in sorted(timers.items())]
+        for counter in sorted({name for name, _ in counters}):
+            lines.append(f"# TYPE {METRIC_PREFIX}_{counter} counter")
+            lines += [f"{METRIC_PREFIX}_{name}{_label_text(labels)} {value}"
+                      for (name, labels), value in sorted(counters.items()) if name == counter]
+        return "\n".join(lines) + "\n"
+
+    def log_rerun(self, file_path, page):
+        """현재 재실행의 단계별 시간을 JSON 한 줄로 file_path 에 추가합니다."""
+        timings, elapsed = self.rerun_timings()
+        record = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "page": page,
+            "total_seconds": elapsed,
+            "stages": [{"stage": stage, "seconds": seconds} for stage, seconds in timings],
+        }
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock, open(file_path, "a", encoding="utf-8") as file:
+            file.write(line + "\n")
+
+
+METRICS = Metrics()
+
+
+def instrument_cache(name, cache, metrics=METRICS):
+    """st.cache_data / st.cache_resource 로더의 호출 수와 미스 수를 셉니다.
+
+    cache 는 적용할 캐시 데코레이터입니다. 캐시 안쪽 함수는 미스일 때만 실행되므로
+    그 실행 횟수와 시간이 미스, 바깥 호출 횟수가 전체 호출이 됩니다.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def on_miss(*args, **kwargs):
+            metrics.increment("cache_misses_total", loader=name)
+            with metrics.timer(f"cache_miss.{name}"):
+                return function(*args, **kwargs)
+
+        cached = cache(on_miss)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            metrics.increment("cache_calls_total", loader=name)
+            return cached(*args, **kwargs)
+
+        wrapper.clear = cached.clear
+        return wrapper
+    return decorator
+
+
+def start_metrics_server(port, host=DEFAULT_METRICS_HOST, metrics=METRICS):
+    """GET /metrics 로 Prometheus 텍스트를 제공하는 서버를 데몬 스레드로 시작합니다. (기본: localhost 에서만 접속 가능)"""
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            data = metrics.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+def dev_overlay_enabled(query_params=None):
+    """환경 변수 VIA_DEV_OVERLAY=1 또는 ?dev=1 쿼리로 개발자 오버레이를 켭니다."""
+    if os.environ.get(DEV_OVERLAY_ENV) == "1":
+        return True
+    return bool(query_params) and query_params.get("dev") == "1"
@@ -0,0 +1,191 @@
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from data_store import (BACKTEST_DATA_FILES, NAV_STATE_FILE, NAV_STORE_DIR, PRICE_DATA_PATH, NavSeries, _readonly,
+                        get_store, parse_price_matrix)
+from portfolios import get_portfolio
+
+# 열별 추가 전용 파일 (헤더 없는 리틀 엔디안 배열, 행 수는 상태 파일이 기준)
+COLUMN_FILES = {
+    "dates": ("dates.i8", np.dtype("<i8")),
+    "nav": ("nav.f8", np.dtype("<f8")),
+    "mdd": ("mdd.f8", np.dtype("<f8")),
+}
+INITIAL_NAV = 100.0
+
+
+@dataclass
+class NavState:
+    """증분 계산을 이어가는 데 필요한 마지막 상태"""
+    rows: int
+    last_date: Optional[str]  # ISO 날짜
+    last_nav: float
+    running_max: float
+    weights: Dict[str, float]  # get_portfolio 비중(%)
+    last_prices: Optional[Dict[str, float]]  # 마지막 날짜의 자산 가격 (모르면 None)
+
+
+def store_path(risk, horizon, root=NAV_STORE_DIR):
+    """(위험성향, 투자 기간) 저장소 폴더. 이름은 대응하는 back_data 파일에서 따옵니다."""
+    file_name = BACKTEST_DATA_FILES[(risk, horizon)]
+    return os.path.join(root, os.path.splitext(file_name)[0])
+
+
+def read_state(path):
+    """저장소 상태를 읽습니다. 저장소가 없으면 None 을 반환합니다."""
+    state_path = os.path.join(path, NAV_STATE_FILE)
+    if not os.path.exists(state_path):
+        return None
+    with open(state_path, encoding="utf-8") as file:
+        return NavState(**json.load(file))
+
+
+def _write_state(path, state):
+    # 새 파일을 쓴 뒤 교체하여 읽는 쪽이 반쯤 쓰인 상태를 보지 않게 함
+    temp_path = os.path.join(path, NAV_STATE_FILE + ".tmp")
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(asdict(state), file, ensure_ascii=False)
+    os.replace(temp_path, os.path.join(path, NAV_STATE_FILE))
+
+
+def _append_columns(path, rows, dates, nav, mdd):
+    """열 파일 끝에 새 행을 추가합니다. 이전 추가가 중간에 끊겨 남은 꼬리는 먼저 잘라냅니다."""
+    for column, values in (("dates", dates), ("nav", nav), ("mdd", mdd)):
+        file_name, dtype = COLUMN_FILES[column]
+        with open(os.path.join(path, file_name), "ab") as file:
+            file.truncate(rows * dtype.itemsize)
+            file.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+
+
+def initialize_store(path, weights, series=None):
+    """저장소를 만듭니다. series(NavSeries)가 있으면 그 값을 첫 행들로 씁니다."""
+    os.makedirs(path, exist_ok=True)
+    state = NavState(0, None, INITIAL_NAV, INITIAL_NAV, dict(weights), None)
+    if series is not None and len(series.nav):
+        _append_columns(path, 0, series.dates.astype("datetime64[ns]").astype(np.int64), series.nav, series.mdd)
+        state.rows = len(series.nav)
+        state.last_date = str(pd.Timestamp(series.dates[-1]).date())
+        state.last_nav = float(series.nav[-1])
+        state.running_max = float(series.nav.max())
+    _write_state(path, state)
+    return state
+
+
+def extend_nav(state, prices):
+    """state 이후 날짜의 가격만으로 새 NAV/MDD 행을 계산합니다.
+
+    prices 는 날짜 인덱스와 티커 열을 가진 일별 가격이며, run_backtest 와 같이 매일 목표 비중으로
+    리밸런싱합니다. 계산량은 새 날짜 수에 비례합니다. (날짜, NAV, MDD, 새 상태)를 반환합니다.
+    """
+    assets = list(state.weights)
+    missing = set(assets) - set(prices.columns)
+    if missing:
+        raise KeyError(f"가격 데이터에 {sorted(missing)} 정보가 없습니다.")
+    prices = prices[assets].sort_index()
+    last_date = pd.Timestamp(state.last_date) if state.last_date else None
+
+    # 기준 가격: 저장된 마지막 가격 > 마지막 날짜 이전의 가격 > 새 구간의 첫 가격
+    base = None
+    if state.last_prices is not None:
+        base = np.array([state.last_prices[asset] for asset in assets], dtype=np.float64)
+    new = prices if last_date is None else prices[prices.index > last_date]
+    if base is None and last_date is not None:
+        before = prices[prices.index <= last_date].ffill()
+        if not before.empty:
+            base = before.iloc[-1].to_numpy(dtype=np.float64)
+    values = new.ffill().to_numpy(dtype=np.float64)
+    dates = new.index.to_numpy(dtype="datetime64[ns]")
+    if base is None and len(values):
+        base = values[0]
+        if state.rows:
+            # 마지막 저장일과의 가격 변화를 알 수 없으므로 첫 날은 기준 가격으로만 사용
+            values, dates = values[1:], dates[1:]
+    if not len(values):
+        return dates, np.empty(0), np.empty(0), state
+
+    # 휴장 등으로 비어 있는 가격은 직전 가격으로 채움
+    values = np.where(np.isnan(values), base, values)
+    previous = np.vstack([base, values[:-1]])
+    returns = np.nan_to_num(values / previous - 1.0) @ (np.array(list(state.weights.values())) / 100)
+    nav = state.last_nav * np.cumprod(1.0 + returns)
+    running_max = np.maximum.accumulate(np.maximum(nav, state.running_max))
+    mdd = nav / running_max - 1.0
+
+    new_state = NavState(
+        rows=state.rows + len(nav),
+        last_date=str(pd.Timestamp(dates[-1]).date()),
+        last_nav=float(nav[-1]),
+        running_max=float(running_max[-1]),
+        weights=state.weights,
+        last_prices=dict(zip(assets, values[-1].tolist())),
+    )
+    return dates, nav, mdd, new_state
+
+
+def append_prices(path, prices):
+    """저장소에 새 날짜의 NAV/MDD 만 추가하고 추가한 행 수를 반환합니다."""
+    state = read_state(path)
+    if state is None:
+        raise FileNotFoundError(f"NAV 저장소가 없습니다: {path}")
+    dates, nav, mdd, new_state = extend_nav(state, prices)
+    if len(nav):
+        _append_columns(path, state.rows, dates.astype(np.int64), nav, mdd)
+        _write_state(path, new_state)
+    return len(nav)
+
+
+def load_nav_series(path, state=None):
+    """저장소를 NavSeries 로 읽습니다. 저장소가 없으면 None 을 반환합니다."""
+    state = state or read_state(path)
+    if state is None:
+        return None
+    columns = {}
+    for column, (file_name, dtype) in COLUMN_FILES.items():
+        # 상태 파일에 기록된 행까지만 읽어 추가 중인 꼬리는 무시
+        columns[column] = np.fromfile(os.path.join(path, file_name), dtype=dtype, count=state.rows)
+    return NavSeries(_readonly(columns["dates"].astype("datetime64[ns]")),
+                     _readonly(columns["nav"]), _readonly(columns["mdd"]))
+
+
+def load_profile_series(risk, horizon, root=NAV_STORE_DIR):
+    """프로필의 저장소를 읽습니다. 저장소가 없거나 현재 포트폴리오 비중과 다르면 None 을 반환합니다."""
+    path = store_path(risk, horizon, root)
+    state = read_state(path)
+    if state is None or state.rows == 0 or state.weights != get_portfolio(risk, horizon)[0]:
+        return None
+    return load_nav_series(path, state)
+
+
+def update_all(prices, root=NAV_STORE_DIR, data_dir="."):
+    """모든 프로필 저장소에 새 가격을 반영합니다. {(위험성향, 투자 기간): 추가한 행 수}
+
+    저장소가 없으면 back_data 결과 파일을 첫 행들로 하여 만들고, 결과 파일도 없으면 가격 데이터의
+    첫 날을 NAV 100 으로 시작합니다.
+    """
+    store = get_store(data_dir)
+    appended = {}
+    for (risk, horizon), file_name in BACKTEST_DATA_FILES.items():
+        path = store_path(risk, horizon, os.path.join(data_dir, root))
+        weights = get_portfolio(risk, horizon)[0]
+        state = read_state(path)
+        if state is None or state.weights != weights:
+            # 비중이 바뀌면 이전 경로와 이어 붙일 수 없으므로 새로 만듦
+            initialize_store(path, weights, store.series.get(file_name))
+        appended[(risk, horizon)] = append_prices(path, prices)
+    return appended
+
+
+if __name__ == "__main__":
+    # 사용법: python nav_pipeline.py [가격 파일] (기본값 price_data.csv, 새 날짜만 있는 파일도 가능)
+    price_path = sys.argv[1] if len(sys.argv) > 1 else PRICE_DATA_PATH
+    if not os.path.exists(price_path):
+        sys.exit(f"가격 파일이 없습니다: {price_path}")
+    counts = update_all(parse_price_matrix(price_path).to_frame())
+    for (risk_level, period), count in counts.items():
+        print(f"{risk_level} / {period}: {count}일 추가")
@@ -0,0 +1,239 @@
+import functools
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from data_store import ASSET_DATA_FILES, PRICE_DATA_PATH, get_store
+from risk import get_covariance
+
+# 위험성향별 효율적 투자선 위치 (최소분산=0, 최대수익=1 사이의 변동성 위치)
+RISK_PROFILE_TARGETS = {
+    "안정추구형": 0.2,
+    "위험중립형": 0.5,
+    "공격투자형": 0.8,
+}
+
+
+@dataclass
+class EfficientFrontier:
+    """효율적 투자선 (행: 투자선 위의 점)"""
+    assets: tuple
+    weights: np.ndarray
+    expected_returns: np.ndarray
+    volatilities: np.ndarray
+    risk_tolerances: np.ndarray
+
+    def to_frame(self):
+        """투자선의 기대수익률/변동성을 데이터프레임으로 반환합니다."""
+        return pd.DataFrame({"변동성": self.volatilities, "기대수익률": self.expected_returns})
+
+
+def _solve_kkt(covariance, mean, free, risk_tolerance):
+    """자유 자산(free)에 대해 등식 제약 KKT 시스템을 풀어 (비중, 승수)를 반환합니다."""
+    n_free = len(free)
+    kkt = np.zeros((n_free + 1, n_free + 1))
+    kkt[:n_free, :n_free] = covariance[np.ix_(free, free)]
+    kkt[:n_free, n_free] = 1.0
+    kkt[n_free, :n_free] = 1.0
+    rhs = np.append(risk_tolerance * mean[free], 1.0)
+    try:
+        solution = np.linalg.solve(kkt, rhs)
+    except np.linalg.LinAlgError:
+        solution = np.linalg.lstsq(kkt, rhs, rcond=None)[0]
+    return solution[:n_free], solution[n_free]
+
+
+def solve_mean_variance(mean, covariance, risk_tolerance, initial=None, tol=1e-12, max_iter=500):
+    """max tμᵀw - ½wᵀΣw (1ᵀw = 1, w ≥ 0) 를 primal active-set 방식으로 풉니다.
+
+    initial 에 인접한 해(예: 이전 투자선 점)를 넘기면 활성 집합을 이어받아 몇 번의 반복으로 수렴합니다.
+    """
+    mean = np.asarray(mean, dtype=np.float64)
+    covariance = np.asarray(covariance, dtype=np.float64)
+    n_assets = len(mean)
+    weights = np.full(n_assets, 1.0 / n_assets) if initial is None else np.array(initial, dtype=np.float64)
+    fixed = weights <= tol  # 0 에 고정된 자산 (working set)
+    weights[fixed] = 0.0
+
+    for _ in range(max_iter):
+        free = np.flatnonzero(~fixed)
+        target, multiplier = _solve_kkt(covariance, mean, free, risk_tolerance)
+        step = target - weights[free]
+
+        if np.max(np.abs(step)) <= 1e-10:
+            # 고정 자산의 라그랑주 승수가 모두 0 이상이면 최적해
+            gradient = covariance @ weights - risk_tolerance * mean + multiplier
+            candidates = np.flatnonzero(fixed)
+            if candidates.size == 0 or gradient[candidates].min() >= -1e-10:
+                return weights
+            fixed[candidates[np.argmin(gradient[candidates])]] = False
+            continue
+
+        # 비중이 음수가 되기 직전까지만 이동
+        shrinking = step < 0
+        ratios = np.full(step.shape, np.inf)
+        ratios[shrinking] = -weights[free][shrinking] / step[shrinking]
+        blocking = np.argmin(ratios)
+        alpha = min(1.0, ratios[blocking])
+        weights[free] += alpha * step
+        if alpha < 1.0:
+            fixed[free[blocking]] = True
+            weights[free[blocking]] = 0.0
+
+    return weights
+
+
+def _portfolio_stats(weights, mean, covariance):
+    return float(weights @ mean), float(np.sqrt(max(weights @ covariance @ weights, 0.0)))
+
+
+def max_risk_tolerance(mean, covariance):
+    """해가 최고 기대수익률 자산 하나로 수렴하는 최소 위험 허용도를 계산합니다."""
+    top = int(np.argmax(mean))
+    gaps = mean[top] - mean
+    lower = gaps > 1e-12
+    if not lower.any():
+        return 0.0
+    bounds = (covariance[top, top] - covariance[top][lower]) / gaps[lower]
+    return float(max(bounds.max(), 0.0))
+
+
+def minimum_variance(mean, covariance):
+    """최소분산 포트폴리오 비중을 반환합니다."""
+    return solve_mean_variance(mean, covariance, 0.0)
+
+
+def efficient_frontier(mean, covariance, n_points=200, assets=()):
+    """최소분산점부터 최고수익점까지 효율적 투자선을 n_points 개의 점으로 계산합니다.
+
+    인접한 점은 직전 해를 초기값으로 사용(warm start)하므로 점 하나당 몇 번의 선형계 풀이로 끝납니다.
+    """
+    mean = np.asarray(mean, dtype=np.float64)
+    covariance = np.asarray(covariance, dtype=np.float64)
+    tolerances = np.linspace(0.0, max_risk_tolerance(mean, covariance), n_points)
+
+    weights = np.empty((n_points, len(mean)))
+    previous = None
+    for i, tolerance in enumerate(tolerances):
+        previous = solve_mean_variance(mean, covariance, tolerance, initial=previous)
+        weights[i] = previous
+
+    expected_returns = weights @ mean
+    volatilities = np.sqrt(np.maximum(np.einsum("ij,jk,ik->i", weights, covariance, weights), 0.0))
+    return EfficientFrontier(tuple(assets), weights, expected_returns, volatilities, tolerances)
+
+
+def max_sharpe(mean, covariance, risk_free=0.0, n_points=50, n_refine=40):
+    """샤프 비율이 최대인 투자선 위의 포트폴리오 비중을 반환합니다.
+
+    투자선을 거칠게 계산한 뒤 최적점 주변의 위험 허용도 구간을 황금분할 탐색으로 좁힙니다.
+    """
+    frontier = efficient_frontier(mean, covariance, n_points)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = (frontier.expected_returns - risk_free) / frontier.volatilities
+    best = int(np.nanargmax(sharpe))
+    low = frontier.risk_tolerances[max(best - 1, 0)]
+    high = frontier.risk_tolerances[min(best + 1, n_points - 1)]
+    initial = frontier.weights[best]
+
+    def sharpe_at(tolerance):
+        weights = solve_mean_variance(mean, covariance, tolerance, initial=initial)
+        ret, vol = _portfolio_stats(weights, mean, covariance)
+        return (ret - risk_free) / vol if vol > 0 else -np.inf, weights
+
+    ratio = (np.sqrt(5.0) - 1.0) / 2.0
+    for _ in range(n_refine):
+        left = high - ratio * (high - low)
+        right = low + ratio * (high - low)
+        if sharpe_at(left)[0] < sharpe_at(right)[0]:
+            low = left
+        else:
+            high = right
+    return sharpe_at((low + high) / 2.0)[1]
+
+
+def target_risk(mean, covariance, target_volatility, tol=1e-8, max_iter=100):
+    """변동성이 target_volatility 이하인 포트폴리오 중 기대수익률이 최대인 비중을 반환합니다."""
+    mean = np.asarray(mean, dtype=np.float64)
+    covariance = np.asarray(covariance, dtype=np.float64)
+    low, high = 0.0, max_risk_tolerance(mean, covariance)
+
+    weights = minimum_variance(mean, covariance)
+    if _portfolio_stats(weights, mean, covariance)[1] >= target_volatility:
+        return weights  # 목표 변동성이 최소분산보다 낮으면 최소분산 포트폴리오
+    best = weights
+
+    # 투자선 위에서 변동성은 위험 허용도에 대해 단조 증가하므로 이분 탐색
+    for _ in range(max_iter):
+        middle = (low + high) / 2.0
+        weights = solve_mean_variance(mean, covariance, middle, initial=best)
+        if _portfolio_stats(weights, mean, covariance)[1] <= target_volatility:
+            low, best = middle, weights
+        else:
+            high = middle
+        if high - low <= tol * max(high, 1.0):
+            break
+    return best
+
+
+def to_percent_weights(assets, weights, min_weight=0.5):
+    """비중 벡터를 합계 100 인 정수 % 딕셔너리로 변환합니다. (get_portfolio 형식)"""
+    percents = np.where(np.asarray(weights) * 100 >= min_weight, np.asarray(weights) * 100, 0.0)
+    percents = percents * 100 / percents.sum()
+    rounded = np.floor(percents).astype(int)
+    # 최대 잔여법으로 반올림 오차를 배분해 합계를 100 으로 맞춤
+    for i in np.argsort(rounded - percents)[:100 - rounded.sum()]:
+        rounded[i] += 1
+    return {asset: int(weight) for asset, weight in zip(assets, rounded) if weight > 0}
+
+
+def load_expected_returns(horizon):
+    """투자 기간별 자산 기대수익률을 Series 로 반환합니다."""
+    stats = get_store().asset_stats.get(ASSET_DATA_FILES.get(horizon, ASSET_DATA_FILES["2년"]))
+    if stats is None:
+        return pd.Series(dtype=np.float64)
+    return pd.Series(stats.expected_return, index=list(stats.assets))
+
+
+def optimization_inputs(horizon, universe):
+    """universe 자산 중 기대수익률과 공분산이 모두 있는 자산의 (자산, 기대수익률, 공분산)을 반환합니다.
+
+    가격 데이터가 없으면 None 을 반환합니다.
+    """
+    estimate = get_covariance(horizon)
+    if estimate is None:
+        return None
+    expected_returns = load_expected_returns(horizon)
+    assets = [asset for asset in universe if asset in expected_returns.index and asset in estimate.assets]
+    if not assets:
+        return None
+    index = estimate.index_of(assets)
+    return tuple(assets), expected_returns[assets].to_numpy(), estimate.matrix[np.ix_(index, index)]
+
+
+def profile_portfolio(risk, horizon, universe):
+    """위험성향을 효율적 투자선 위의 점에 대응시킨 포트폴리오(% 딕셔너리)를 반환합니다.
+
+    최적화 입력이 없으면 None 을 반환합니다.
+    """
+    mtimes = tuple(
+        os.path.getmtime(path) if os.path.exists(path) else None
+        for path in (PRICE_DATA_PATH, ASSET_DATA_FILES.get(horizon, ASSET_DATA_FILES["2년"]))
+    )
+    portfolio = _profile_portfolio(risk, horizon, tuple(universe), mtimes)
+    return dict(portfolio) if portfolio is not None else None
+
+
+@functools.lru_cache(maxsize=32)
+def _profile_portfolio(risk, horizon, universe, mtimes):
+    inputs = optimization_inputs(horizon, universe)
+    if inputs is None:
+        return None
+    assets, mean, covariance = inputs
+    low = _portfolio_stats(minimum_variance(mean, covariance), mean, covariance)[1]
+    high = float(np.sqrt(covariance[np.argmax(mean), np.argmax(mean)]))
+    position = RISK_PROFILE_TARGETS.get(risk, RISK_PROFILE_TARGETS["위험중립형"])
+    weights = target_risk(mean, covariance, low + position * (high - low))
+    return to_percent_weights(assets, weights)
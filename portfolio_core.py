@@ -0,0 +1,242 @@
+"""Streamlit 없이 사용할 수 있는 설문 채점, 포트폴리오 지표, 백테스트 요약 함수
+
+모든 함수는 입력만으로 결과가 정해지며 화면 출력이나 세션 상태를 사용하지 않습니다.
+"""
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from analytics import ReturnAnalytics
+from backtest import load_price_data, run_backtest
+from data_store import ASSET_DATA_FILES, BACKTEST_DATA_FILES, get_store
+from nav_pipeline import load_profile_series
+from portfolios import get_portfolio
+from risk import portfolio_risk
+
+# 투자 목표 가중치
+GOAL_MAPPING = {
+    "자산 보호": 1,  # 안정적
+    "안정적 수익": 2,  # 중립적
+    "고수익 추구": 3  # 공격적
+}
+
+# 투자 경험 가중치
+EXPERIENCE_MAPPING = {
+    "전혀 없음": 1,  # 안정적
+    "초보 수준": 2,  # 중립적
+    "경험이 많음": 3  # 공격적
+}
+
+# 시장 변동 대응 가중치
+MARKET_MAPPING = {
+    "자산을 매도하여 손실 최소화": 1,  # 안정적
+    "시장 상황을 관망": 2,  # 중립적
+    "추가 투자를 고려": 3  # 공격적
+}
+
+# 리스크 허용 수준 가중치
+RISK_MAPPING = {
+    "리스크를 피하고 싶음": 1,  # 안정적
+    "일부 리스크 감수 가능": 2,  # 중립적
+    "높은 리스크도 수용 가능": 3  # 공격적
+}
+
+# 위험성향 구간 상한 (점수 <= 5: 안정추구형, <= 8: 위험중립형, 그 외: 공격투자형)
+RISK_SCORE_BOUNDS = (5, 8)
+
+# 기간별 수익률 표의 기간 (최근 N개 행)
+PERIOD_WINDOWS = [
+    ("1개월", 30),
+    ("3개월", 90),
+    ("6개월", 180),
+    ("1년", 365),
+]
+
+
+@dataclass(frozen=True)
+class SurveyAnswers:
+    """설문 응답"""
+    goal: str
+    experience: str
+    market: str
+    risk: str
+    horizon: str
+
+
+@dataclass
+class PortfolioMetrics:
+    """포트폴리오 비중과 기대수익률/변동성"""
+    risk_level: str
+    horizon: str
+    allocation: Dict[str, float]
+    expected_return: float
+    volatility: float
+    asset_expected_returns: Dict[str, float]
+    asset_volatilities: Dict[str, float]
+    missing_assets: List[str] = field(default_factory=list)
+
+
+@dataclass
+class BacktestSummary:
+    """백테스트 누적 수익률, 최대 낙폭, 기간별 수익률"""
+    risk_level: str
+    horizon: str
+    start: str
+    end: str
+    cumulative_return: float
+    max_drawdown: float
+    period_returns: Dict[str, Optional[float]]
+
+
+@dataclass
+class Recommendation:
+    """설문 한 건의 채점 결과와 추천 포트폴리오"""
+    score: int
+    risk_level: str
+    horizon: str
+    allocation: Dict[str, float]
+    expected_return: Optional[float]
+    volatility: Optional[float]
+
+    def to_dict(self) -> dict:
+        return {
+            "score": self.score,
+            "risk_level": self.risk_level,
+            "horizon": self.horizon,
+            "allocation": dict(self.allocation),
+            "expected_return": self.expected_return,
+            "volatility": self.volatility,
+        }
+
+
+def map_risk_level_by_score(score: int) -> str:
+    """설문 점수를 위험성향으로 변환합니다."""
+    if score <= RISK_SCORE_BOUNDS[0]:
+        return "안정추구형"
+    elif score <= RISK_SCORE_BOUNDS[1]:
+        return "위험중립형"
+    else:
+        return "공격투자형"
+
+
+def calculate_risk_score(user_goal: str, user_experience: str, user_market: str, user_risk: str) -> int:
+    """설문 응답으로 투자 성향 점수를 계산합니다. 알 수 없는 응답은 0점입니다."""
+    return (
+        GOAL_MAPPING.get(user_goal, 0)
+        + EXPERIENCE_MAPPING.get(user_experience, 0)
+        + MARKET_MAPPING.get(user_market, 0)
+        + RISK_MAPPING.get(user_risk, 0)
+    )
+
+
+def score_survey(answers: SurveyAnswers) -> Tuple[int, str]:
+    """설문 응답의 (점수, 위험성향)을 반환합니다."""
+    score = calculate_risk_score(answers.goal, answers.experience, answers.market, answers.risk)
+    return score, map_risk_level_by_score(score)
+
+
+def load_backtest_frame(risk: str, horizon: str) -> pd.DataFrame:
+    """백테스트 Date/NAV/MDD 데이터를 반환합니다. 데이터가 없으면 빈 데이터프레임을 반환합니다."""
+    # 증분 NAV 저장소가 있으면 전체 재계산 없이 그대로 사용
+    stored = load_profile_series(risk, horizon)
+    if stored is not None:
+        return stored.to_frame()
+
+    # 일별 가격 데이터가 있으면 현재 포트폴리오 비중으로 바로 백테스트
+    portfolio, _ = get_portfolio(risk, horizon)
+    prices = load_price_data()
+    if not prices.empty and set(portfolio).issubset(prices.columns):
+        return run_backtest(portfolio, prices).to_frame()
+
+    # 가격 데이터가 없으면 미리 계산된 결과 파일 사용
+    file_path = BACKTEST_DATA_FILES.get((risk, horizon), "back_data_장기_RT.csv")
+    backtest_data = get_store().series.get(file_path)
+    if backtest_data is None:
+        return pd.DataFrame()  # 빈 데이터프레임 반환
+    return backtest_data.to_frame()
+
+
+def load_asset_frame(horizon: str) -> pd.DataFrame:
+    """Asset/ExpectedReturn/Volatility 데이터를 반환합니다. 데이터가 없으면 빈 데이터프레임을 반환합니다."""
+    asset_data = get_store().asset_stats.get(ASSET_DATA_FILES.get(horizon, "asset_data_장기.csv"))
+    if asset_data is None:
+        return pd.DataFrame()  # 빈 데이터프레임 반환
+    return asset_data.to_frame()
+
+
+def portfolio_metrics(risk: str, horizon: str) -> Optional[PortfolioMetrics]:
+    """추천 포트폴리오의 기대수익률과 변동성을 계산합니다. Asset 데이터가 없으면 None 을 반환합니다."""
+    portfolio, _ = get_portfolio(risk, horizon)
+    asset_data = load_asset_frame(horizon)
+    if asset_data.empty:
+        return None
+
+    # 기대수익률 및 변동성 매핑 (데이터가 없는 자산은 0)
+    asset_data = asset_data.set_index("Asset")
+    missing_assets = [asset for asset in portfolio if asset not in asset_data.index]
+    expected_returns = {asset: 0.0 for asset in missing_assets}
+    volatilities = {asset: 0.0 for asset in missing_assets}
+    for asset in portfolio:
+        if asset in asset_data.index:
+            expected_returns[asset] = float(asset_data.loc[asset, "ExpectedReturn"])
+            volatilities[asset] = float(asset_data.loc[asset, "Volatility"])
+
+    # 포트폴리오 기대수익률 및 변동성 계산
+    expected_return = sum(weight * expected_returns[asset] / 100 for asset, weight in portfolio.items())
+    volatility = portfolio_risk(portfolio, horizon)
+    if volatility is None:
+        # 수익률 이력이 없으면 자산별 변동성의 가중합 사용 (상관관계 1 가정)
+        volatility = sum(weight * volatilities[asset] / 100 for asset, weight in portfolio.items())
+
+    return PortfolioMetrics(
+        risk, horizon, dict(portfolio), float(expected_return), float(volatility),
+        expected_returns, volatilities, missing_assets,
+    )
+
+
+def backtest_summary(risk: str, horizon: str) -> Optional[BacktestSummary]:
+    """백테스트 누적 수익률, 최대 낙폭, 기간별 수익률을 계산합니다. 데이터가 없으면 None 을 반환합니다."""
+    backtest_data = load_backtest_frame(risk, horizon)
+    if backtest_data.empty:
+        return None
+    analytics = ReturnAnalytics.from_frame(backtest_data)
+    return BacktestSummary(
+        risk, horizon,
+        str(backtest_data["Date"].iloc[0].date()),
+        str(backtest_data["Date"].iloc[-1].date()),
+        analytics.cumulative_return(),
+        float(backtest_data["MDD"].min()),
+        {label: analytics.trailing_return(periods) for label, periods in PERIOD_WINDOWS},
+    )
+
+
+def _recommendation(score: int, risk_level: str, horizon: str,
+                    metrics: Optional[PortfolioMetrics]) -> Recommendation:
+    if metrics is None:
+        allocation, _ = get_portfolio(risk_level, horizon)
+        return Recommendation(score, risk_level, horizon, dict(allocation), None, None)
+    return Recommendation(
+        score, risk_level, horizon, dict(metrics.allocation), metrics.expected_return, metrics.volatility,
+    )
+
+
+def recommend(answers: SurveyAnswers) -> Recommendation:
+    """설문 응답 한 건을 채점하고 추천 포트폴리오와 지표를 붙입니다."""
+    score, risk_level = score_survey(answers)
+    return _recommendation(score, risk_level, answers.horizon, portfolio_metrics(risk_level, answers.horizon))
+
+
+def recommend_many(answers_list: Iterable[SurveyAnswers],
+                   metrics_lookup: Callable[[str, str], Optional[PortfolioMetrics]] = portfolio_metrics,
+                   ) -> List[Recommendation]:
+    """설문 응답 여러 건을 채점합니다. 포트폴리오 지표는 (위험성향, 투자 기간)마다 한 번만 계산합니다."""
+    profiles: Dict[Tuple[str, str], Optional[PortfolioMetrics]] = {}
+    recommendations = []
+    for answers in answers_list:
+        score, risk_level = score_survey(answers)
+        key = (risk_level, answers.horizon)
+        if key not in profiles:
+            profiles[key] = metrics_lookup(*key)
+        recommendations.append(_recommendation(score, risk_level, answers.horizon, profiles[key]))
+    return recommendations
@@ -0,0 +1,49 @@
+from optimizer import profile_portfolio
+from registry import get_registry
+
+# 위험성향과 투자 기간
+RISK_LEVELS = ("안정추구형", "위험중립형", "공격투자형")
+HORIZONS = ("6개월", "2년")
+
+
+def get_etf_description():
+    """{티커: ETF 설명}을 반환합니다. (레지스트리 파일에서 한 번 읽어 공유)"""
+    return get_registry().descriptions()
+
+
+def get_portfolio(risk, horizon):
+    """포트폴리오와 ETF 설명을 함께 반환합니다."""
+    portfolios = {
+        ("안정추구형", "6개월"): {"SPY": 20, "IEF": 20, "BIL": 40, "QQQ": 15, "IAU": 5},
+        ("안정추구형", "2년"): {"SPY": 25, "IAU": 5, "SCHD": 20, "SPYD": 15, "IEF": 30},
+        ("위험중립형", "6개월"): {"SPY": 15, "BIL": 40, "HYG": 20, "QQQ": 20, "IAU": 15},
+        ("위험중립형", "2년"): {"SPY": 30, "IAU": 25, "VNQ": 5, "PAVE": 30, "IEF": 10},
+        ("공격투자형", "6개월"): {"SPY": 10, "BIL": 15, "HYG": 25, "QQQ": 30, "SMH": 20},
+        ("공격투자형", "2년"): {"SPY": 30, "SKYY": 5, "SMH": 20, "VWO": 5, "IEF": 40}
+    }
+    portfolio = portfolios.get((risk, horizon), {"Equity": 50, "Fixed Income": 50})
+
+    # 가격 데이터가 있으면 위험성향에 대응하는 효율적 투자선 위의 포트폴리오 사용 (레지스트리 전체가 후보)
+    registry = get_registry()
+    optimized = profile_portfolio(risk, horizon, registry.tickers)
+    if optimized:
+        portfolio = optimized
+
+    # ETF 설명 추가
+    portfolio_with_desc = {}
+
+    for asset, weight in portfolio.items():
+        description = registry.description(asset)
+        portfolio_with_desc[asset] = {"비중": weight, "설명": description}
+
+    return portfolio, portfolio_with_desc
+
+
+def model_portfolios():
+    """(위험성향, 투자 기간)별 get_portfolio 비중을 모두 반환합니다."""
+    return {
+        (risk, horizon): get_portfolio(risk, horizon)[0]
+        for risk in RISK_LEVELS
+        for horizon in HORIZONS
+    }
+
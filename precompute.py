@@ -0,0 +1,229 @@
+from dataclasses import dataclass
+
+import pandas as pd
+import plotly.graph_objects as go
+
+from analytics import ReturnAnalytics
+from downsample import chart_points, downsample_frame
+from optimizer import efficient_frontier, optimization_inputs
+from portfolio_core import PERIOD_WINDOWS, load_backtest_frame, portfolio_metrics
+from portfolios import HORIZONS, RISK_LEVELS, get_portfolio
+from registry import get_registry
+
+
+def create_portfolio_chart(portfolio):
+    """포트폴리오 구성 비율 파이 차트"""
+    fig = go.Figure(data=[go.Pie(
+        labels=list(portfolio.keys()),
+        values=list(portfolio.values()),
+        textinfo='label+percent',
+        insidetextorientation='radial',
+        hole=.3,
+        textfont=dict(size=16)
+    )])
+    fig.update_layout(
+        showlegend=False,
+        width=800,
+        height=500
+    )
+    return fig
+
+
+def create_frontier_chart(frontier, portfolio_volatility, portfolio_return):
+    """효율적 투자선과 추천 포트폴리오 위치 차트"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=frontier.volatilities,
+        y=frontier.expected_returns,
+        mode='lines',
+        name='효율적 투자선',
+        line=dict(color='#008CBA', width=2),
+        hovertemplate="변동성: %{x:.2%}<br>기대수익률: %{y:.2%}"
+    ))
+    fig.add_trace(go.Scatter(
+        x=[portfolio_volatility],
+        y=[portfolio_return],
+        mode='markers',
+        name='추천 포트폴리오',
+        marker=dict(color='#4CAF50', size=14),
+        hovertemplate="변동성: %{x:.2%}<br>기대수익률: %{y:.2%}"
+    ))
+    fig.update_layout(
+        xaxis=dict(title="변동성", tickformat=".0%"),
+        yaxis=dict(title="기대수익률", tickformat=".0%"),
+        template="plotly_white"
+    )
+    return fig
+
+
+def create_nav_chart(backtest_data):
+    """누적 NAV 추세 차트"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=backtest_data['Date'],
+        y=backtest_data['NAV'],
+        mode='lines+markers',
+        name='NAV',
+        line=dict(color='green', width=2),
+        hovertemplate="날짜: %{x}<br>NAV: %{y:.2f}"
+    ))
+    fig.update_layout(
+        title='누적 NAV (수익률)',
+        xaxis=dict(
+            title="날짜",
+            showgrid=True,
+            zeroline=False,
+            tickformat="%Y-%m-%d",
+            tickangle=45,
+        ),
+        yaxis=dict(
+            title="NAV",
+            showgrid=True,
+            zeroline=False,
+        ),
+        hovermode='x unified',
+        template="plotly_white"
+    )
+    return fig
+
+
+def create_mdd_chart(backtest_data):
+    """최대 낙폭(MDD) 차트"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=backtest_data['Date'],
+        y=backtest_data['MDD'],
+        mode='lines+markers',
+        name='MDD',
+        line=dict(color='red', width=2, dash="dash"),
+        fill='tozeroy',
+        fillcolor='rgba(255, 0, 0, 0.2)',
+        hovertemplate="날짜: %{x}<br>MDD: %{y:.2%}"
+    ))
+    fig.update_layout(
+        title='MDD (Maximum Drawdown)',
+        xaxis=dict(
+            title="날짜",
+            showgrid=True,
+            zeroline=False,
+            tickformat="%Y-%m-%d",
+            tickangle=45,
+        ),
+        yaxis=dict(
+            title="Drawdown",
+            showgrid=True,
+            zeroline=False,
+        ),
+        hovermode='x unified',
+        template="plotly_white"
+    )
+    return fig
+
+
+def create_backtest_charts(backtest_data, max_points):
+    """NAV/MDD 시계열을 max_points 개 이하로 다운샘플링하여 두 차트를 만듭니다.
+
+    NAV 는 LTTB, MDD 는 구간별 최솟값/최댓값 방식이라 낙폭 저점은 정확히 남습니다.
+    """
+    nav_data = downsample_frame(backtest_data, max_points, "NAV")
+    mdd_data = downsample_frame(backtest_data, max_points, "MDD", method="minmax")
+    return create_nav_chart(nav_data), create_mdd_chart(mdd_data)
+
+
+@dataclass
+class PortfolioBundle:
+    """포트폴리오 페이지 결과 묶음"""
+    portfolio: dict
+    portfolio_with_desc: dict
+    portfolio_return: float
+    portfolio_volatility: float
+    missing_assets: list
+    portfolio_df: pd.DataFrame
+    pie_chart: go.Figure
+    frontier_chart: go.Figure = None
+
+
+@dataclass
+class BacktestBundle:
+    """백테스트 페이지 결과 묶음"""
+    backtest_data: pd.DataFrame
+    analytics: ReturnAnalytics
+    cumulative_return: float
+    max_drawdown: float
+    period_return_df: pd.DataFrame
+    nav_chart: go.Figure
+    mdd_chart: go.Figure
+
+
+@dataclass
+class ResultBundle:
+    """(위험성향, 투자 기간) 하나의 결과 묶음. 데이터가 없는 페이지는 None"""
+    portfolio: PortfolioBundle = None
+    backtest: BacktestBundle = None
+
+
+def build_portfolio_bundle(risk, horizon):
+    """포트폴리오 지표, 구성표, 차트를 계산합니다. Asset 데이터가 없으면 None 을 반환합니다."""
+    portfolio, portfolio_with_desc = get_portfolio(risk, horizon)
+    metrics = portfolio_metrics(risk, horizon)
+    if metrics is None:
+        return None
+    expected_returns = metrics.asset_expected_returns
+    volatilities = metrics.asset_volatilities
+    portfolio_return = metrics.expected_return
+    portfolio_volatility = metrics.volatility
+
+    registry = get_registry()
+    portfolio_df = pd.DataFrame({
+        "자산": list(portfolio.keys()),
+        "ETF 이름": [registry.name(asset) for asset in portfolio],
+        "국내 ETF 이름": [registry.domestic_label(asset) for asset in portfolio],
+        "비중": list(portfolio.values()),
+        "기대수익률": [expected_returns[asset] * 100 for asset in portfolio],
+        "변동성": [volatilities[asset] * 100 for asset in portfolio]
+    }).reset_index(drop=True)
+
+    # 효율적 투자선 (가격 데이터가 있는 경우에만)
+    frontier_chart = None
+    inputs = optimization_inputs(horizon, registry.tickers)
+    if inputs is not None:
+        frontier = efficient_frontier(inputs[1], inputs[2], n_points=200, assets=inputs[0])
+        frontier_chart = create_frontier_chart(frontier, portfolio_volatility, portfolio_return)
+
+    return PortfolioBundle(
+        portfolio, portfolio_with_desc, portfolio_return, portfolio_volatility, metrics.missing_assets,
+        portfolio_df, create_portfolio_chart(portfolio), frontier_chart,
+    )
+
+
+def build_backtest_bundle(risk, horizon):
+    """백테스트 지표, 기간별 수익률, 차트를 계산합니다. 백테스트 데이터가 없으면 None 을 반환합니다."""
+    backtest_data = load_backtest_frame(risk, horizon)
+    if backtest_data.empty:
+        return None
+    analytics = ReturnAnalytics.from_frame(backtest_data)
+    # 차트는 기본 해상도로 미리 만들어 둠
+    nav_chart, mdd_chart = create_backtest_charts(backtest_data, chart_points())
+    return BacktestBundle(
+        backtest_data,
+        analytics,
+        analytics.cumulative_return(),
+        backtest_data["MDD"].min(),
+        analytics.period_returns(PERIOD_WINDOWS),
+        nav_chart,
+        mdd_chart,
+    )
+
+
+def build_result_bundle(risk, horizon):
+    """(위험성향, 투자 기간) 하나의 결과 묶음을 계산합니다."""
+    return ResultBundle(build_portfolio_bundle(risk, horizon), build_backtest_bundle(risk, horizon))
+
+
+def build_result_bundles():
+    """모든 (위험성향, 투자 기간) 조합의 결과 묶음을 계산합니다."""
+    return {
+        (risk, horizon): build_result_bundle(risk, horizon)
+        for risk in RISK_LEVELS
+        for horizon in HORIZONS
+    }
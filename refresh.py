@@ -0,0 +1,231 @@
+import asyncio
+import glob
+import json
+import os
+import sys
+import threading
+
+import numpy as np
+
+from data_store import ASSET_DATA_FILES, PRICE_DATA_PATH, AssetStats, get_store, parse_price_matrix
+from instrumentation import METRICS
+from risk import COVARIANCE_WINDOWS, TRADING_DAYS
+
+# 환경 변수: 자산 통계 새로고침 주기(초). 설정하면 앱이 백그라운드 새로고침을 시작
+ASSET_REFRESH_ENV = "VIA_ASSET_REFRESH"
+REFRESH_INTERVAL = 60.0
+# 새 가격 파일을 넣는 폴더 (시장 데이터 피드 대용). 가장 최근 파일이 price_data.csv 를 대체
+DROP_DIR = "data_drop"
+# 자산 통계를 계산한 가격 파일의 (크기, 수정시각) 기록
+STATS_SOURCE_PATH = "asset_stats_source.json"
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def background_loop():
+    """백그라운드 작업용 asyncio 이벤트 루프 (프로세스당 하나, 데몬 스레드에서 실행)"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="background-refresh", daemon=True).start()
+    return _loop
+
+
+class SnapshotCache:
+    """stale-while-revalidate 캐시
+
+    시그니처가 바뀌면 이전 값을 그대로 반환하면서 백그라운드 루프에서 새 값을 계산하고,
+    계산이 끝나면 (시그니처, 값) 참조를 한 번에 교체합니다. 값이 하나도 없는 첫 요청만 기다리며,
+    그때 백그라운드에서 첫 값을 계산 중이면(미리 계산) 다시 계산하지 않고 그 결과를 기다립니다.
+    """
+
+    def __init__(self, build, name, metrics=METRICS):
+        self._build = build
+        self._name = name
+        self._metrics = metrics
+        self._lock = threading.Lock()
+        self._snapshot = None  # (시그니처, 값)
+        self._pending = None
+        self._future = None
+
+    @property
+    def signature(self):
+        """현재 제공 중인 값의 시그니처"""
+        snapshot = self._snapshot
+        return snapshot[0] if snapshot is not None else None
+
+    def get(self, signature):
+        """현재 값을 반환합니다. signature 가 다르면 백그라운드 갱신을 예약합니다."""
+        self._metrics.increment("cache_calls_total", loader=self._name)
+        snapshot = self._snapshot
+        if snapshot is None:
+            future = self._future
+            if future is not None:
+                future.result()  # 실패하면 아래에서 직접 계산
+                snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = (signature, self._timed_build(signature))
+                return self._snapshot[1]
+        if snapshot[0] != signature:
+            self.revalidate(signature)
+        return snapshot[1]
+
+    def revalidate(self, signature):
+        """signature 로 새 값을 백그라운드에서 계산합니다. 이미 계산 중이면 무시합니다."""
+        with self._lock:
+            if self._pending is not None or self.signature == signature:
+                return
+            self._pending = signature
+            self._future = asyncio.run_coroutine_threadsafe(self._revalidate(signature), background_loop())
+
+    async def _revalidate(self, signature):
+        try:
+            value = await asyncio.to_thread(self._timed_build, signature)
+            self._snapshot = (signature, value)
+        except Exception:
+            # 실패하면 이전 값을 계속 제공하고 다음 요청에서 다시 시도
+            self._metrics.increment("refresh_errors_total", loader=self._name)
+        finally:
+            with self._lock:
+                self._pending = None
+        self._future = None
+
+    def _timed_build(self, signature):
+        self._metrics.increment("cache_misses_total", loader=self._name)
+        with self._metrics.timer(f"cache_miss.{self._name}"):
+            return self._build(signature)
+
+
+def compute_asset_stats(prices, window):
+    """가격의 최근 window 거래일로 연율화 기대수익률(기하평균)과 변동성을 계산합니다.
+
+    구간 안에 가격이 비어 있는 자산은 제외합니다.
+    """
+    returns = np.diff(np.log(prices.to_numpy(dtype=np.float64)), axis=0)
+    # 모든 자산의 수익률이 0인 날(주말 등 비거래일)은 제외
+    returns = returns[np.any(np.nan_to_num(returns) != 0, axis=1)][-window:]
+    valid = ~np.isnan(returns).any(axis=0) if len(returns) > 1 else np.zeros(returns.shape[1], dtype=bool)
+    returns = returns[:, valid]
+    expected_return = np.expm1(returns.mean(axis=0) * TRADING_DAYS)
+    volatility = returns.std(axis=0, ddof=1) * np.sqrt(TRADING_DAYS)
+    assets = tuple(asset for asset, keep in zip(prices.columns, valid) if keep)
+    return AssetStats(assets, expected_return, volatility)
+
+
+def write_asset_stats(stats, file_path):
+    """자산 통계 파일을 원본과 같은 형식으로 씁니다. 새 파일을 쓴 뒤 교체하여 읽는 쪽은 항상 완전한 파일을 봅니다."""
+    temp_path = file_path + ".tmp"
+    stats.to_frame().to_csv(temp_path, index=False, float_format="%.4f")
+    os.replace(temp_path, file_path)
+
+
+def ingest_drop(drop_dir=DROP_DIR, data_dir="."):
+    """drop_dir 의 가장 최근 가격 파일을 검증한 뒤 price_data.csv 로 옮깁니다. 옮긴 파일 경로 또는 None"""
+    candidates = sorted(glob.glob(os.path.join(data_dir, drop_dir, "*.csv")), key=os.path.getmtime)
+    if not candidates:
+        return None
+    latest = candidates[-1]
+    try:
+        parse_price_matrix(latest)
+    except ValueError:
+        # 형식이 잘못된 파일은 다시 읽지 않도록 이름을 바꾸고 거부
+        os.replace(latest, latest + ".rejected")
+        raise
+    os.replace(latest, os.path.join(data_dir, PRICE_DATA_PATH))
+    for older in candidates[:-1]:
+        os.remove(older)
+    return latest
+
+
+def price_signature(price_path):
+    """가격 파일의 [크기, 수정시각(ns)]"""
+    stat = os.stat(price_path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class AssetStatsRefresher:
+    """가격 데이터가 자산 통계를 계산한 가격 파일과 다르면 통계를 다시 계산하는 주기 작업
+
+    계산은 백그라운드 루프의 작업 스레드에서 하고, 파일 교체 후 저장소를 미리 적재한 다음
+    on_refresh 콜백(결과 묶음 갱신 등)을 호출합니다. 요청 스레드는 기다리지 않습니다.
+    """
+
+    def __init__(self, data_dir=".", drop_dir=DROP_DIR, interval=REFRESH_INTERVAL, on_refresh=()):
+        self.data_dir = data_dir
+        self.drop_dir = drop_dir
+        self.interval = interval
+        self.on_refresh = list(on_refresh)
+
+    def is_stale(self):
+        """자산 통계가 현재 가격 파일로 계산되지 않았는지 여부
+
+        계산할 때 기록한 가격 파일 시그니처와 비교하므로, 수정시각을 보존한 채 교체된 가격 파일도 감지합니다.
+        기록이 없으면(배포된 통계 파일) 가격 파일이 자산 통계 파일보다 새로운지로 판단합니다.
+        """
+        price_path = os.path.join(self.data_dir, PRICE_DATA_PATH)
+        if not os.path.exists(price_path):
+            return False
+        stats_paths = [os.path.join(self.data_dir, name) for name in ASSET_DATA_FILES.values()]
+        if not all(os.path.exists(path) for path in stats_paths):
+            return True
+        source = self.stats_source()
+        if source is not None:
+            return source != price_signature(price_path)
+        return os.path.getmtime(price_path) > min(os.path.getmtime(path) for path in stats_paths)
+
+    def stats_source(self):
+        """자산 통계를 계산한 가격 파일 시그니처. 기록이 없거나 읽을 수 없으면 None"""
+        try:
+            with open(os.path.join(self.data_dir, STATS_SOURCE_PATH), encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def refresh_once(self):
+        """새 가격이 있으면 자산 통계를 다시 계산하여 교체합니다. 교체했으면 True"""
+        ingested = ingest_drop(self.drop_dir, self.data_dir)
+        if ingested is None and not self.is_stale():
+            return False
+        with METRICS.timer("refresh.asset_stats"):
+            price_path = os.path.join(self.data_dir, PRICE_DATA_PATH)
+            source = price_signature(price_path)
+            prices = get_store(self.data_dir).prices[PRICE_DATA_PATH].to_frame()
+            for horizon, file_name in ASSET_DATA_FILES.items():
+                stats = compute_asset_stats(prices, COVARIANCE_WINDOWS[horizon])
+                write_asset_stats(stats, os.path.join(self.data_dir, file_name))
+            # 통계 파일을 모두 교체한 뒤에 기록하여, 중간에 실패하면 다음 주기에 다시 계산
+            source_path = os.path.join(self.data_dir, STATS_SOURCE_PATH)
+            with open(source_path + ".tmp", "w", encoding="utf-8") as file:
+                json.dump(source, file)
+            os.replace(source_path + ".tmp", source_path)
+            get_store(self.data_dir)  # 새 파일로 저장소를 미리 적재
+        for callback in self.on_refresh:
+            callback()
+        return True
+
+    async def run(self):
+        """interval 초마다 refresh_once 를 작업 스레드에서 실행합니다."""
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh_once)
+            except Exception:
+                METRICS.increment("refresh_errors_total", loader="asset_stats")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """백그라운드 루프에서 주기 작업을 시작합니다."""
+        return asyncio.run_coroutine_threadsafe(self.run(), background_loop())
+
+
+if __name__ == "__main__":
+    # 사용법: python refresh.py [주기(초)] (주기를 생략하면 한 번만 새로고침)
+    refresher = AssetStatsRefresher()
+    if len(sys.argv) > 1:
+        refresher.interval = float(sys.argv[1])
+        asyncio.run(refresher.run())
+    else:
+        print("자산 통계를 새로 계산했습니다." if refresher.refresh_once() else "새 가격 데이터가 없습니다.")
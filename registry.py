@@ -0,0 +1,127 @@
+import bisect
+import functools
+import os
+from dataclasses import dataclass
+
+import pandas as pd
+
+# 자산(ETF) 레지스트리 파일 (티커, 이름, 국내 대체 ETF, 자산군, 설명)
+REGISTRY_PATH = "etf_registry.csv"
+REGISTRY_COLUMNS = ("Ticker", "Name", "DomesticName", "DomesticCode", "AssetClass", "Description")
+# 레지스트리에 없는 자산(Equity, Fixed Income 등)의 설명
+DEFAULT_DESCRIPTION = "ETF가 아닌 일반 자산군입니다."
+
+
+@dataclass(frozen=True)
+class Instrument:
+    """레지스트리의 자산 하나"""
+    ticker: str
+    name: str
+    domestic_name: str
+    domestic_code: str
+    asset_class: str
+    description: str
+
+    @property
+    def domestic_label(self):
+        """'이름 (종목코드)' 형식의 국내 대체 ETF 표시 이름. 대체 ETF 가 없으면 'N/A'"""
+        if not self.domestic_name:
+            return "N/A"
+        return f"{self.domestic_name} ({self.domestic_code})" if self.domestic_code else self.domestic_name
+
+    @property
+    def domestic_url(self):
+        """국내 대체 ETF 의 네이버 금융 페이지. 종목코드가 없으면 None"""
+        if not self.domestic_code:
+            return None
+        return f"https://finance.naver.com/item/main.naver?code={self.domestic_code}"
+
+
+class AssetRegistry:
+    """티커로 O(1) 조회하고, 정렬된 키의 이진 탐색으로 티커/이름 접두어 검색을 하는 자산 목록"""
+
+    def __init__(self, instruments):
+        self._by_ticker = {instrument.ticker: instrument for instrument in instruments}
+        self.tickers = tuple(self._by_ticker)
+        # (소문자 키, 티커) 정렬 목록: 티커와 이름 모두 접두어 검색 가능
+        self._keys = sorted(
+            {(instrument.ticker.lower(), instrument.ticker) for instrument in self._by_ticker.values()}
+            | {(instrument.name.lower(), instrument.ticker) for instrument in self._by_ticker.values()}
+        )
+        self._descriptions = {ticker: instrument.description for ticker, instrument in self._by_ticker.items()}
+
+    def __len__(self):
+        return len(self._by_ticker)
+
+    def __contains__(self, ticker):
+        return ticker in self._by_ticker
+
+    def __iter__(self):
+        return iter(self._by_ticker.values())
+
+    def get(self, ticker, default=None):
+        """티커의 Instrument 를 반환합니다."""
+        return self._by_ticker.get(ticker, default)
+
+    def name(self, ticker, default="N/A"):
+        instrument = self._by_ticker.get(ticker)
+        return instrument.name if instrument is not None else default
+
+    def domestic_label(self, ticker, default="N/A"):
+        instrument = self._by_ticker.get(ticker)
+        return instrument.domestic_label if instrument is not None else default
+
+    def description(self, ticker, default=DEFAULT_DESCRIPTION):
+        return self._descriptions.get(ticker, default)
+
+    def descriptions(self):
+        """{티커: 설명} (공유 객체이므로 수정하지 마세요)"""
+        return self._descriptions
+
+    def search(self, prefix, limit=20):
+        """티커나 이름이 prefix 로 시작하는(대소문자 무시) 자산을 키의 사전순으로 최대 limit 개 반환합니다."""
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        found = {}
+        for index in range(bisect.bisect_left(self._keys, (prefix, "")), len(self._keys)):
+            key, ticker = self._keys[index]
+            if not key.startswith(prefix) or len(found) >= limit:
+                break
+            found.setdefault(ticker, self._by_ticker[ticker])
+        return list(found.values())
+
+    def by_asset_class(self, asset_class):
+        """자산군에 속한 자산 목록"""
+        return [instrument for instrument in self if instrument.asset_class == asset_class]
+
+
+def parse_registry(file_path):
+    """레지스트리 파일을 검증하여 AssetRegistry 로 변환합니다."""
+    frame = pd.read_csv(file_path, dtype=str, keep_default_na=False)
+    frame.columns = frame.columns.str.strip()
+    missing = set(REGISTRY_COLUMNS) - set(frame.columns)
+    if missing:
+        raise ValueError(f"{file_path}: 필수 열이 없습니다: {sorted(missing)}")
+    frame = frame[list(REGISTRY_COLUMNS)].apply(lambda column: column.str.strip())
+    if (frame["Ticker"] == "").any():
+        raise ValueError(f"{file_path}: 티커가 비어 있는 행이 있습니다.")
+    duplicated = frame["Ticker"][frame["Ticker"].duplicated()]
+    if not duplicated.empty:
+        raise ValueError(f"{file_path}: 중복된 티커가 있습니다: {sorted(set(duplicated))}")
+    return AssetRegistry(Instrument(*row) for row in frame.itertuples(index=False, name=None))
+
+
+def get_registry(file_path=REGISTRY_PATH):
+    """자산 레지스트리를 반환합니다. 파일이 없으면 빈 레지스트리를 반환합니다.
+
+    (파일 경로, 수정시각) 단위로 프로세스 내에 캐시되므로 파일이 바뀔 때만 다시 읽습니다.
+    """
+    if not os.path.exists(file_path):
+        return AssetRegistry(())
+    return _load_registry(os.path.abspath(file_path), os.path.getmtime(file_path))
+
+
+@functools.lru_cache(maxsize=4)
+def _load_registry(file_path, mtime):
+    return parse_registry(file_path)
@@ -0,0 +1,120 @@
+import functools
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+from backtest import PRICE_DATA_PATH, load_price_data, weights_to_matrix
+
+# 투자 기간별 공분산 추정 구간 (거래일 수)
+COVARIANCE_WINDOWS = {
+    "6개월": 252,   # 최근 1년
+    "2년": 756,     # 최근 3년
+}
+TRADING_DAYS = 252
+
+
+@dataclass(frozen=True)
+class CovarianceEstimate:
+    """연율화 공분산 행렬과 자산 순서"""
+    assets: tuple
+    matrix: np.ndarray
+    shrinkage: float
+
+    def index_of(self, assets):
+        """자산 목록의 공분산 행렬 내 위치를 반환합니다."""
+        position = {asset: i for i, asset in enumerate(self.assets)}
+        return [position[asset] for asset in assets]
+
+
+def sample_covariance(returns):
+    """(T x M) 수익률 행렬의 표본 공분산을 계산합니다."""
+    centered = returns - returns.mean(axis=0)
+    return centered.T @ centered / len(returns)
+
+
+def ledoit_wolf_covariance(returns, shrinkage=None):
+    """스케일된 단위행렬을 목표로 하는 Ledoit-Wolf 축소 공분산을 계산합니다.
+
+    shrinkage 를 지정하지 않으면 최적 축소 강도를 추정해 사용합니다.
+    (공분산 행렬, 축소 강도)를 반환합니다.
+    """
+    centered = returns - returns.mean(axis=0)
+    n_obs, n_assets = centered.shape
+    sample = centered.T @ centered / n_obs
+    target_scale = np.trace(sample) / n_assets
+    target = target_scale * np.eye(n_assets)
+
+    if shrinkage is None:
+        distance = np.sum((sample - target) ** 2)
+        # 표본 공분산 추정 오차: sum_t ||x_t x_t' - S||^2 / T^2
+        row_norms = np.sum(centered ** 2, axis=1)
+        error = (np.sum(row_norms ** 2) - n_obs * np.sum(sample ** 2)) / n_obs ** 2
+        shrinkage = min(error, distance) / distance if distance > 0 else 1.0
+
+    return shrinkage * target + (1.0 - shrinkage) * sample, shrinkage
+
+
+def get_covariance(horizon, file_path=PRICE_DATA_PATH, method="ledoit_wolf", shrinkage=None):
+    """투자 기간별 연율화 공분산 행렬을 반환합니다. 가격 데이터가 없으면 None 을 반환합니다.
+
+    추정 결과는 (기간, 파일 경로, 파일 수정시각, 방법) 단위로 프로세스 내에 캐시되므로
+    Streamlit 재실행마다 다시 계산하지 않습니다.
+    """
+    if not os.path.exists(file_path):
+        return None
+    return _estimate_covariance(horizon, file_path, os.path.getmtime(file_path), method, shrinkage)
+
+
+@functools.lru_cache(maxsize=32)
+def _estimate_covariance(horizon, file_path, mtime, method, shrinkage):
+    prices = load_price_data(file_path)
+    returns = np.diff(np.log(prices.to_numpy(dtype=np.float64)), axis=0)
+    returns = np.nan_to_num(returns)
+    # 모든 자산의 수익률이 0인 날(주말 등 비거래일)은 제외
+    returns = returns[np.any(returns != 0, axis=1)]
+    returns = returns[-COVARIANCE_WINDOWS.get(horizon, TRADING_DAYS):]
+
+    if method == "sample":
+        matrix, intensity = sample_covariance(returns), 0.0
+    elif method == "ledoit_wolf":
+        matrix, intensity = ledoit_wolf_covariance(returns, shrinkage)
+    else:
+        raise ValueError(f"지원하지 않는 공분산 추정 방법입니다: {method}")
+
+    matrix = matrix * TRADING_DAYS
+    matrix.setflags(write=False)  # 캐시된 행렬은 읽기 전용으로 공유
+    return CovarianceEstimate(tuple(prices.columns), matrix, float(intensity))
+
+
+def asset_covariance(assets, horizon, volatilities):
+    """자산 목록의 연율화 공분산 행렬을 반환합니다.
+
+    가격 데이터가 없거나 자산이 빠져 있으면 자산 통계의 변동성(volatilities)으로 상관관계 1 을 가정합니다.
+    portfolio_metrics 의 변동성(자산 변동성의 가중합)과 같은 기준이라 화면의 위험 수치가 서로 맞습니다.
+    """
+    estimate = get_covariance(horizon)
+    if estimate is not None and set(assets).issubset(estimate.assets):
+        index = estimate.index_of(assets)
+        return estimate.matrix[np.ix_(index, index)]
+    volatilities = np.asarray(volatilities, dtype=np.float64)
+    return np.outer(volatilities, volatilities)
+
+
+def portfolio_variance(weights, covariance):
+    """비중 벡터(또는 N x M 비중 행렬)의 포트폴리오 분산 wᵀΣw 를 계산합니다."""
+    weights = np.atleast_2d(weights)
+    variance = np.einsum("ij,jk,ik->i", weights, covariance, weights)
+    return variance if variance.size > 1 else float(variance[0])
+
+
+def portfolio_risk(portfolio, horizon, **kwargs):
+    """get_portfolio 비중(%)의 연율화 변동성을 공분산으로 계산합니다.
+
+    가격 데이터가 없거나 포트폴리오 자산이 가격 데이터에 없으면 None 을 반환합니다.
+    """
+    estimate = get_covariance(horizon, **kwargs)
+    if estimate is None or not set(portfolio).issubset(estimate.assets):
+        return None
+    weights = weights_to_matrix(portfolio, estimate.assets)[0]
+    return float(np.sqrt(portfolio_variance(weights, estimate.matrix)))
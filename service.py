@@ -0,0 +1,180 @@
+import json
+import sys
+import threading
+import time
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from data_store import data_signature
+from portfolio_core import (EXPERIENCE_MAPPING, GOAL_MAPPING, MARKET_MAPPING, RISK_MAPPING, SurveyAnswers,
+                            backtest_summary, portfolio_metrics, recommend_many)
+from portfolios import HORIZONS, RISK_LEVELS
+
+DEFAULT_PORT = 8600
+# 한 요청에서 채점할 수 있는 최대 설문 수
+MAX_BATCH_SIZE = 100_000
+# 데이터 파일 시그니처를 다시 확인하는 간격 (초)
+SIGNATURE_TTL = 1.0
+SURVEY_FIELDS = ("goal", "experience", "market", "risk", "horizon")
+# 항목별 허용 응답 (채점표에 없는 응답이 0점으로 채점되지 않도록 거부)
+SURVEY_CHOICES = {
+    "goal": GOAL_MAPPING,
+    "experience": EXPERIENCE_MAPPING,
+    "market": MARKET_MAPPING,
+    "risk": RISK_MAPPING,
+    "horizon": HORIZONS,
+}
+
+
+class ServiceError(Exception):
+    """잘못된 요청 (HTTP 400)"""
+
+
+class ProfileCache:
+    """(위험성향, 투자 기간)별 포트폴리오 지표와 백테스트 요약을 데이터 파일이 바뀔 때까지 보관합니다."""
+
+    def __init__(self, ttl=SIGNATURE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._signature = None
+        self._checked_at = 0.0
+        self._values = {}
+
+    def _refresh(self):
+        # 시그니처 확인(os.stat)은 ttl 간격으로만 수행
+        now = time.monotonic()
+        if now - self._checked_at < self.ttl:
+            return
+        self._checked_at = now
+        signature = data_signature()
+        if signature != self._signature:
+            self._signature = signature
+            self._values = {}
+
+    def get(self, kind, risk, horizon):
+        with self._lock:
+            self._refresh()
+            key = (kind, risk, horizon)
+            if key not in self._values:
+                compute = portfolio_metrics if kind == "portfolio" else backtest_summary
+                self._values[key] = compute(risk, horizon)
+            return self._values[key]
+
+
+_cache = ProfileCache()
+
+
+def parse_survey(payload):
+    """JSON 객체 하나를 SurveyAnswers 로 변환합니다."""
+    if not isinstance(payload, dict):
+        raise ServiceError("설문은 JSON 객체여야 합니다.")
+    missing = [name for name in SURVEY_FIELDS if name not in payload]
+    if missing:
+        raise ServiceError(f"설문 항목이 없습니다: {', '.join(missing)}")
+    if payload["horizon"] not in HORIZONS:
+        raise ServiceError(f"지원하지 않는 투자 기간입니다: {payload['horizon']}")
+    for name, choices in SURVEY_CHOICES.items():
+        if not isinstance(payload[name], str) or payload[name] not in choices:
+            raise ServiceError(f"{name} 응답은 {list(choices)} 중 하나여야 합니다: {payload[name]}")
+    return SurveyAnswers(*(str(payload[name]) for name in SURVEY_FIELDS))
+
+
+def score_payload(payload):
+    """POST /score 본문을 처리합니다. 설문 하나 또는 {"surveys": [...]} 목록을 받습니다."""
+    single = not (isinstance(payload, dict) and "surveys" in payload)
+    surveys = [payload] if single else payload["surveys"]
+    if not isinstance(surveys, list):
+        raise ServiceError("surveys 는 목록이어야 합니다.")
+    if len(surveys) > MAX_BATCH_SIZE:
+        raise ServiceError(f"한 번에 최대 {MAX_BATCH_SIZE}건까지 채점할 수 있습니다.")
+    answers = [parse_survey(survey) for survey in surveys]
+    results = [
+        recommendation.to_dict()
+        for recommendation in recommend_many(answers, lambda risk, horizon: _cache.get("portfolio", risk, horizon))
+    ]
+    return results[0] if single else {"results": results}
+
+
+def profile_payload(kind, query):
+    """GET /portfolio, /backtest 의 risk/horizon 쿼리를 처리합니다."""
+    risk = query.get("risk", [""])[0]
+    horizon = query.get("horizon", [""])[0]
+    if risk not in RISK_LEVELS or horizon not in HORIZONS:
+        raise ServiceError(f"risk 는 {RISK_LEVELS}, horizon 은 {HORIZONS} 중 하나여야 합니다.")
+    value = _cache.get(kind, risk, horizon)
+    return None if value is None else asdict(value)
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """설문 채점과 포트폴리오/백테스트 조회 JSON API"""
+
+    def _send(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self, handler):
+        try:
+            body = handler()
+        except ServiceError as error:
+            self._send(400, {"error": str(error)})
+            return
+        if body is None:
+            self._send(404, {"error": "데이터가 없습니다."})
+        else:
+            self._send(200, body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/health":
+            self._send(200, {"status": "ok"})
+        elif url.path in ("/portfolio", "/backtest"):
+            self._handle(lambda: profile_payload(url.path[1:], query))
+        else:
+            self._send(404, {"error": "알 수 없는 경로입니다."})
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/score":
+            self._send(404, {"error": "알 수 없는 경로입니다."})
+            return
+
+        def handler():
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                raise ServiceError("Content-Length 가 올바른 정수가 아닙니다.")
+            if length < 0:
+                raise ServiceError("Content-Length 는 음수일 수 없습니다.")
+            try:
+                payload = json.loads(self.rfile.read(length) or b"null")
+            except ValueError:
+                raise ServiceError("본문이 올바른 JSON 이 아닙니다.")
+            return score_payload(payload)
+
+        self._handle(handler)
+
+    def log_message(self, format, *args):
+        # 요청마다 stderr 로그를 남기지 않음
+        pass
+
+
+def serve(port=DEFAULT_PORT, host="127.0.0.1"):
+    """HTTP 서비스를 시작합니다."""
+    server = ThreadingHTTPServer((host, port), ServiceHandler)
+    print(f"http://{host}:{port} 에서 서비스 중입니다.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    # 사용법: python service.py [포트]
+    serve(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT)
@@ -0,0 +1,125 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from instrumentation import METRICS
+from portfolio_core import SurveyAnswers, score_survey
+
+# 환경 변수: 세션 하나가 보관할 수 있는 파생 결과(편집 상태 등)의 메모리 상한(MB)
+SESSION_BUDGET_ENV = "VIA_SESSION_BUDGET_MB"
+DEFAULT_SESSION_BUDGET_MB = 4.0
+# 설문 위젯의 세션 상태 키
+ANSWER_KEYS = {
+    "goal": "user_goal",
+    "experience": "user_experience",
+    "market": "user_market",
+    "risk": "user_risk",
+    "horizon": "user_horizon",
+}
+PROFILE_KEY = "profile"
+ARTIFACTS_KEY = "artifacts"
+
+
+@dataclass(frozen=True)
+class SessionProfile:
+    """세션이 보관하는 설문 응답과 채점 결과. 데이터와 차트는 세션 간 공유 캐시에서 가져옵니다."""
+    answers: SurveyAnswers
+    score: int
+    risk_level: str
+
+    @property
+    def key(self):
+        """(위험성향, 투자 기간)"""
+        return self.risk_level, self.answers.horizon
+
+
+def session_profile(session_state):
+    """세션의 설문 응답으로 SessionProfile 을 반환합니다. 응답이 바뀐 경우에만 다시 채점합니다."""
+    answers = SurveyAnswers(**{field: session_state.get(key) for field, key in ANSWER_KEYS.items()})
+    profile = session_state.get(PROFILE_KEY)
+    if profile is None or profile.answers != answers:
+        profile = SessionProfile(answers, *score_survey(answers))
+        session_state[PROFILE_KEY] = profile
+    return profile
+
+
+def artifact_nbytes(value):
+    """파생 결과의 세션 전용 메모리 크기(바이트). 공유 데이터를 가리키는 객체는 nbytes 로 자기 몫만 보고합니다."""
+    nbytes = getattr(value, "nbytes", None)
+    if nbytes is not None:
+        return int(nbytes)
+    memory_usage = getattr(value, "memory_usage", None)
+    if memory_usage is not None:
+        usage = memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    return sys.getsizeof(value)
+
+
+def session_budget_bytes():
+    """세션별 메모리 상한 (VIA_SESSION_BUDGET_MB, 기본 4MB)"""
+    return int(float(os.environ.get(SESSION_BUDGET_ENV, DEFAULT_SESSION_BUDGET_MB)) * 1024 * 1024)
+
+
+class SessionArtifacts:
+    """세션별 파생 결과의 LRU 저장소
+
+    합계가 budget 바이트를 넘으면 가장 오래 쓰지 않은 항목부터 버립니다. 버려진 항목은 공유 데이터와
+    위젯 상태로 다시 만들 수 있는 것만 넣어야 합니다. 크기는 넣을 때와 touch 할 때 다시 잽니다.
+    """
+
+    def __init__(self, budget, metrics=METRICS):
+        self.budget = budget
+        self._metrics = metrics
+        self._items = OrderedDict()  # 키 -> (값, 크기)
+        self._lock = threading.Lock()
+        self.nbytes = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return default
+            self._items.move_to_end(key)
+            return item[0]
+
+    def put(self, key, value):
+        """값을 넣고 상한을 넘으면 오래된 항목을 버립니다. (방금 넣은 항목은 버리지 않음)"""
+        with self._lock:
+            self._store(key, value)
+        return value
+
+    def touch(self, key):
+        """값이 제자리에서 커졌을 수 있으므로 크기를 다시 잽니다."""
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._store(key, item[0])
+
+    def _store(self, key, value):
+        previous = self._items.pop(key, None)
+        if previous is not None:
+            self.nbytes -= previous[1]
+        size = artifact_nbytes(value)
+        self._items[key] = (value, size)
+        self.nbytes += size
+        while self.nbytes > self.budget and len(self._items) > 1:
+            _, (_, evicted) = self._items.popitem(last=False)
+            self.nbytes -= evicted
+            self._metrics.increment("session_evictions_total")
+
+
+def session_artifacts(session_state):
+    """세션의 SessionArtifacts (없으면 현재 상한으로 만듭니다)"""
+    artifacts = session_state.get(ARTIFACTS_KEY)
+    if artifacts is None:
+        artifacts = SessionArtifacts(session_budget_bytes())
+        session_state[ARTIFACTS_KEY] = artifacts
+    return artifacts
@@ -0,0 +1,129 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from data_store import ASSET_DATA_FILES, get_store
+from risk import asset_covariance
+
+# 투자 기간별 시뮬레이션 거래일 수
+HORIZON_DAYS = {
+    "6개월": 126,
+    "2년": 504,
+}
+TRADING_DAYS = 252
+PERCENTILES = (5, 25, 50, 75, 95)
+# 난수 스트림 단위 (블록 크기와 무관하게 같은 seed 면 같은 결과가 나오도록 고정)
+STREAM_PATHS = 1024
+
+
+@dataclass
+class SimulationResult:
+    """몬테카를로 시뮬레이션 요약"""
+    days: np.ndarray
+    percentiles: pd.DataFrame
+    terminal_returns: np.ndarray
+
+    @property
+    def probability_of_loss(self):
+        """기간 말 NAV 가 원금보다 낮을 확률"""
+        return float(np.mean(self.terminal_returns < 0))
+
+    def value_at_risk(self, level=0.95):
+        """기간 수익률의 (1 - level) 분위수 손실"""
+        return float(-np.quantile(self.terminal_returns, 1.0 - level))
+
+    def expected_shortfall(self, level=0.95):
+        """VaR 를 넘는 손실의 평균"""
+        threshold = np.quantile(self.terminal_returns, 1.0 - level)
+        return float(-self.terminal_returns[self.terminal_returns <= threshold].mean())
+
+
+def simulate_portfolio(weights, expected_returns, volatilities, correlation=None, n_days=126,
+                       n_paths=100_000, seed=None, memory_limit_mb=256, n_checkpoints=50,
+                       initial_nav=100.0):
+    """상관된 자산 수익률 경로를 생성하여 매일 리밸런싱되는 포트폴리오의 NAV 분포를 계산합니다.
+
+    자산 로그 수익률은 연율화 기대수익률/변동성과 상관행렬을 따르는 다변량 정규분포이며,
+    경로는 memory_limit_mb 이내의 블록 단위로 벡터화하여 생성합니다.
+    seed 를 주면 블록 크기와 관계없이 같은 결과를 재현합니다.
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    expected_returns = np.asarray(expected_returns, dtype=np.float64)
+    volatilities = np.asarray(volatilities, dtype=np.float64)
+    n_assets = len(weights)
+    correlation = np.eye(n_assets) if correlation is None else np.asarray(correlation, dtype=np.float64)
+
+    dt = 1.0 / TRADING_DAYS
+    drift = ((expected_returns - 0.5 * volatilities ** 2) * dt).astype(np.float32)
+    daily_covariance = correlation * np.outer(volatilities, volatilities) * dt
+    # 공분산이 수치적으로 양의 정부호가 아닐 때를 대비해 대각에 작은 값을 더함
+    cholesky = np.linalg.cholesky(daily_covariance + 1e-12 * np.eye(n_assets)).T.astype(np.float32)
+    weights32 = weights.astype(np.float32)
+
+    checkpoints = np.unique(np.linspace(0, n_days, min(n_checkpoints, n_days) + 1).round().astype(int))
+    checkpoint_navs = np.empty((n_paths, len(checkpoints)), dtype=np.float32)
+
+    # 경로 하나당 (일수 x 자산) float32 배열 2개 정도가 필요
+    bytes_per_path = n_days * n_assets * 4 * 2
+    streams_per_block = max(1, int(memory_limit_mb * 2 ** 20 // (bytes_per_path * STREAM_PATHS)))
+    seeds = np.random.SeedSequence(seed).spawn(-(-n_paths // STREAM_PATHS))
+
+    for first_stream in range(0, len(seeds), streams_per_block):
+        blocks = []
+        for stream, seed_sequence in enumerate(seeds[first_stream:first_stream + streams_per_block]):
+            size = min(STREAM_PATHS, n_paths - (first_stream + stream) * STREAM_PATHS)
+            rng = np.random.default_rng(seed_sequence)
+            blocks.append(rng.standard_normal((size, n_days, n_assets), dtype=np.float32))
+        shocks = np.concatenate(blocks) if len(blocks) > 1 else blocks[0]
+
+        # 상관 구조 적용 후 자산 단순 수익률 -> 포트폴리오 일간 수익률
+        asset_returns = np.expm1(shocks @ cholesky + drift, out=shocks)
+        portfolio_returns = asset_returns @ weights32
+        nav = np.empty((len(shocks), n_days + 1), dtype=np.float32)
+        nav[:, 0] = initial_nav
+        np.cumprod(1.0 + portfolio_returns, axis=1, out=nav[:, 1:])
+        nav[:, 1:] *= initial_nav
+
+        start = first_stream * STREAM_PATHS
+        checkpoint_navs[start:start + len(shocks)] = nav[:, checkpoints]
+
+    percentiles = pd.DataFrame(
+        np.percentile(checkpoint_navs, PERCENTILES, axis=0).T,
+        index=pd.Index(checkpoints, name="거래일"),
+        columns=[f"{p}%" for p in PERCENTILES],
+    )
+    terminal_returns = checkpoint_navs[:, -1].astype(np.float64) / initial_nav - 1.0
+    return SimulationResult(checkpoints, percentiles, terminal_returns)
+
+
+def simulation_inputs(portfolio, horizon):
+    """get_portfolio 비중(%)에 대한 (비중, 기대수익률, 변동성, 상관행렬)을 준비합니다.
+
+    상관행렬은 가격 데이터의 공분산에서 구하며, 가격 데이터가 없거나 자산이 빠져 있으면
+    화면의 변동성과 같이 상관관계 1 로 가정합니다. 자산 통계가 없는 자산이 있으면 None 을 반환합니다.
+    """
+    stats = get_store().asset_stats.get(ASSET_DATA_FILES.get(horizon, ASSET_DATA_FILES["2년"]))
+    if stats is None or not set(portfolio).issubset(stats.assets):
+        return None
+    assets = list(portfolio)
+    index = [stats.assets.index(asset) for asset in assets]
+    weights = np.array([portfolio[asset] / 100 for asset in assets])
+
+    volatilities = stats.volatility[index]
+    covariance = asset_covariance(assets, horizon, volatilities)
+    deviations = np.sqrt(np.diag(covariance))
+    scale = np.outer(deviations, deviations)
+    # 변동성이 0 인 자산은 다른 자산과 상관 없음으로 둠
+    correlation = np.divide(covariance, scale, out=np.eye(len(assets)), where=scale > 0)
+
+    return weights, stats.expected_return[index], volatilities, correlation
+
+
+def simulate_profile(portfolio, horizon, n_paths=100_000, seed=0, **kwargs):
+    """포트폴리오와 투자 기간으로 시뮬레이션을 실행합니다. 입력이 없으면 None 을 반환합니다."""
+    inputs = simulation_inputs(portfolio, horizon)
+    if inputs is None:
+        return None
+    return simulate_portfolio(*inputs, n_days=HORIZON_DAYS.get(horizon, HORIZON_DAYS["2년"]),
+                              n_paths=n_paths, seed=seed, **kwargs)
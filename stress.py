@@ -0,0 +1,152 @@
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from backtest import load_price_data, weights_to_matrix
+from data_store import ASSET_DATA_FILES, get_store
+from portfolios import model_portfolios
+from registry import get_registry
+
+# 과거 위기 구간 (고점 부근 시작일, 저점 부근 종료일). 가격 데이터가 구간 시작을 포함할 때만 재현
+HISTORICAL_SCENARIOS = {
+    "2008 금융위기": ("2007-10-09", "2009-03-09"),
+    "2020 코로나 폭락": ("2020-02-19", "2020-03-23"),
+    "2022 금리 충격": ("2022-01-03", "2022-10-14"),
+}
+# 가정 충격: {자산군 또는 티커: 즉시 수익률}. 티커 값이 자산군 값보다 우선
+PARAMETRIC_SHOCKS = {
+    "주식 급락 -30%": {"주식": -0.30, "부동산": -0.20, "채권": 0.02, "원자재": 0.05},
+    "금리 급등 +200bp": {"주식": -0.10, "부동산": -0.15, "채권": -0.08, "원자재": -0.05, "BIL": -0.005, "HYG": -0.10},
+    "스태그플레이션": {"주식": -0.20, "부동산": -0.15, "채권": -0.06, "원자재": 0.15},
+}
+# 레지스트리에 없는 기본 자산 이름의 자산군
+ASSET_CLASS_ALIASES = {"Equity": "주식", "Fixed Income": "채권"}
+# 구간 시작일과 가격 데이터 첫 날의 허용 간격 (휴장일 보정)
+START_TOLERANCE = pd.Timedelta(days=7)
+TRADING_DAYS = 252
+
+
+@dataclass(frozen=True)
+class StressResult:
+    """시나리오 x 포트폴리오 스트레스 테스트 결과 (평가할 수 없는 칸은 NaN)"""
+    scenarios: tuple
+    kinds: tuple  # 시나리오별 "과거" 또는 "가정"
+    profiles: tuple  # (위험성향, 투자 기간)
+    loss: np.ndarray  # 고점 대비 최대 손실률 (음수)
+    recovery_days: np.ndarray  # 저점에서 고점 회복까지 거래일 수 (미회복이면 inf)
+
+    def to_frame(self, risk, horizon):
+        """한 프로필의 시나리오별 결과 표"""
+        j = self.profiles.index((risk, horizon))
+        return pd.DataFrame({
+            "시나리오": self.scenarios,
+            "유형": self.kinds,
+            "최대 손실": self.loss[:, j],
+            "회복 기간(거래일)": self.recovery_days[:, j],
+        })
+
+
+def shock_matrix(assets, shocks=PARAMETRIC_SHOCKS):
+    """가정 충격을 (시나리오 x 자산) 수익률 행렬로 변환합니다. 지정하지 않은 자산은 0"""
+    registry = get_registry()
+    asset_classes = [registry.get(asset).asset_class if asset in registry else ASSET_CLASS_ALIASES.get(asset)
+                     for asset in assets]
+    matrix = np.zeros((len(shocks), len(assets)))
+    for i, shock in enumerate(shocks.values()):
+        for j, (asset, asset_class) in enumerate(zip(assets, asset_classes)):
+            matrix[i, j] = shock.get(asset, shock.get(asset_class, 0.0))
+    return matrix
+
+
+def expected_returns(profiles, weights, assets):
+    """프로필 투자 기간의 자산 기대수익률로 포트폴리오 기대수익률을 계산합니다. 데이터가 없으면 NaN"""
+    result = np.full(len(profiles), np.nan)
+    store = get_store()
+    for p, (_, horizon) in enumerate(profiles):
+        stats = store.asset_stats.get(ASSET_DATA_FILES.get(horizon, ASSET_DATA_FILES["2년"]))
+        held = [asset for asset, weight in zip(assets, weights[p]) if weight > 0]
+        if stats is None or not set(held).issubset(stats.assets):
+            continue
+        index = {asset: i for i, asset in enumerate(stats.assets)}
+        result[p] = sum(weights[p, j] * stats.expected_return[index[asset]]
+                        for j, asset in enumerate(assets) if weights[p, j] > 0)
+    return result
+
+
+def replay_window(prices, weights, start, end):
+    """가격 구간의 NAV 경로를 모든 포트폴리오에 대해 한 번에 계산하고 (손실, 회복 거래일)을 반환합니다.
+
+    손실은 구간 안의 고점 대비 최대 낙폭이며, 회복은 저점 이후 구간 밖을 포함한 가격 데이터 끝까지
+    고점을 다시 넘는 데 걸린 거래일 수입니다. 구간 시작에 가격이 없는 자산을 보유한 포트폴리오는 NaN
+    """
+    n_profiles = weights.shape[0]
+    loss, recovery = np.full(n_profiles, np.nan), np.full(n_profiles, np.nan)
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    if prices.empty or prices.index[0] > start + START_TOLERANCE or prices.index[-1] < end:
+        return loss, recovery
+    path = prices[prices.index >= start]
+    values = path.to_numpy(dtype=np.float64)
+    covered = ~(weights[:, np.isnan(values[0])] > 0).any(axis=1)
+
+    # (T-1 x M) @ (M x P) -> 구간 시작 이후 포트폴리오별 NAV
+    returns = np.nan_to_num(values[1:] / values[:-1] - 1.0) @ weights.T
+    nav = np.vstack([np.ones(n_profiles), np.cumprod(1.0 + returns, axis=0)])
+    window = int(np.searchsorted(path.index, end, side="right"))
+    running_max = np.maximum.accumulate(nav[:window], axis=0)
+    drawdown = nav[:window] / running_max - 1.0
+    trough = drawdown.argmin(axis=0)
+    peak = running_max[trough, np.arange(n_profiles)]
+
+    # 저점 이후 처음으로 고점 이상이 된 날
+    recovered = (nav >= peak) & (np.arange(len(nav))[:, None] > trough)
+    first = recovered.argmax(axis=0)
+    days = np.where(recovered.any(axis=0), first - trough, np.inf)
+    days[drawdown.min(axis=0) == 0] = 0
+    loss[covered] = drawdown.min(axis=0)[covered]
+    recovery[covered] = days[covered]
+    return loss, recovery
+
+
+def run_stress_tests(portfolios=None, prices=None):
+    """모든 모델 포트폴리오에 과거 위기 구간과 가정 충격을 한 번에 적용합니다.
+
+    portfolios 는 {(위험성향, 투자 기간): 비중(%)}(기본값 model_portfolios()), prices 는 일별 가격입니다.
+    가정 충격의 회복 기간은 포트폴리오 기대수익률로 손실을 만회하는 데 걸리는 예상 거래일 수입니다.
+    """
+    portfolios = model_portfolios() if portfolios is None else portfolios
+    prices = load_price_data() if prices is None else prices
+    profiles = tuple(portfolios)
+    assets = list(dict.fromkeys(asset for portfolio in portfolios.values() for asset in portfolio))
+    weights = weights_to_matrix(list(portfolios.values()), assets)
+
+    # 과거 구간: 가격 데이터에 모든 보유 자산이 있는 경우에만 재현
+    historical = [replay_window(prices.reindex(columns=assets), weights, start, end)
+                  for start, end in HISTORICAL_SCENARIOS.values()]
+
+    # 가정 충격: (시나리오 x 자산) @ (자산 x 포트폴리오) 행렬곱 한 번
+    shocked = shock_matrix(assets) @ weights.T
+    shocked = np.minimum(shocked, 0.0)
+    growth = np.log1p(expected_returns(profiles, weights, assets))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        estimated = np.where(growth > 0, -np.log1p(shocked) / growth * TRADING_DAYS, np.inf)
+    estimated = np.where(shocked == 0, 0.0, estimated)
+    estimated = np.where(np.isnan(growth), np.nan, np.ceil(estimated))
+
+    return StressResult(
+        scenarios=tuple(HISTORICAL_SCENARIOS) + tuple(PARAMETRIC_SHOCKS),
+        kinds=("과거",) * len(HISTORICAL_SCENARIOS) + ("가정",) * len(PARAMETRIC_SHOCKS),
+        profiles=profiles,
+        loss=np.vstack([loss for loss, _ in historical] + [shocked]),
+        recovery_days=np.vstack([recovery for _, recovery in historical] + [estimated]),
+    )
+
+
+if __name__ == "__main__":
+    # 사용법: python stress.py [위험성향] [투자 기간]
+    result = run_stress_tests()
+    selected = [tuple(sys.argv[1:3])] if len(sys.argv) > 2 else result.profiles
+    for profile in selected:
+        print(" / ".join(profile))
+        print(result.to_frame(*profile).to_string(index=False))
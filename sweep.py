@@ -0,0 +1,111 @@
+import itertools
+import os
+import sys
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backtest import REBALANCE_RULES, load_price_data, run_rebalanced_backtest, weights_to_matrix
+from portfolios import model_portfolios
+
+# 스윕 결과 파일 (python sweep.py 로 생성)
+SWEEP_RESULTS_PATH = "sweep_results.csv"
+# 기본 스윕 격자
+COST_BPS = (0, 5, 10, 25, 50)
+BANDS = (0.02, 0.05, 0.10)
+
+# 작업 프로세스에서 공유 메모리에 연결한 가격 데이터
+_shared = {}
+
+
+def _attach(name, shape, dates, assets):
+    """작업 프로세스 초기화: 공유 메모리의 가격 배열을 복사 없이 연결합니다."""
+    block = shared_memory.SharedMemory(name=name)
+    values = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+    _shared["block"] = block  # 연결이 끊기지 않도록 참조 유지
+    _shared["prices"] = pd.DataFrame(values, index=pd.DatetimeIndex(dates), columns=assets, copy=False)
+
+
+def _evaluate(task):
+    """(규칙, 밴드, 비용) 하나에 대해 모든 포트폴리오를 한 번에 백테스트합니다."""
+    rule, band, cost_bps, weights = task
+    prices = _shared["prices"]
+    result, turnover, rebalances = run_rebalanced_backtest(weights, prices, rule, band, cost_bps)
+    years = (prices.index[-1] - prices.index[0]).days / 365.25
+    log_nav = np.log(result.nav)
+    return {
+        "리밸런싱": rule,
+        "밴드": band if rule == "band" else np.nan,
+        "비용(bp)": cost_bps,
+        "누적 수익률": log_nav[-1] - log_nav[0],
+        "연율화 수익률": (result.nav[-1] / result.nav[0]) ** (1 / years) - 1 if years > 0 else np.nan,
+        "연율화 변동성": np.diff(log_nav, axis=0).std(axis=0) * np.sqrt(252),
+        "최대 낙폭(MDD)": result.drawdown.min(axis=0),
+        "연간 회전율": turnover / years if years > 0 else np.nan,
+        "리밸런싱 횟수": rebalances,
+    }
+
+
+def sweep_tasks(weights, rules=REBALANCE_RULES, costs=COST_BPS, bands=BANDS):
+    """리밸런싱 규칙 x 밴드 x 비용 격자의 작업 목록을 만듭니다. 밴드는 band 규칙에만 적용합니다."""
+    tasks = []
+    for rule, cost_bps in itertools.product(rules, costs):
+        for band in (bands if rule == "band" else (np.nan,)):
+            tasks.append((rule, band, cost_bps, weights))
+    return tasks
+
+
+def run_sweep(portfolios, prices, rules=REBALANCE_RULES, costs=COST_BPS, bands=BANDS, processes=None):
+    """{(위험성향, 투자 기간): 비중(%)} 포트폴리오들을 리밸런싱/비용 격자로 병렬 평가합니다.
+
+    가격 배열은 공유 메모리에 한 번만 올리고 작업 프로세스는 이를 복사 없이 참조합니다.
+    결과는 (포트폴리오 x 격자) 행의 데이터프레임입니다.
+    """
+    keys = list(portfolios)
+    weights = weights_to_matrix([portfolios[key] for key in keys], prices.columns)
+    values = prices.to_numpy(dtype=np.float64)
+    tasks = sweep_tasks(weights, rules, costs, bands)
+
+    block = shared_memory.SharedMemory(create=True, size=values.nbytes)
+    try:
+        np.ndarray(values.shape, dtype=np.float64, buffer=block.buf)[:] = values
+        initargs = (block.name, values.shape, prices.index.to_numpy(), list(prices.columns))
+        with Pool(processes=processes or os.cpu_count(), initializer=_attach, initargs=initargs) as pool:
+            outputs = pool.map(_evaluate, tasks, chunksize=1)
+    finally:
+        block.close()
+        block.unlink()
+
+    rows = []
+    for output in outputs:
+        for i, (risk, horizon) in enumerate(keys):
+            row = {"위험성향": risk, "투자 기간": horizon}
+            row.update({name: value[i] if isinstance(value, np.ndarray) else value for name, value in output.items()})
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def sweep_results_signature(file_path=SWEEP_RESULTS_PATH):
+    """스윕 결과 파일의 (크기, 수정시각). 파일이 없으면 None. 캐시 키로 사용합니다."""
+    if not os.path.exists(file_path):
+        return None
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def load_sweep_results(file_path=SWEEP_RESULTS_PATH):
+    """저장된 스윕 결과를 로드합니다. 파일이 없으면 빈 데이터프레임을 반환합니다."""
+    if not os.path.exists(file_path):
+        return pd.DataFrame()
+    return pd.read_csv(file_path)
+
+
+if __name__ == "__main__":
+    # 사용법: python sweep.py [프로세스 수]
+    price_data = load_price_data()
+    if price_data.empty:
+        sys.exit("가격 데이터(price_data.csv)가 없습니다.")
+    results = run_sweep(model_portfolios(), price_data, processes=int(sys.argv[1]) if len(sys.argv) > 1 else None)
+    results.to_csv(SWEEP_RESULTS_PATH, index=False)
+    print(f"{len(results)}개 결과를 {SWEEP_RESULTS_PATH} 에 저장했습니다.")
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from analytics import RollingAnalytics, WindowDrawdown
+
+
+def brute_force_drawdown(navs):
+    """창 안에서 고점 이후 가장 깊은 하락 (O(n^2) 기준값)"""
+    return min(min(navs[j] / max(navs[:j + 1]) - 1.0 for j in range(len(navs))), 0.0)
+
+
+def test_window_drawdown_matches_brute_force():
+    rng = np.random.default_rng(0)
+    navs = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 500)))
+    window = WindowDrawdown(21)
+    for index, nav in enumerate(navs):
+        window.push(np.log(nav))
+        expected = brute_force_drawdown(list(navs[max(0, index - 20):index + 1]))
+        assert np.isclose(window.max_drawdown, expected, atol=1e-12)
+
+
+def test_rolling_calmar_uses_window_drawdown():
+    # 처음 100일 동안 -50% 하락 후 3년간 꾸준히 상승
+    navs = np.concatenate([np.linspace(100, 50, 101), 50 * np.exp(0.0005 * np.arange(1, 757))])
+    dates = pd.bdate_range("2020-01-01", periods=len(navs))
+    frame = RollingAnalytics(63).extend(dates, navs).to_frame()
+
+    # 하락 중인 창: 칼마 = 연율 로그 수익률 / 창 안 최대 낙폭
+    expected = np.log(navs[100] / navs[37]) * 252 / 63 / (1 - navs[100] / navs[37])
+    assert np.isclose(frame["칼마"].iloc[100], expected)
+    # 창 안에 낙폭이 없으면 과거 폭락과 무관하게 정의되지 않음
+    assert frame["칼마"].iloc[164:].isna().all()
+    assert frame["낙폭"].iloc[-1] < 0  # 전체 고점은 아직 회복하지 못함
+
+
+def test_rolling_calmar_includes_new_trough_on_same_day():
+    navs = [100, 110, 100, 90, 120, 80]
+    frame = RollingAnalytics(3).extend(pd.bdate_range("2020-01-01", periods=len(navs)), navs).to_frame()
+    # 마지막 창: 수익률 3개 = NAV [100, 90, 120, 80], 그날 새 저점이 생긴 최대 낙폭 80/120 - 1
+    expected = np.log(80 / 100) * 252 / 3 / (1 - 80 / 120)
+    assert np.isclose(frame["칼마"].iloc[-1], expected)
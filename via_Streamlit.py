@@ -1,10 +1,5 @@
 import streamlit as st
-import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from datetime import datetime
-from collections import defaultdict
 
 # 초기 화면 설정
 if "page" not in st.session_state:
@@ -56,6 +51,7 @@ def survey_page():
             go_to_page("portfolio")
 
 def portfolio_page():
+    import matplotlib.pyplot as plt  # 설문 화면 첫 렌더를 늦추지 않도록 이 화면에서만 임포트
 
     st.title("📊 추천 포트폴리오")
 
@@ -1,11 +1,18 @@
+import os
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import os
-import plotly.express as px
-import plotly.graph_objects as go
-from matplotlib import cm
+from analytics import RollingAnalytics, infer_periods_per_year
+from data_store import ASSET_DATA_FILES, BACKTEST_DATA_FILES, data_signature, get_store
+from downsample import chart_points
+from instrumentation import (DEFAULT_METRICS_HOST, METRICS, METRICS_HOST_ENV, METRICS_LOG_ENV, METRICS_PORT_ENV,
+                             dev_overlay_enabled, instrument_cache, start_metrics_server)
+from portfolio_core import PERIOD_WINDOWS, calculate_risk_score, map_risk_level_by_score
+from portfolios import get_portfolio
+from registry import get_registry
+from session_memory import session_artifacts, session_profile
+
+# 차트/시뮬레이션/스윕 모듈(plotly 등)은 설문 화면의 첫 렌더를 늦추지 않도록 사용하는 함수 안에서 임포트
 
 st.set_page_config(layout="wide")
 # 초기 화면 설정
@@ -16,91 +23,149 @@ if "page" not in st.session_state:
 def go_to_page(page_name):
     st.session_state.page = page_name
 
-# 위험성향 스코어링 함수
-def map_risk_level_by_score(score):
-    if score <= 5:
-        return "안정추구형"
-    elif score <= 8:
-        return "위험중립형"
-    else:
-        return "공격투자형"
-
-# 투자 성향 점수를 기반으로 리스크 레벨 계산
-def calculate_risk_score(user_goal, user_experience, user_market, user_risk):
-    score = 0
-
-    # 투자 목표 가중치
-    goal_mapping = {
-        "자산 보호": 1,  # 안정적
-        "안정적 수익": 2,  # 중립적
-        "고수익 추구": 3  # 공격적
-    }
-    score += goal_mapping.get(user_goal, 0)
-
-    # 투자 경험 가중치
-    experience_mapping = {
-        "전혀 없음": 1,  # 안정적
-        "초보 수준": 2,  # 중립적
-        "경험이 많음": 3  # 공격적
-    }
-    score += experience_mapping.get(user_experience, 0)
-
-    # 시장 변동 대응 가중치
-    market_mapping = {
-        "자산을 매도하여 손실 최소화": 1,  # 안정적
-        "시장 상황을 관망": 2,  # 중립적
-        "추가 투자를 고려": 3  # 공격적
-    }
-    score += market_mapping.get(user_market, 0)
-
-    # 리스크 허용 수준 가중치
-    risk_mapping = {
-        "리스크를 피하고 싶음": 1,  # 안정적
-        "일부 리스크 감수 가능": 2,  # 중립적
-        "높은 리스크도 수용 가능": 3  # 공격적
-    }
-    score += risk_mapping.get(user_risk, 0)
-
-    return score
-
-# 데이터 로드
-@st.cache_data
-def load_backtest_data(risk, horizon):
-    """백테스트 데이터를 로드합니다."""
-    
-    if risk=="안정추구형" and horizon=="6개월":
-        file_path = "back_data_단기_RA.csv"
-    elif risk=="위험중립형" and horizon=="6개월":
-        file_path = "back_data_단기_RN.csv"
-    elif risk=="공격투자형" and horizon=="6개월":
-        file_path = "back_data_단기_RT.csv"
-    elif risk=="안정추구형" and horizon=="2년":
-        file_path = "back_data_장기_RA.csv"
-    elif risk=="위험중립형" and horizon=="2년":
-        file_path = "back_data_장기_RN.csv"
-    else:
-        file_path = "back_data_장기_RT.csv"
-
-    if not os.path.exists(file_path):
-        st.error("백테스트 결과 파일이 존재하지 않습니다.")
-        return pd.DataFrame()  # 빈 데이터프레임 반환
-    backtest_data = pd.read_csv(file_path)
-    backtest_data["Date"] = pd.to_datetime(backtest_data["Date"])
-    return backtest_data
+# 데이터 로드 (세션 간 공유 결과는 SnapshotCache, 나머지 로더는 instrument_cache 로 로더별 캐시 적중률 집계)
+@st.cache_resource
+def result_bundle_snapshots():
+    """모든 (위험성향, 투자 기간) 결과 묶음을 세션 간에 공유하는 stale-while-revalidate 캐시
+
+    데이터 파일 시그니처가 바뀌면 이전 결과를 계속 보여 주면서 백그라운드에서 새로 계산합니다.
+    """
+    from refresh import SnapshotCache
+
+    def build(signature):
+        # precompute(차트 라이브러리 포함)는 계산할 때 임포트하여 설문 화면 렌더에 포함되지 않게 함
+        from precompute import build_result_bundles
+        return build_result_bundles()
+    return SnapshotCache(build, "result_bundles")
+
+@st.cache_resource
+def warm_result_bundles():
+    """프로세스당 한 번 모든 결과 묶음을 백그라운드 루프에서 미리 계산합니다. (요청 스레드는 기다리지 않음)"""
+    snapshots = result_bundle_snapshots()
+    snapshots.revalidate(data_signature())
+    return snapshots
+
+@st.cache_resource
+def stress_snapshots():
+    """모든 모델 포트폴리오의 스트레스 테스트 결과 (세션 간 공유, stale-while-revalidate)"""
+    from refresh import SnapshotCache
+    from stress import run_stress_tests
+    return SnapshotCache(lambda signature: run_stress_tests(), "stress_results")
+
+@st.cache_resource
+def attribution_snapshots():
+    """모든 모델 포트폴리오의 수익/위험 기여도 (세션 간 공유, stale-while-revalidate)"""
+    from attribution import run_attribution
+    from refresh import SnapshotCache
+    return SnapshotCache(lambda signature: run_attribution(), "attribution")
+
+@st.cache_resource
+def weight_baseline_snapshots(risk, horizon):
+    """비중 편집기의 기준 입력(기대수익률, 공분산, 자산 수익률) (세션 간 공유, stale-while-revalidate)"""
+    from refresh import SnapshotCache
+    from weight_editor import build_baseline
+    return SnapshotCache(lambda signature: build_baseline(get_portfolio(risk, horizon)[0], horizon), "weight_baseline")
+
+@st.cache_resource
+def simulation_snapshots(risk, horizon):
+    """포트폴리오의 미래 NAV 분포 시뮬레이션 (seed 고정으로 결과 재현 가능, stale-while-revalidate)"""
+    from refresh import SnapshotCache
+    from simulation import simulate_profile
+    return SnapshotCache(
+        lambda signature: simulate_profile(get_portfolio(risk, horizon)[0], horizon, n_paths=100_000, seed=0),
+        "simulation",
+    )
 
-def load_asset_data(horizon):
-    """Asset 데이터를 로드합니다."""
-    
-    if horizon=="6개월":
-        file_path = "asset_data_단기.csv"
-    else:
-        file_path = "asset_data_장기.csv"
+def current_snapshot(snapshots, message="결과를 준비하는 중..."):
+    """현재 데이터 시그니처 기준의 값을 반환합니다. 데이터가 바뀌었으면 이전 값을 반환하고 백그라운드에서 갱신합니다."""
+    if snapshots.signature is None:
+        # 프로세스의 첫 요청만 계산을 기다림
+        with st.spinner(message):
+            return snapshots.get(data_signature())
+    return snapshots.get(data_signature())
+
+def shared_snapshots():
+    """세션 간에 공유하는 stale-while-revalidate 캐시 목록"""
+    from portfolios import HORIZONS, RISK_LEVELS
+    snapshots = [result_bundle_snapshots(), stress_snapshots(), attribution_snapshots()]
+    for risk in RISK_LEVELS:
+        for horizon in HORIZONS:
+            snapshots += [weight_baseline_snapshots(risk, horizon), simulation_snapshots(risk, horizon)]
+    return snapshots
+
+def revalidate_snapshots(snapshots):
+    """이미 계산된 공유 결과를 현재 데이터로 백그라운드에서 다시 계산합니다. (요청 스레드는 기다리지 않음)
+
+    아직 아무도 요청하지 않은 결과는 첫 요청 때 계산합니다.
+    """
+    signature = data_signature()
+    for snapshot in snapshots:
+        if snapshot.signature is not None:
+            snapshot.revalidate(signature)
+
+def get_result_bundle(risk, horizon):
+    """미리 계산된 결과 묶음을 반환합니다."""
+    from precompute import build_result_bundle
+    bundles = current_snapshot(result_bundle_snapshots())
+    bundle = bundles.get((risk, horizon))
+    return bundle if bundle is not None else build_result_bundle(risk, horizon)
+
+@instrument_cache("backtest_charts", st.cache_resource(max_entries=32))
+def load_backtest_charts(risk, horizon, max_points, signature):
+    """(백테스트 데이터, 해상도)별로 다운샘플링한 NAV/MDD 차트를 반환합니다."""
+    from precompute import create_backtest_charts
+    backtest_data = get_result_bundle(risk, horizon).backtest.backtest_data
+    return create_backtest_charts(backtest_data, max_points)
+
+@instrument_cache("sweep_table", st.cache_data)
+def load_sweep_table(risk, horizon, signature):
+    """리밸런싱/거래비용 스윕 결과 중 해당 포트폴리오의 행을 반환합니다. (signature: 스윕 결과 파일의 크기/수정시각)"""
+    from sweep import load_sweep_results
+    results = load_sweep_results()
+    if results.empty:
+        return results
+    selected = (results["위험성향"] == risk) & (results["투자 기간"] == horizon)
+    return results[selected].drop(columns=["위험성향", "투자 기간"]).reset_index(drop=True)
+
+@instrument_cache("rolling_analytics", st.cache_resource)
+def load_rolling_analytics(risk, horizon, window, periods_per_year):
+    """세션 간에 공유되는 롤링 지표 상태를 반환합니다. (새 NAV 는 sync 로 꼬리만 반영, 이력이 바뀌면 다시 계산)"""
+    return RollingAnalytics(window, periods_per_year)
+
+@st.cache_resource
+def start_asset_refresher(interval):
+    """프로세스당 한 번 자산 통계 백그라운드 새로고침을 시작합니다. (교체 후 공유 결과도 백그라운드 갱신)"""
+    from refresh import AssetStatsRefresher
+    snapshots = shared_snapshots()
+    refresher = AssetStatsRefresher(interval=interval, on_refresh=[lambda: revalidate_snapshots(snapshots)])
+    refresher.start()
+    return refresher
+
+@st.cache_resource
+def start_metrics_exporter(port, host):
+    """프로세스당 한 번 Prometheus 텍스트 엔드포인트(/metrics)를 시작합니다."""
+    return start_metrics_server(port, host)
+
+def render_dev_overlay():
+    """이번 재실행의 단계별 시간과 캐시 적중률을 사이드바에 표시합니다."""
+    timings, elapsed = METRICS.rerun_timings()
+    with st.sidebar.expander("⏱️ 성능 (개발자용)", expanded=True):
+        st.metric("이번 재실행", f"{elapsed * 1000:.0f} ms")
+        st.dataframe(
+            pd.DataFrame([(stage, seconds * 1000) for stage, seconds in timings], columns=["단계", "시간(ms)"]),
+            use_container_width=True
+        )
+        st.dataframe(
+            pd.DataFrame.from_dict(METRICS.cache_stats(), orient="index", columns=["calls", "misses", "hit_rate"])
+            .rename(columns={"calls": "호출", "misses": "미스", "hit_rate": "적중률"}),
+            use_container_width=True
+        )
 
-    if not os.path.exists(file_path):
-        st.error("Asset 결과 파일이 존재하지 않습니다.")
-        return pd.DataFrame()  # 빈 데이터프레임 반환
-    asset_data = pd.read_csv(file_path)
-    return asset_data
+def show_load_error(file_name):
+    """데이터 파일이 형식 오류로 적재되지 않았으면 그 이유를 표시합니다."""
+    error = get_store().errors.get(file_name)
+    if error:
+        st.error(f"파일 로드 중 오류 발생: {error}")
 
 # 설문조사 화면
 def survey_page():
@@ -198,160 +263,110 @@ def survey_page():
     # 버튼 아래에 메시지 추가
     st.markdown("<small>버튼을 더블클릭해주세요</small>", unsafe_allow_html=True)
             
-def get_etf_description():
-    """ETF 설명을 반환합니다."""
-    return {
-        "SPY": "S&P 500 지수를 추종하는 ETF로, 미국 대형주에 투자. 포트폴리오의 기본 구성 요소로 적합",
-        "VNQ": "미국 리츠(REITs, 부동산 투자 신탁)에 투자. 부동산 시장의 수익에 접근할 수 있는 방법 제공",
-        "PAVE": "미국 기반 인프라 관련 기업에 투자하는 ETF. 장기적인 경제 성장 테마에 적합",
-        "SCHD": "미국 고배당 성장 주식에 투자. 안정적 배당 수익과 성장을 목표로 설계",
-        "SPYD": "고배당 주식에 투자하는 ETF로, 수익률 중심의 투자자에게 적합",
-        "SKYY": "클라우드 컴퓨팅 관련 기업에 투자하는 ETF. 기술 성장 테마에 적합",
-        "SMH": "반도체 산업 관련 주식에 집중 투자하는 ETF. 기술 혁신의 중심 산업에 투자",
-        "VWO": "신흥 시장(EM) 주식에 투자. 높은 성장 가능성을 가진 국가에 접근",
-        "QQQ": "미국 Nasdaq 지수를 추종하는 ETF로, 미국 주식 중 기술주 중심 투자",
-        "IEF": "미국 국채 7-10년물에 투자하는 ETF",
-        "BIL": "미국 국채 1년 이하 단기물에 투자하는 ETF",
-        "IAU": "금 가격에 직접 투자하는 ETF. 포트폴리오의 헤지(위험 대비) 및 가치 저장 수단으로 자주 사용",
-        "HYG": "미국 하이일드 채권에 투자하는 ETF. 일반적인 국채 및 투자등급 회사채에 비해 높은 Yield 제공"
-    }
-
-def get_portfolio(risk, horizon):
-    """포트폴리오와 ETF 설명을 함께 반환합니다."""
-    portfolios = {
-        ("안정추구형", "6개월"): {"SPY": 20, "IEF": 20, "BIL": 40, "QQQ": 15, "IAU": 5},
-        ("안정추구형", "2년"): {"SPY": 25, "IAU": 5, "SCHD": 20, "SPYD": 15, "IEF": 30},
-        ("위험중립형", "6개월"): {"SPY": 15, "BIL": 40, "HYG": 20, "QQQ": 20, "IAU": 15},
-        ("위험중립형", "2년"): {"SPY": 30, "IAU": 25, "VNQ": 5, "PAVE": 30, "IEF": 10},
-        ("공격투자형", "6개월"): {"SPY": 10, "BIL": 15, "HYG": 25, "QQQ": 30, "SMH": 20},
-        ("공격투자형", "2년"): {"SPY": 30, "SKYY": 5, "SMH": 20, "VWO": 5, "IEF": 40}
-    }
-    portfolio = portfolios.get((risk, horizon), {"Equity": 50, "Fixed Income": 50})
-
-    # ETF 설명 추가
-    etf_descriptions = get_etf_description()
-    portfolio_with_desc = {}
-
-    for asset, weight in portfolio.items():
-        description = etf_descriptions.get(asset, "ETF가 아닌 일반 자산군입니다.")
-        portfolio_with_desc[asset] = {"비중": weight, "설명": description}
+@st.fragment
+def custom_weight_editor(risk, horizon):
+    """추천 비중을 직접 바꿔 보는 편집기. 편집하면 이 부분만 다시 실행되고 바뀐 자산만 증분 계산합니다."""
+    from weight_editor import IncrementalPortfolio
+    baseline = current_snapshot(weight_baseline_snapshots(risk, horizon), "비중 편집기를 준비하는 중...")
+    if baseline is None:
+        return
 
-    return portfolio, portfolio_with_desc
+    st.subheader("✏️ 비중 직접 조정")
+    # 증분 상태는 세션 메모리 상한 안에서 LRU 로 보관 (버려지면 편집기 값으로 다시 만듦)
+    state_key = f"custom_weights/{risk}/{horizon}"
+    artifacts = session_artifacts(st.session_state)
+    state = artifacts.get(state_key)
+    if state is None or state.baseline is not baseline:
+        state = artifacts.put(state_key, IncrementalPortfolio(baseline))
+
+    # 셀 편집이 끝날 때만 재실행되므로 입력 중에는 계산하지 않음. 편집 내용은 위젯 상태에 추천 비중 대비로 남음
+    edited = st.data_editor(
+        pd.DataFrame({"자산": list(baseline.assets), "추천 비중": baseline.weights * 100, "비중": baseline.weights * 100}),
+        column_config={
+            "추천 비중": st.column_config.NumberColumn(format="%.1f%%"),
+            "비중": st.column_config.NumberColumn(min_value=0.0, max_value=100.0, step=1.0, format="%.1f%%"),
+        },
+        disabled=["자산", "추천 비중"], hide_index=True, use_container_width=True, key=f"{state_key}/editor"
+    )
+    with METRICS.timer("portfolio_page.custom_weights"):
+        state.set_weights(edited["비중"].fillna(0.0).to_numpy() / 100)
+        summary = state.summary()
+    artifacts.touch(state_key)
+    total = state.weights.sum()
+    if total > 1.0 + 1e-9:
+        st.warning(f"비중 합계가 {total:.1%} 입니다. 100% 를 넘는 부분은 차입으로 계산됩니다.")
+    elif total < 1.0 - 1e-9:
+        st.caption(f"비중 합계 {total:.1%}: 나머지 {1 - total:.1%} 는 현금(수익률 0)으로 계산합니다.")
+
+    # 추천 비중 대비 변화
+    reference, reference_nav = baseline.reference
+    for column, (name, value) in zip(st.columns(4), summary.items()):
+        if pd.isna(value):
+            column.metric(name, "-")
+        else:
+            column.metric(name, f"{value:.2%}", f"{value - reference[name]:+.2%}")
+
+    path = state.backtest()
+    if path is not None:
+        import plotly.graph_objects as go
+        # 첫날과 마지막 날을 포함해 화면 해상도 이하의 점만 전송
+        index = np.unique(np.linspace(0, len(path[0]) - 1, chart_points(st.context.headers)).astype(int))
+        fig_custom = go.Figure()
+        fig_custom.add_trace(go.Scatter(x=baseline.dates[index], y=reference_nav[index], mode='lines',
+                                        name='추천 비중', line=dict(color='#B0B0B0', width=1.5)))
+        fig_custom.add_trace(go.Scatter(x=baseline.dates[index], y=path[0][index], mode='lines',
+                                        name='조정 비중', line=dict(color='#008CBA', width=2)))
+        fig_custom.update_layout(yaxis=dict(title="NAV"), hovermode='x unified', template="plotly_white")
+        st.plotly_chart(fig_custom, use_container_width=True)
 
 # 포트폴리오 페이지
 def portfolio_page():
+    import plotly.graph_objects as go
     st.title("📈 추천 포트폴리오")
 
-    total_score = calculate_risk_score(
-    st.session_state.user_goal,
-    st.session_state.user_experience,
-    st.session_state.user_market,
-    st.session_state.user_risk
-    )
-
-    # 사용자 입력값
-    risk = map_risk_level_by_score(total_score)
-    horizon = st.session_state.user_horizon
+    # 사용자 입력값 (세션에는 설문 응답과 채점 결과만 보관)
+    risk, horizon = session_profile(st.session_state).key
 
-    # 포트폴리오 데이터
-    portfolio, portfolio_with_desc = get_portfolio(risk, horizon)
-
-    # Asset 데이터 로드
-    asset_data = load_asset_data(horizon)
-    if asset_data.empty:
+    # 미리 계산된 포트폴리오 결과
+    with METRICS.timer("portfolio_page.bundle"):
+        bundle = get_result_bundle(risk, horizon).portfolio
+    if bundle is None:
         st.error("Asset 데이터를 불러올 수 없습니다.")
+        show_load_error(ASSET_DATA_FILES.get(horizon, "asset_data_장기.csv"))
         return
-
-    # 기대수익률 및 변동성 매핑
-    asset_data = asset_data.set_index("Asset")  # Asset 열을 인덱스로 설정
-    expected_returns = {}
-    volatilities = {}
-
-    assets = list(portfolio.keys())
-    for asset in assets:
-        if asset in asset_data.index:
-            expected_returns[asset] = asset_data.loc[asset, "ExpectedReturn"]
-            volatilities[asset] = asset_data.loc[asset, "Volatility"]
-        else:
-            # Handle the case where asset is not in asset_data.index
-            st.warning(f"Asset 데이터에 {asset} 정보가 없습니다.")
-            expected_returns[asset] = 0  # 기본값 설정
-            volatilities[asset] = 0  # 기본값 설정
-
-    # 포트폴리오 기대수익률 및 변동성 계산
-    portfolio_return = sum(weight * expected_returns[asset] / 100 for asset, weight in portfolio.items())
-    portfolio_volatility = sum(weight * volatilities[asset] / 100 for asset, weight in portfolio.items())
+    portfolio = bundle.portfolio
+    portfolio_with_desc = bundle.portfolio_with_desc
+    for asset in bundle.missing_assets:
+        st.warning(f"Asset 데이터에 {asset} 정보가 없습니다.")
 
     # 포트폴리오 메타 정보 강조
     col1, col2 = st.columns(2)
     with col1:
-        st.metric("포트폴리오 기대수익률", f"{portfolio_return:.2%}")
+        st.metric("포트폴리오 기대수익률", f"{bundle.portfolio_return:.2%}")
     with col2:
-        st.metric("포트폴리오 변동성", f"{portfolio_volatility:.2%}")
-
-    # 해외 ETF 매핑 데이터
-    global_etf_mapping = {
-        "SPY": "SPDR S&P500",
-        "VNQ": "Vanguard Real Estate Index Fund",
-        "PAVE": "Global X U.S. Infrastructure Development",
-        "SCHD": "Schwab US Dividend Equity",
-        "SPYD": "SPDR Portfolio S&P500 High Dividend",
-        "SKYY": "First Trust Cloud Computing",
-        "SMH": "VanEck Semiconductor",
-        "VWO": "Vanguard FTSE Emerging Markets",
-        "QQQ": "Invesco QQQ Trust, Series1",
-        "IEF": "iShares 7-10 Year Treasury Bond",
-        "BIL": "SPDR Lehman 1-3 Month T-Bill",
-        "IAU": "iShares Gold Trust",
-        "HYG": "iShares iBoxx $ High Yield Corporate Bond"
-    }
-    
-    # 국내 ETF 매핑 데이터
-    domestic_etf_mapping = {
-        "SPY": "KOSEF 미국S&P500(H) (449780)",
-        "VNQ": "KODEX 미국부동산리츠(H) (352560)",
-        "PAVE": "KODEX 미국AI전력핵심인프라 (487230)",
-        "SCHD": "TIGER 미국배당다우존스 (458730)",
-        "SPYD": "KODEX 미국S&P500배당귀족커버드콜(합성H) (276970)",
-        "SKYY": "TIGER 글로벌 클라우드컴퓨팅 INDXX (371450)",
-        "SMH": "TIGER 미국 필라델피아 반도체 나스닥 (381180)",
-        "VWO": "KODEX MSCI EM선물(H) (291890)",
-        "QQQ": "KOSEF 미국나스닥100(H) (453080)",
-        "IEF": "TIGER 미국채10년선물 (305080)",
-        "BIL": "KOSEF 통안채1년 (122260)",
-        "IAU": "KODEX 골드선물(H) (132030)",
-        "HYG": "KODEX iShares미국하이일드액티브 (468380)"
-    }
-    
-    # 데이터프레임 생성
-    portfolio_data = {
-        "자산": list(portfolio.keys()),
-        "ETF 이름": [global_etf_mapping.get(asset, "N/A") for asset in portfolio],
-        "국내 ETF 이름": [domestic_etf_mapping.get(asset, "N/A") for asset in portfolio],
-        "비중": list(portfolio.values()),
-        "기대수익률": [expected_returns[asset] * 100 for asset in portfolio],
-        "변동성": [volatilities[asset] * 100 for asset in portfolio]
-    }
+        st.metric("포트폴리오 변동성", f"{bundle.portfolio_volatility:.2%}")
 
     st.subheader("📊 추천 포트폴리오 구성")
-    portfolio_df = pd.DataFrame(portfolio_data).reset_index(drop=True)
-    
-    st.dataframe(
-    portfolio_df.style.format({
-        "비중": "{:.2f}%",
-        "기대수익률": "{:.2f}%",
-        "변동성": "{:.2f}%"
-    }).background_gradient(cmap="YlGnBu", subset=["비중"]),
-    use_container_width=True
-    )
+    # Styler 의 background_gradient 는 st.dataframe 직렬화 시점에 계산됨
+    with METRICS.timer("portfolio_page.styled_table"):
+        st.dataframe(
+        bundle.portfolio_df.style.format({
+            "비중": "{:.2f}%",
+            "기대수익률": "{:.2f}%",
+            "변동성": "{:.2f}%"
+        }).background_gradient(cmap="YlGnBu", subset=["비중"]),
+        use_container_width=True
+        )
     st.caption("미국 국고채 1년물은 국내 통안채 1년물로 대체")
 
     st.subheader("📚 ETF 상세 설명")
+    registry = get_registry()
     for asset, info in portfolio_with_desc.items():
-        with st.expander(f"{asset} - {global_etf_mapping.get(asset, 'N/A')}"):
+        instrument = registry.get(asset)
+        with st.expander(f"{asset} - {registry.name(asset)}"):
             st.write(f"**비중:** {info['비중']}%")
             st.write(f"**설명:** {info['설명']}")
-            domestic_etf = domestic_etf_mapping.get(asset, 'N/A')
+            domestic_etf = registry.domestic_label(asset)
             st.write(f"**국내 대체 ETF:** {domestic_etf}")
             
             global_etf_ticker_url = f"https://etfdb.com/etf/{asset}/#etf-ticker-profile"
@@ -377,8 +392,8 @@ def portfolio_page():
             unsafe_allow_html=True
         )
 
-            if domestic_etf != 'N/A':
-                domestic_etf_ticker_url = f"https://finance.naver.com/item/main.naver?code={domestic_etf[-7:-1]}"
+            if instrument is not None and instrument.domestic_url is not None:
+                domestic_etf_ticker_url = instrument.domestic_url
                 st.markdown(
                     f"""
                     <a href="{domestic_etf_ticker_url}" target="_blank" style="text-decoration:none;">
@@ -401,32 +416,68 @@ def portfolio_page():
                     unsafe_allow_html=True
                 )
 
-    def create_portfolio_chart(portfolio):
-        labels = list(portfolio.keys())
-        values = list(portfolio.values())
-        
-        fig = go.Figure(data=[go.Pie(
-            labels=labels, 
-            values=values,
-            textinfo='label+percent',
-            insidetextorientation='radial',
-            hole=.3,
-            textfont=dict(size=16)
-        )])
-        
-        fig.update_layout(
-            showlegend=False,
-            width=800,
-            height=500
+    st.subheader("🍰 포트폴리오 구성 비율")
+    with METRICS.timer("portfolio_page.chart_serialize"):
+        st.plotly_chart(bundle.pie_chart, use_container_width=True)
+
+    # 효율적 투자선 (가격 데이터가 있는 경우에만 표시)
+    if bundle.frontier_chart is not None:
+        st.subheader("📐 효율적 투자선")
+        with METRICS.timer("portfolio_page.chart_serialize"):
+            st.plotly_chart(bundle.frontier_chart, use_container_width=True)
+
+    # 몬테카를로 시뮬레이션
+    with METRICS.timer("portfolio_page.simulation"):
+        simulation = current_snapshot(simulation_snapshots(risk, horizon), "몬테카를로 시뮬레이션 중...")
+    if simulation is not None:
+        st.subheader("🔮 미래 성과 시뮬레이션")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("손실 확률", f"{simulation.probability_of_loss:.1%}")
+        col2.metric("중앙값 수익률", f"{np.median(simulation.terminal_returns):.2%}")
+        col3.metric("95% VaR", f"{simulation.value_at_risk(0.95):.2%}")
+
+        bands = simulation.percentiles
+        with METRICS.timer("portfolio_page.fan_chart"):
+            fig_fan = go.Figure()
+            for low, high, color in [("5%", "95%", 'rgba(0, 140, 186, 0.15)'), ("25%", "75%", 'rgba(0, 140, 186, 0.35)')]:
+                fig_fan.add_trace(go.Scatter(
+                    x=bands.index, y=bands[high], mode='lines', line=dict(width=0),
+                    showlegend=False, hoverinfo='skip'
+                ))
+                fig_fan.add_trace(go.Scatter(
+                    x=bands.index, y=bands[low], mode='lines', line=dict(width=0),
+                    fill='tonexty', fillcolor=color, name=f"{low}~{high}", hoverinfo='skip'
+                ))
+            fig_fan.add_trace(go.Scatter(
+                x=bands.index, y=bands["50%"], mode='lines', name='중앙값',
+                line=dict(color='#008CBA', width=2),
+                hovertemplate="거래일: %{x}<br>NAV: %{y:.2f}"
+            ))
+            fig_fan.update_layout(
+                xaxis=dict(title="거래일"),
+                yaxis=dict(title="NAV"),
+                template="plotly_white"
+            )
+            st.plotly_chart(fig_fan, use_container_width=True)
+        st.caption("기대수익률·변동성·상관관계를 이용한 10만 개 경로 시뮬레이션 결과입니다. "
+                   "가격 데이터가 없으면 위 변동성과 같이 자산 간 상관관계 1 을 가정합니다.")
+
+    # 사용자 지정 비중
+    custom_weight_editor(risk, horizon)
+
+    # 과거 위기 구간 / 가정 충격 스트레스 테스트
+    with METRICS.timer("portfolio_page.stress_table"):
+        stress_table = current_snapshot(stress_snapshots(), "스트레스 테스트 중...").to_frame(risk, horizon)
+        st.subheader("🧯 스트레스 테스트")
+        st.dataframe(
+            stress_table.style.format({
+                "최대 손실": lambda value: "데이터 없음" if pd.isna(value) else f"{value:.2%}",
+                "회복 기간(거래일)": lambda value: "-" if pd.isna(value) else "미회복" if np.isinf(value) else f"{value:.0f}",
+            }),
+            use_container_width=True
         )
-        
-        return fig
+    st.caption("과거 구간은 일별 가격 데이터가 있을 때 재현하며, 가정 충격의 회복 기간은 기대수익률 기준 추정치입니다.")
 
-    st.subheader("🍰 포트폴리오 구성 비율")
-    # portfolio_page() 함수 내에서 차트 생성 및 표시
-    portfolio_pie_chart = create_portfolio_chart(portfolio)
-    st.plotly_chart(portfolio_pie_chart, use_container_width=True)
-    
     # 다음 페이지로 이동
     if st.button("📄 백테스트 결과 보기"):
         go_to_page("backtest")
@@ -440,69 +491,34 @@ def portfolio_page():
 
 # 백테스트 결과 페이지
 def backtest_page():
+    import plotly.graph_objects as go
     st.title("📊 백테스트 결과")
 
-    total_score = calculate_risk_score(
-    st.session_state.user_goal,
-    st.session_state.user_experience,
-    st.session_state.user_market,
-    st.session_state.user_risk
-    )
+    # 사용자 입력값 (세션에는 설문 응답과 채점 결과만 보관)
+    risk, horizon = session_profile(st.session_state).key
 
-    # 사용자 입력값
-    risk = map_risk_level_by_score(total_score)
-    horizon = st.session_state.user_horizon    
-
-    # 백테스트 데이터 로드
-    backtest_data = load_backtest_data(risk, horizon)
-    if backtest_data.empty:
+    # 미리 계산된 백테스트 결과
+    with METRICS.timer("backtest_page.bundle"):
+        bundle = get_result_bundle(risk, horizon).backtest
+    if bundle is None:
         st.error("백테스트 데이터를 불러올 수 없습니다.")
+        show_load_error(BACKTEST_DATA_FILES.get((risk, horizon), "back_data_장기_RT.csv"))
         return
-
-    # 최종 수익률 계산
-    initial_nav = backtest_data["NAV"].iloc[0]
-    final_nav = backtest_data["NAV"].iloc[-1]
-    cumulative_return = np.log(final_nav / initial_nav) 
-    
-    # MDD 계산
-    max_drawdown = backtest_data["MDD"].min()
+    backtest_data = bundle.backtest_data
+    analytics = bundle.analytics
 
     # 최종 수익률 및 MDD 강조
     col1, col2 = st.columns(2)
     
     with col1:
-        st.metric("누적 수익률", f"{cumulative_return:.2%}")
+        st.metric("누적 수익률", f"{bundle.cumulative_return:.2%}")
     with col2:
-        st.metric("최대 낙폭(MDD)", f"{max_drawdown:.2%}")
+        st.metric("최대 낙폭(MDD)", f"{bundle.max_drawdown:.2%}")
 
     # 기간별 수익률 계산
     st.subheader("📅 기간별 수익률")
-    backtest_data['Return'] = np.log(backtest_data['NAV'] / backtest_data['NAV'].shift(1))  # 일간 수익률 계산
-    backtest_data['Date'] = pd.to_datetime(backtest_data['Date'])  # 날짜 형식 변환
-
-    # 기간 설정
-    date_ranges = [
-        ("1개월", -30),
-        ("3개월", -90),
-        ("6개월", -180),
-        ("1년", -365),
-    ]
-
-    period_returns = []
-    for label, days in date_ranges:
-        try:
-            if len(backtest_data) > abs(days):  # 데이터가 충분히 있는지 확인
-                start_date = backtest_data['Date'].iloc[days]
-                start_nav = backtest_data[backtest_data['Date'] == start_date]['NAV'].iloc[0]
-                period_return = np.log(final_nav / start_nav)  # 로그 수익률 계산
-                period_returns.append({"기간": label, "기간 수익률": period_return})  # 숫자로 저장
-            else:
-                period_returns.append({"기간": label, "기간 수익률": None})  # None으로 저장
-        except IndexError:
-            period_returns.append({"기간": label, "기간 수익률": None})  # None으로 저장
-    
-    # DataFrame 생성
-    period_return_df = pd.DataFrame(period_returns).reset_index(drop=True)
+
+    period_return_df = bundle.period_return_df
     
     # None 값 처리 및 포맷팅
     def format_returns(value):
@@ -511,79 +527,149 @@ def backtest_page():
         return f"{value:.2%}"  # 숫자 값에만 포맷 적용
     
     # DataFrame 표시
-    st.dataframe(
-        period_return_df.style.format({"기간 수익률": format_returns}).set_caption("기간별 누적 수익률"),
-        use_container_width=True
-    )
+    with METRICS.timer("backtest_page.period_table"):
+        st.dataframe(
+            period_return_df.style.format({"기간 수익률": format_returns}).set_caption("기간별 누적 수익률"),
+            use_container_width=True
+        )
 
-    # NAV 그래프 (다크 테마)
-    st.subheader("📈 누적 NAV 추세")
-    fig1 = go.Figure()
-    
-    fig1.add_trace(go.Scatter(
-        x=backtest_data['Date'], 
-        y=backtest_data['NAV'], 
-        mode='lines+markers',
-        name='NAV',
-        line=dict(color='green', width=2),
-        hovertemplate="날짜: %{x}<br>NAV: %{y:.2f}"
-    ))
-    
-    fig1.update_layout(
-        title='누적 NAV (수익률)',
-        xaxis=dict(
-            title="날짜",
-            showgrid=True,
-            zeroline=False,
-            tickformat="%Y-%m-%d",
-            tickangle=45,
-        ),
-        yaxis=dict(
-            title="NAV",
-            showgrid=True,
-            zeroline=False,
-        ),
-        hovermode='x unified',
-        template="plotly_white"  # 다크 테마
-    )
-    
-    st.plotly_chart(fig1, use_container_width=True)
-    
-    # MDD 그래프 (다크 테마)
-    st.subheader("📉 최대 낙폭(MDD)")
-    fig2 = go.Figure()
-    
-    fig2.add_trace(go.Scatter(
-        x=backtest_data['Date'], 
-        y=backtest_data['MDD'], 
-        mode='lines+markers',
-        name='MDD',
-        line=dict(color='red', width=2, dash="dash"),
-        fill='tozeroy',
-        fillcolor='rgba(255, 0, 0, 0.2)',
-        hovertemplate="날짜: %{x}<br>MDD: %{y:.2%}"
-    ))
-    
-    fig2.update_layout(
-        title='MDD (Maximum Drawdown)',
-        xaxis=dict(
-            title="날짜",
-            showgrid=True,
-            zeroline=False,
-            tickformat="%Y-%m-%d",
-            tickangle=45,
-        ),
-        yaxis=dict(
-            title="Drawdown",
-            showgrid=True,
-            zeroline=False,
-        ),
-        hovermode='x unified',
-        template="plotly_white"  # 다크 테마
+    # 사용자 지정 기간 수익률
+    first_date = backtest_data['Date'].iloc[0].date()
+    last_date = backtest_data['Date'].iloc[-1].date()
+    custom_range = st.date_input(
+        "사용자 지정 기간",
+        value=(first_date, last_date),
+        min_value=first_date,
+        max_value=last_date
     )
+    if len(custom_range) == 2:
+        st.metric("사용자 지정 기간 수익률", format_returns(analytics.return_between(*custom_range)))
+
+    # 화면 폭에 맞춘 해상도의 차트 (기본 해상도는 미리 계산된 차트 사용)
+    with METRICS.timer("backtest_page.charts"):
+        max_points = chart_points(st.context.headers)
+        if max_points == chart_points():
+            nav_chart, mdd_chart = bundle.nav_chart, bundle.mdd_chart
+        else:
+            nav_chart, mdd_chart = load_backtest_charts(risk, horizon, max_points,
+                                                        result_bundle_snapshots().signature)
+
+        # NAV 그래프
+        st.subheader("📈 누적 NAV 추세")
+        st.plotly_chart(nav_chart, use_container_width=True)
     
-    # Streamlit에 Plotly 차트 렌더링
-    st.plotly_chart(fig2, use_container_width=False) 
+        # MDD 그래프
+        st.subheader("📉 최대 낙폭(MDD)")
+        st.plotly_chart(mdd_chart, use_container_width=False) 
+
+    # 롤링 위험/수익 지표
+    st.subheader("📐 롤링 위험/수익 지표")
+    window_label = st.selectbox("롤링 기간", ["1개월", "3개월", "6개월"], index=1)
+    with METRICS.timer("backtest_page.rolling"):
+        rolling_df, episodes_df = load_rolling_analytics(
+            risk, horizon, dict(PERIOD_WINDOWS)[window_label], infer_periods_per_year(backtest_data['Date'])
+        ).sync(backtest_data['Date'].to_numpy(), backtest_data['NAV'].to_numpy())
+    latest = rolling_df.iloc[-1]
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("변동성", format_returns(latest["변동성"]))
+    col2.metric("샤프 비율", "데이터 부족" if pd.isna(latest["샤프"]) else f"{latest['샤프']:.2f}")
+    col3.metric("소르티노 비율", "데이터 부족" if pd.isna(latest["소르티노"]) else f"{latest['소르티노']:.2f}")
+    col4.metric("칼마 비율", "데이터 부족" if pd.isna(latest["칼마"]) else f"{latest['칼마']:.2f}")
+
+    with METRICS.timer("backtest_page.rolling_chart"):
+        fig3 = go.Figure()
+        fig3.add_trace(go.Scatter(
+            x=rolling_df['Date'],
+            y=rolling_df['변동성'],
+            mode='lines',
+            name='변동성',
+            line=dict(color='orange', width=2),
+            hovertemplate="날짜: %{x}<br>변동성: %{y:.2%}"
+        ))
+        fig3.add_trace(go.Scatter(
+            x=rolling_df['Date'],
+            y=rolling_df['샤프'],
+            mode='lines',
+            name='샤프 비율',
+            yaxis='y2',
+            line=dict(color='blue', width=2),
+            hovertemplate="날짜: %{x}<br>샤프 비율: %{y:.2f}"
+        ))
+        fig3.update_layout(
+            title=f'롤링 변동성 / 샤프 비율 ({window_label})',
+            xaxis=dict(title="날짜", tickformat="%Y-%m-%d", tickangle=45),
+            yaxis=dict(title="변동성", tickformat=".0%"),
+            yaxis2=dict(title="샤프 비율", overlaying='y', side='right'),
+            hovermode='x unified',
+            template="plotly_white"
+        )
+        st.plotly_chart(fig3, use_container_width=True)
+
+    # 낙폭 구간별 깊이와 회복 기간
+    with METRICS.timer("backtest_page.episodes_table"):
+        st.dataframe(
+            episodes_df.sort_values("최대 낙폭").head(5).style.format({
+                "고점": "{:%Y-%m-%d}",
+                "저점": "{:%Y-%m-%d}",
+                "회복": lambda value: "미회복" if pd.isna(value) else f"{value:%Y-%m-%d}",
+                "최대 낙폭": "{:.2%}",
+                "회복 기간(일)": lambda value: "-" if pd.isna(value) else f"{value:.0f}",
+            }).set_caption("주요 낙폭 구간"),
+            use_container_width=True
+        )
+
+    # 자산별 수익 기여도(누적 NAV 기여를 쌓은 차트)와 위험 기여도(한계/구성 VaR)
+    with METRICS.timer("backtest_page.attribution"):
+        attribution = current_snapshot(attribution_snapshots(), "기여도를 계산하는 중...")
+        st.subheader("🧩 자산별 기여도")
+        contribution = attribution.cumulative_frame(risk, horizon)
+        if contribution is not None:
+            # 첫날과 마지막 날을 포함해 날짜를 고르게 골라 화면 해상도 이하의 점만 전송
+            contribution = contribution.iloc[np.unique(np.linspace(0, len(contribution) - 1, max_points).astype(int))]
+            fig_attr = go.Figure()
+            for asset in contribution.columns:
+                fig_attr.add_trace(go.Scatter(
+                    x=contribution.index, y=contribution[asset], mode='lines', name=asset,
+                    stackgroup='contribution', line=dict(width=0.5),
+                    hovertemplate=f"{asset}: %{{y:.2%}}<extra></extra>"
+                ))
+            fig_attr.update_layout(
+                xaxis=dict(title="날짜"),
+                yaxis=dict(title="누적 수익 기여", tickformat=".0%"),
+                hovermode='x unified',
+                template="plotly_white"
+            )
+            st.plotly_chart(fig_attr, use_container_width=True)
+        st.dataframe(
+            attribution.risk_frame(risk, horizon).style.format({
+                "비중": "{:.0%}",
+                "수익 기여": lambda value: "-" if pd.isna(value) else f"{value:.2%}",
+                "한계 VaR": "{:.3%}",
+                "구성 VaR": "{:.3%}",
+                "VaR 비중": lambda value: "-" if pd.isna(value) else f"{value:.1%}",
+            }).background_gradient(cmap="YlGnBu", subset=["구성 VaR"]),
+            use_container_width=True
+        )
+    st.caption("위험 기여도는 95% 신뢰수준 일간 모수적 VaR 기준이며, 가격 데이터가 없으면 자산 간 상관관계 1 을 가정합니다.")
+
+    # 리밸런싱 규칙 / 거래비용 민감도 (sweep.py 결과가 있는 경우에만 표시)
+    with METRICS.timer("backtest_page.sweep_table"):
+        from sweep import sweep_results_signature
+        sweep_table = load_sweep_table(risk, horizon, sweep_results_signature())
+        if not sweep_table.empty:
+            st.subheader("🔁 리밸런싱 / 거래비용 민감도")
+            st.dataframe(
+                sweep_table.style.format({
+                    "밴드": lambda value: "-" if pd.isna(value) else f"{value:.0%}",
+                    "누적 수익률": "{:.2%}",
+                    "연율화 수익률": "{:.2%}",
+                    "연율화 변동성": "{:.2%}",
+                    "최대 낙폭(MDD)": "{:.2%}",
+                    "연간 회전율": "{:.2f}",
+                }).background_gradient(cmap="YlGnBu", subset=["누적 수익률"]),
+                use_container_width=True
+            )
 
     # 돌아가기 버튼
     if st.button("🔙 추천 포트폴리오로 돌아가기"):
@@ -596,10 +682,30 @@ def backtest_page():
     # 버튼 아래에 메시지 추가
     st.markdown("<small>버튼을 더블클릭해주세요</small>", unsafe_allow_html=True)
 
-# 화면 렌더링
-if st.session_state.page == "survey":
-    survey_page()
-elif st.session_state.page == "portfolio":
-    portfolio_page()
-elif st.session_state.page == "backtest":
-    backtest_page()
+# Prometheus 텍스트 엔드포인트 (VIA_METRICS_PORT 가 설정된 경우에만, 주소는 VIA_METRICS_HOST 기본 localhost)
+if os.environ.get(METRICS_PORT_ENV):
+    start_metrics_exporter(int(os.environ[METRICS_PORT_ENV]), os.environ.get(METRICS_HOST_ENV, DEFAULT_METRICS_HOST))
+# 자산 통계 백그라운드 새로고침 (VIA_ASSET_REFRESH 에 주기(초)가 설정된 경우에만)
+if os.environ.get("VIA_ASSET_REFRESH"):
+    start_asset_refresher(float(os.environ["VIA_ASSET_REFRESH"]))
+
+# 화면 렌더링 (결과 묶음 계산이 끝나기 전에 포트폴리오/백테스트 화면에 오면 그 계산을 기다림)
+current_page = st.session_state.page
+METRICS.begin_rerun(current_page)
+with METRICS.timer(f"page.{current_page}"):
+    if current_page == "survey":
+        survey_page()
+    elif current_page == "portfolio":
+        portfolio_page()
+    elif current_page == "backtest":
+        backtest_page()
+
+# 재실행별 단계 시간 기록 (VIA_METRICS_LOG 파일, 개발자 오버레이)
+if os.environ.get(METRICS_LOG_ENV):
+    METRICS.log_rerun(os.environ[METRICS_LOG_ENV], current_page)
+if dev_overlay_enabled(st.query_params):
+    render_dev_overlay()
+
+# 모든 결과 묶음을 프로세스의 첫 렌더 직후 백그라운드에서 미리 계산 (첫 화면 렌더와 경합하지 않도록 마지막에 시작)
+if os.environ.get("VIA_WARMUP", "1") != "0":
+    warm_result_bundles()
@@ -0,0 +1,152 @@
+import functools
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from backtest import load_price_data
+from portfolio_core import load_asset_frame
+from registry import get_registry
+from risk import asset_covariance
+
+# 증분 갱신을 이만큼 반복하면 부동소수점 오차가 쌓이지 않도록 전체를 다시 계산
+REBASE_EVERY = 256
+INITIAL_NAV = 100.0
+
+
+@dataclass(frozen=True)
+class WeightBaseline:
+    """비중 편집에 필요한 세션 공용 입력 (읽기 전용)
+
+    asset_returns 는 열(자산) 우선 배열이라 자산 하나의 수익률 열이 연속된 메모리입니다.
+    가격 데이터가 없으면 dates/asset_returns 는 None 이고, 공분산은 상관관계 1 을 가정합니다
+    (portfolio_metrics 의 변동성과 같은 기준).
+    """
+    assets: tuple
+    weights: np.ndarray  # 추천 비중 (소수)
+    expected_returns: np.ndarray
+    covariance: np.ndarray  # 연율화
+    dates: Optional[pd.DatetimeIndex]
+    asset_returns: Optional[np.ndarray]  # (날짜 x 자산) 일간 단순 수익률, 첫 행은 0
+
+    @property
+    def has_backtest(self):
+        return self.asset_returns is not None
+
+    @functools.cached_property
+    def reference(self):
+        """추천 비중의 summary() 와 NAV 경로 (한 번만 계산)"""
+        portfolio = IncrementalPortfolio(self)
+        path = portfolio.backtest()
+        return portfolio.summary(), path[0] if path is not None else None
+
+
+def build_baseline(portfolio, horizon, universe=None):
+    """추천 포트폴리오와 편집 가능한 자산(기본값: 레지스트리 전체)의 기준 입력을 만듭니다.
+
+    Asset 데이터가 없거나 추천 자산의 통계가 없으면 None 을 반환합니다.
+    """
+    asset_data = load_asset_frame(horizon)
+    if asset_data.empty:
+        return None
+    asset_data = asset_data.drop_duplicates("Asset").set_index("Asset")
+    if not set(portfolio).issubset(asset_data.index):
+        return None
+    universe = get_registry().tickers if universe is None else universe
+    assets = list(dict.fromkeys([*portfolio, *(asset for asset in universe if asset in asset_data.index)]))
+    weights = np.array([portfolio.get(asset, 0) / 100 for asset in assets], dtype=np.float64)
+    expected_returns = asset_data.loc[assets, "ExpectedReturn"].to_numpy(dtype=np.float64)
+
+    covariance = asset_covariance(assets, horizon, asset_data.loc[assets, "Volatility"].to_numpy(dtype=np.float64))
+
+    dates, asset_returns = None, None
+    prices = load_price_data()
+    if not prices.empty and set(assets).issubset(prices.columns):
+        values = prices[assets].to_numpy(dtype=np.float64)
+        asset_returns = np.zeros((len(values), len(assets)), order="F")
+        asset_returns[1:] = np.nan_to_num(values[1:] / values[:-1] - 1.0)
+        dates = prices.index
+
+    for array in (weights, expected_returns, covariance, asset_returns):
+        if array is not None:
+            array.setflags(write=False)
+    return WeightBaseline(tuple(assets), weights, expected_returns, covariance, dates, asset_returns)
+
+
+class IncrementalPortfolio:
+    """비중을 바꿀 때 기준 결과에서 변경된 자산만큼만 다시 계산하는 포트폴리오 (세션별 상태)
+
+    자산 i 의 비중이 δ 만큼 바뀌면
+      기대수익률 += δ·μ_i,  분산 += 2δ(Σw)_i + δ²Σ_ii,  Σw += δ·Σ[:, i],  일간 수익률 += δ·R[:, i]
+    로 갱신하므로 자산 하나당 O(자산 수 + 날짜 수)입니다. NAV/MDD 는 일간 수익률에서 O(날짜 수)로 구합니다.
+    """
+
+    def __init__(self, baseline, weights=None):
+        self.baseline = baseline
+        self.rebase(baseline.weights if weights is None else weights)
+
+    def rebase(self, weights):
+        """비중에서 모든 값을 처음부터 계산합니다."""
+        baseline = self.baseline
+        self.weights = np.array(weights, dtype=np.float64)
+        self._exposure = baseline.covariance @ self.weights  # Σw
+        self._variance = float(self.weights @ self._exposure)
+        self._expected_return = float(baseline.expected_returns @ self.weights)
+        self._daily = baseline.asset_returns @ self.weights if baseline.has_backtest else None
+        self._updates = 0
+        self._path = None
+
+    def set_weights(self, weights):
+        """새 비중을 반영합니다. 바뀐 자산 수를 반환합니다."""
+        weights = np.asarray(weights, dtype=np.float64)
+        changed = np.flatnonzero(weights != self.weights)
+        if self._updates + len(changed) >= REBASE_EVERY:
+            self.rebase(weights)
+            return len(changed)
+        baseline = self.baseline
+        for i in changed:
+            delta = weights[i] - self.weights[i]
+            self._expected_return += delta * baseline.expected_returns[i]
+            self._variance += 2.0 * delta * self._exposure[i] + delta * delta * baseline.covariance[i, i]
+            self._exposure += delta * baseline.covariance[:, i]
+            if self._daily is not None:
+                self._daily += delta * baseline.asset_returns[:, i]
+            self.weights[i] = weights[i]
+        self._updates += len(changed)
+        if len(changed):
+            self._path = None
+        return len(changed)
+
+    @property
+    def nbytes(self):
+        """세션 전용 배열의 크기 (공유하는 baseline 은 제외)"""
+        arrays = [self.weights, self._exposure, self._daily, *(self._path or ())]
+        return sum(array.nbytes for array in arrays if array is not None)
+
+    @property
+    def expected_return(self):
+        return self._expected_return
+
+    @property
+    def volatility(self):
+        return float(np.sqrt(max(self._variance, 0.0)))
+
+    def backtest(self):
+        """(NAV, 낙폭) 경로. 가격 데이터가 없으면 None"""
+        if self._daily is None:
+            return None
+        if self._path is None:
+            nav = INITIAL_NAV * np.cumprod(1.0 + self._daily)
+            self._path = nav, nav / np.maximum.accumulate(nav) - 1.0
+        return self._path
+
+    def summary(self):
+        """{기대수익률, 변동성, 누적 수익률(로그), 최대 낙폭} (백테스트 값은 가격 데이터가 없으면 NaN)"""
+        path = self.backtest()
+        return {
+            "기대수익률": self.expected_return,
+            "변동성": self.volatility,
+            "누적 수익률": float(np.log(path[0][-1] / INITIAL_NAV)) if path is not None else np.nan,
+            "최대 낙폭(MDD)": float(path[1].min()) if path is not None else np.nan,
+        }